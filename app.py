@@ -1,560 +1,604 @@
 import streamlit as st
-from dotenv import load_dotenv
 import os
-from docx import Document
-from gpt_parser import parse_doctype_prompt
-from erp_api import create_erpnext_doctype, get_all_doctypes, get_records_for_doctype
-from auth import check_login
-from gpt_client import ask_gpt
-from erp_api import create_workflow
-from gpt_parser import parse_workflow_prompt
-from erp_api import create_role, set_permission
-from gpt_parser import parse_role_permission_prompt
-from erp_api import create_notification
-from gpt_parser import parse_notification_prompt
-from erp_api import create_scheduled_reminder
-from gpt_parser import parse_reminder_prompt
-from erp_api import create_department
-from gpt_parser import parse_department_prompt
-from erp_api import create_user, assign_role_to_user
-from gpt_parser import parse_user_assignment_prompt
-from boq_parser import parse_boq_request
-from erp_api import create_management_fee_rule, create_profit_sharing_rule
-from gpt_parser import parse_financial_prompt
-from erp_api import create_prf, get_pending_prfs
-from gpt_parser import parse_prf_prompt
 import re
-from erp_api import add_vehicle, schedule_vehicle_maintenance, get_all_assets
-from gpt_parser import parse_vehicle_prompt
-from erp_api import generate_summary_report
-from gpt_parser import parse_dashboard_prompt
-from docx import Document
+from concurrent.futures import ThreadPoolExecutor
 
+# Only light modules are imported here: Streamlit re-runs this script on every
+# interaction, and openai, docx, pandas and the ERP/GPT helpers are imported
+# by the branch or handler that needs them (Python caches them after that).
+from config import load_env
+from auth import check_login
+from gpt_client import GPTError, ask_gpt, ask_gpt_stream, ask_gpt_custom_stream
+from intent_router import classify_with_gpt, dispatch, handles, route
+from erp_mirror import enable_from_env
 
 
+load_env()
 
+API_URL = os.getenv("ERP_BASE_URL")
+API_KEY = os.getenv("ERP_API_KEY")
+API_SECRET = os.getenv("ERP_API_SECRET")
 
+# Optional local mirror of read-heavy Doctypes (set ERP_MIRROR_DOCTYPES to enable)
+enable_from_env(API_URL, (API_KEY, API_SECRET))
+
+# How the general-purpose ask_gpt answer is handled when the prompt is an action command
+ADVICE_SKIP = "Skip (fastest)"
+ADVICE_CONCURRENT = "Show alongside the result"
+ADVICE_FIRST = "Show before running the command"
+
+
+def stream_gpt_answer(prompt: str, system_message: str = None) -> str:
+    """
+    Render the GPT answer token by token and report time-to-first-token.
+    Returns the full answer text, or None if the OpenAI call failed.
+    """
+    timed_stream = ask_gpt_custom_stream(system_message, prompt) if system_message else ask_gpt_stream(prompt)
+    try:
+        answer = st.write_stream(timed_stream)
+    except GPTError as e:
+        st.error(f"❌ OpenAI error: {e}")
+        return None
+    if timed_stream.time_to_first_token is not None:
+        st.caption(f"⏱️ First token after {timed_stream.time_to_first_token:.2f}s, full answer in {timed_stream.total_time:.2f}s")
+    return answer
+
+
+def run_actions(routed):
+    """
+    Run the handlers for the routed intents. When several of them need GPT
+    extraction (project + department + BOQ), their arguments come from one
+    combined call instead of one call per handler.
+    """
+    from gpt_parser import STRUCTURED_INTENTS, parse_multi_intent_prompt
+    from requests.exceptions import RequestException
+
+    if sum(intent in STRUCTURED_INTENTS for intent in routed.intents) > 1:
+        routed.extracted = parse_multi_intent_prompt(routed.text)
+    try:
+        return dispatch(routed)
+    except RequestException as e:
+        # e.g. a list lookup whose pages could not all be fetched
+        st.error(f"❌ ERPNext request failed: {e}")
+        return []
+
+
+# ---- "Ask GPT for Help" action handlers (selected by intent_router) ----
+
+# Check if prompt mentions notification setup
+@handles("notification")
+def handle_notification(routed):
+    st.info("Detected notification setup request. Parsing details...")
+
+    from gpt_parser import parse_notification_prompt
+    from erp_api import create_notification
+    subject, document_type, condition, message = parse_notification_prompt(routed.text)
+
+    auth = (API_KEY, API_SECRET)
+
+    notification_result = create_notification(API_URL, auth, subject, document_type, condition, message)
+
+    if "data" in notification_result:
+        st.success(f"✅ Notification for **{document_type} approval** setup successfully! 📩")
+    else:
+        st.error("❌ Failed to create Notification. Check prompt or ERP access.")
+
+
+# Detect Inventory & Supplier Related Actions
+@handles("inventory")
+def handle_inventory(routed):
+    st.info("Detected inventory/supplier management request. Parsing details...")
+
+    from gpt_parser import parse_inventory_prompt
+    from erp_api import add_inventory_item, get_low_stock_items, add_supplier
+
+    item_name, quantity, department_name, supplier_name, contact_number = parse_inventory_prompt(routed.text)
+
+    auth = (API_KEY, API_SECRET)
+
+    if routed.has("item"):
+        if item_name and quantity:
+            if st.checkbox(f"✅ Confirm adding Inventory Item: {item_name} (Qty: {quantity})?"):
+                result = add_inventory_item(API_URL, auth, item_name, quantity, department_name)
+                if "data" in result:
+                    st.success(f"📦 Inventory item '{item_name}' added successfully!")
+                else:
+                    st.error("❌ Failed to add inventory item. Check input details.")
+            else:
+                st.warning("⚡ Please confirm before adding inventory item.")
+
+    elif routed.has("supplier"):
+        if supplier_name:
+            if st.checkbox(f"✅ Confirm adding Supplier: {supplier_name}?"):
+                result = add_supplier(API_URL, auth, supplier_name, contact_number)
+                if "data" in result:
+                    st.success(f"🏢 Supplier '{supplier_name}' added successfully!")
+                else:
+                    st.error("❌ Failed to add supplier. Check input details.")
+            else:
+                st.warning("⚡ Please confirm before adding supplier.")
 
+    elif routed.has("low stock"):
+        low_stock = get_low_stock_items(API_URL, auth)
+        if low_stock:
+            st.write("### Low Stock Items")
+            st.dataframe(low_stock)
+        else:
+            st.warning("No low stock items found.")
 
-load_dotenv()
 
-API_URL = os.getenv("ERP_BASE_URL")
-API_KEY = os.getenv("ERP_API_KEY")
-API_SECRET = os.getenv("ERP_API_SECRET")
+# Detect Dashboard/Reports Related Actions
+@handles("dashboard")
+def handle_dashboard(routed):
+    st.info("Detected report or dashboard request. Parsing details...")
 
-st.set_page_config(page_title="ERPNext Smart Assistant", layout="wide")
+    from gpt_parser import parse_dashboard_prompt
+    from erp_api_async import generate_summary_report_concurrently
 
-if "authenticated" not in st.session_state:
-    st.session_state.authenticated = False
+    target_audience, report_type, frequency = parse_dashboard_prompt(routed.text)
 
-if not st.session_state.authenticated:
-    st.title("🔐 ERPNext Assistant Login")
-    password = st.text_input("Enter Password", type="password")
-    if st.button("Login"):
-        if check_login(password):
-            st.session_state.authenticated = True
-            st.rerun()
+    auth = (API_KEY, API_SECRET)
+
+    if st.button("📄 Generate Report Now"):
+        with st.spinner("Generating report..."):
+            summary = generate_summary_report_concurrently(API_URL, auth)
+
+            # Display the summary
+            st.write("### 📋 Report Summary")
+            st.json(summary)
+
+            # Optionally download as Word document
+            from service import write_report_docx
+
+            report_filename = "erp_summary_report.docx"
+            write_report_docx(summary, report_filename, target_audience, frequency)
+
+            with open(report_filename, "rb") as file:
+                st.download_button(
+                    label="📥 Download Summary Report",
+                    data=file,
+                    file_name=report_filename,
+                    mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+                )
+
+
+# Detect Claim Creation or Query
+@handles("claim")
+def handle_claim(routed):
+    st.info("Detected claim request. Parsing details...")
+
+    from gpt_parser import parse_claim_prompt
+    from erp_api import create_claim, get_claims
+
+    project_name, claim_name, amount = parse_claim_prompt(routed.text)
+
+    auth = (API_KEY, API_SECRET)
+
+    if routed.has("submit", "create"):
+        # User wants to create a Claim
+        if project_name and claim_name and amount:
+            result = create_claim(API_URL, auth, project_name, claim_name, amount)
+            if "data" in result:
+                st.success(f"📄 Claim '{claim_name}' for project '{project_name}' created successfully (RM {amount})!")
+            else:
+                st.error("❌ Failed to create claim. Check input details.")
         else:
-            st.error("Incorrect password. Please try again.")
+            st.error("❌ Could not detect project, claim name, or amount properly.")
 
-else:
-    st.title("🤖 ERPNext Smart Assistant (Powered by GPT)")
-    st.write("Welcome! This intelligent assistant allows you to: Create and manage Doctypes, Set up Workflows and Roles, Configure Notifications and Reminders, Analyze ERP data effortlessly and many more")
+    elif routed.has("due", "status", "list"):
+        # User wants to check claims
+        claims = get_claims(API_URL, auth, project_name)
 
-    action = st.radio("Choose an action", ["Ask GPT for Help", "Create Doctype Directly", "List and Explore Available Doctypes", "📚 Documentation"])
+        if claims:
+            st.write(f"### Claims for {project_name}")
+            st.dataframe(claims)
+        else:
+            st.warning(f"No claims found for project {project_name}.")
 
-    if action == "Ask GPT for Help":
-        gpt_prompt = st.text_area("Ask a question or request guidance:", height=150)
 
-        if st.button("Ask GPT"):
-            if gpt_prompt:
-                with st.spinner("GPT is thinking..."):
-                    gpt_response = ask_gpt(gpt_prompt)
-                    st.success(gpt_response)
+# Detect Financial Automation (Management Fee or Profit Sharing)
+@handles("financial")
+def handle_financial(routed):
+    st.info("Detected financial automation request. Parsing details...")
 
-                    # Check if prompt mentions notification setup
-                    if "notify" in gpt_prompt.lower() or "send email" in gpt_prompt.lower():
-                        st.info("Detected notification setup request. Parsing details...")
+    from gpt_parser import parse_financial_prompt
+    from erp_api import create_management_fee_rule, create_profit_sharing_rule
 
-                        from gpt_parser import parse_notification_prompt
-                        subject, document_type, condition, message = parse_notification_prompt(gpt_prompt)
+    action, department, role, amount = parse_financial_prompt(routed.text)
 
-                        auth = (API_KEY, API_SECRET)
+    auth = (API_KEY, API_SECRET)
 
-                        notification_result = create_notification(API_URL, auth, subject, document_type, condition, message)
+    if action == "management_fee":
+        if department and amount:
+            result = create_management_fee_rule(API_URL, auth, department, amount)
+            if "data" in result:
+                st.success(f"💰 Management fee of RM {amount} set for {department} department!")
+            else:
+                st.error("❌ Failed to create management fee rule. Check details.")
+        else:
+            st.error("❌ Could not detect department or amount for management fee setup.")
+
+    elif action == "profit_sharing":
+        if role and amount:
+            # Assume department if missing (optional to improve later)
+            department = department or "General"
+            result = create_profit_sharing_rule(API_URL, auth, department, role, amount)
+            if "data" in result:
+                st.success(f"🎯 Profit sharing rule: {amount}% to {role} set successfully!")
+            else:
+                st.error("❌ Failed to create profit sharing rule. Check details.")
+        else:
+            st.error("❌ Could not detect role or percentage for profit sharing rule.")
 
-                        if "data" in notification_result:
-                            st.success(f"✅ Notification for **{document_type} approval** setup successfully! 📩")
-                        else:
-                            st.error("❌ Failed to create Notification. Check prompt or ERP access.")
-
-                    
-                    # Detect Inventory & Supplier Related Actions
-                    if any(word in gpt_prompt.lower() for word in ["inventory", "item", "supplier", "stock"]):
-                        st.info("Detected inventory/supplier management request. Parsing details...")
-
-                        from gpt_parser import parse_inventory_prompt
-                        from erp_api import add_inventory_item, get_low_stock_items, add_supplier
-
-                        item_name, quantity, department_name, supplier_name, contact_number = parse_inventory_prompt(gpt_prompt)
-
-                        auth = (API_KEY, API_SECRET)
-
-                        if "item" in gpt_prompt.lower():
-                            if item_name and quantity:
-                                if st.checkbox(f"✅ Confirm adding Inventory Item: {item_name} (Qty: {quantity})?"):
-                                    result = add_inventory_item(API_URL, auth, item_name, quantity, department_name)
-                                    if "data" in result:
-                                        st.success(f"📦 Inventory item '{item_name}' added successfully!")
-                                    else:
-                                        st.error("❌ Failed to add inventory item. Check input details.")
-                                else:
-                                    st.warning("⚡ Please confirm before adding inventory item.")
-
-                        elif "supplier" in gpt_prompt.lower():
-                            if supplier_name:
-                                if st.checkbox(f"✅ Confirm adding Supplier: {supplier_name}?"):
-                                    result = add_supplier(API_URL, auth, supplier_name, contact_number)
-                                    if "data" in result:
-                                        st.success(f"🏢 Supplier '{supplier_name}' added successfully!")
-                                    else:
-                                        st.error("❌ Failed to add supplier. Check input details.")
-                                else:
-                                    st.warning("⚡ Please confirm before adding supplier.")
-
-                        elif "low stock" in gpt_prompt.lower():
-                            low_stock = get_low_stock_items(API_URL, auth)
-                            if low_stock:
-                                st.write("### Low Stock Items")
-                                st.dataframe(low_stock)
-                            else:
-                                st.warning("No low stock items found.")
-
-                    # Detect Dashboard/Reports Related Actions
-                    if "dashboard" in gpt_prompt.lower() or "report" in gpt_prompt.lower() or "summary" in gpt_prompt.lower():
-                        st.info("Detected report or dashboard request. Parsing details...")
-
-                        from gpt_parser import parse_dashboard_prompt
-                        from erp_api import generate_summary_report
-
-                        target_audience, report_type, frequency = parse_dashboard_prompt(gpt_prompt)
-
-                        auth = (API_KEY, API_SECRET)
-
-                        if st.button("📄 Generate Report Now"):
-                            with st.spinner("Generating report..."):
-                                summary = generate_summary_report(API_URL, auth)
-
-                                # Display the summary
-                                st.write("### 📋 Report Summary")
-                                st.json(summary)
-
-                                # Optionally download as Word document
-                                from docx import Document
-
-                                doc = Document()
-                                doc.add_heading('ERPNext Summary Report', 0)
-
-                                if target_audience:
-                                    doc.add_paragraph(f"Target Audience: {target_audience}")
-                                if frequency:
-                                    doc.add_paragraph(f"Frequency: {frequency}")
-
-                                doc.add_paragraph("Summary:")
-
-                                for key, value in summary.items():
-                                    doc.add_paragraph(f"{key}: {value}")
-
-                                report_filename = "erp_summary_report.docx"
-                                doc.save(report_filename)
-
-                                with open(report_filename, "rb") as file:
-                                    st.download_button(
-                                        label="📥 Download Summary Report",
-                                        data=file,
-                                        file_name=report_filename,
-                                        mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-                                    )
-
-                    
-                    
-                    # Detect Claim Creation or Query
-                    if "claim" in gpt_prompt.lower():
-                        st.info("Detected claim request. Parsing details...")
-
-                        from gpt_parser import parse_claim_prompt
-                        from erp_api import create_claim, get_claims
-
-                        project_name, claim_name, amount = parse_claim_prompt(gpt_prompt)
-
-                        auth = (API_KEY, API_SECRET)
-
-                        if "submit" in gpt_prompt.lower() or "create" in gpt_prompt.lower():
-                            # User wants to create a Claim
-                            if project_name and claim_name and amount:
-                                result = create_claim(API_URL, auth, project_name, claim_name, amount)
-                                if "data" in result:
-                                    st.success(f"📄 Claim '{claim_name}' for project '{project_name}' created successfully (RM {amount})!")
-                                else:
-                                    st.error("❌ Failed to create claim. Check input details.")
-                            else:
-                                st.error("❌ Could not detect project, claim name, or amount properly.")
-
-                        elif "due" in gpt_prompt.lower() or "status" in gpt_prompt.lower() or "list" in gpt_prompt.lower():
-                            # User wants to check claims
-                            claims = get_claims(API_URL, auth, project_name)
-
-                            if claims:
-                                st.write(f"### Claims for {project_name}")
-                                st.dataframe(claims)
-                            else:
-                                st.warning(f"No claims found for project {project_name}.")
-
-                                        
-                    
-                    
-                    # Detect Financial Automation (Management Fee or Profit Sharing)
-                    if ("management fee" in gpt_prompt.lower()) or ("profit sharing" in gpt_prompt.lower()) or ("profit rule" in gpt_prompt.lower()):
-                        st.info("Detected financial automation request. Parsing details...")
-
-                        from gpt_parser import parse_financial_prompt
-                        from erp_api import create_management_fee_rule, create_profit_sharing_rule
-
-                        action, department, role, amount = parse_financial_prompt(gpt_prompt)
-
-                        auth = (API_KEY, API_SECRET)
-
-                        if action == "management_fee":
-                            if department and amount:
-                                result = create_management_fee_rule(API_URL, auth, department, amount)
-                                if "data" in result:
-                                    st.success(f"💰 Management fee of RM {amount} set for {department} department!")
-                                else:
-                                    st.error("❌ Failed to create management fee rule. Check details.")
-                            else:
-                                st.error("❌ Could not detect department or amount for management fee setup.")
-
-                        elif action == "profit_sharing":
-                            if role and amount:
-                                # Assume department if missing (optional to improve later)
-                                department = department or "General"
-                                result = create_profit_sharing_rule(API_URL, auth, department, role, amount)
-                                if "data" in result:
-                                    st.success(f"🎯 Profit sharing rule: {amount}% to {role} set successfully!")
-                                else:
-                                    st.error("❌ Failed to create profit sharing rule. Check details.")
-                            else:
-                                st.error("❌ Could not detect role or percentage for profit sharing rule.")
-
-                                        
-                    # Detect PRF Creation
-                    if "prf" in gpt_prompt.lower() and ("create" in gpt_prompt.lower() or "submit" in gpt_prompt.lower()):
-                        st.info("Detected PRF creation request. Parsing details...")
-
-                        from gpt_parser import parse_prf_prompt
-                        from erp_api import create_prf
-
-                        project_name, item_name, quantity = parse_prf_prompt(gpt_prompt)
-
-                        auth = (API_KEY, API_SECRET)
-
-                        if project_name and item_name and quantity:
-                            result = create_prf(API_URL, auth, project_name, item_name, quantity)
-                            if "data" in result:
-                                st.success(f"📄 PRF created for {item_name} under {project_name} (Qty: {quantity}) successfully!")
-                            else:
-                                st.error("❌ Failed to create PRF. Check details.")
-                        else:
-                            st.error("❌ Could not detect project, item or quantity properly.")
-                   
-                    
-                    # Detect Pending PRF Listing
-                    if "list" in gpt_prompt.lower() and "pending prf" in gpt_prompt.lower():
-                        st.info("Detected request to list pending PRFs.")
 
-                        from erp_api import get_pending_prfs
+# Detect PRF Creation
+@handles("prf_create")
+def handle_prf_create(routed):
+    st.info("Detected PRF creation request. Parsing details...")
 
-                        auth = (API_KEY, API_SECRET)
+    from gpt_parser import parse_prf_prompt
+    from erp_api import create_prf
 
-                        # Try to detect department from text
-                        dept_match = re.search(r"for\s+([\w\s]+?)\s+department", gpt_prompt.lower())
-                        department_name = dept_match.group(1).strip().title() if dept_match else None
+    project_name, item_name, quantity = parse_prf_prompt(routed.text)
 
-                        pending_prfs = get_pending_prfs(API_URL, auth, department_name)
+    auth = (API_KEY, API_SECRET)
 
-                        if pending_prfs:
-                            st.write(f"### Pending PRFs{' for ' + department_name if department_name else ''}")
-                            st.dataframe(pending_prfs)
-                        else:
-                            st.warning("No pending PRFs found or unable to fetch records.")
+    if project_name and item_name and quantity:
+        result = create_prf(API_URL, auth, project_name, item_name, quantity)
+        if "data" in result:
+            st.success(f"📄 PRF created for {item_name} under {project_name} (Qty: {quantity}) successfully!")
+        else:
+            st.error("❌ Failed to create PRF. Check details.")
+    else:
+        st.error("❌ Could not detect project, item or quantity properly.")
 
-                    
-                    
-                    # Check if prompt mentions adding a user
-                    if "user" in gpt_prompt.lower() and ("add" in gpt_prompt.lower() or "create" in gpt_prompt.lower()):
-                        st.info("Detected user creation and role assignment request. Parsing details...")
 
-                        from gpt_parser import parse_user_assignment_prompt
-                        user_name, department_name, role_name = parse_user_assignment_prompt(gpt_prompt)
+# Detect Pending PRF Listing
+@handles("prf_list")
+def handle_prf_list(routed):
+    st.info("Detected request to list pending PRFs.")
 
-                        auth = (API_KEY, API_SECRET)
+    from erp_api import get_pending_prfs
 
-                        # Assume email based on name for demo (you can improve this later)
-                        email = f"{user_name.lower()}@example.com"
+    auth = (API_KEY, API_SECRET)
 
-                        # Step 1: Create the User
-                        user_result = create_user(API_URL, auth, user_name, email)
+    # Try to detect department from text
+    dept_match = re.search(r"for\s+([\w\s]+?)\s+department", routed.normalized)
+    department_name = dept_match.group(1).strip().title() if dept_match else None
 
-                        if "data" in user_result:
-                            st.success(f"✅ User '{user_name}' created successfully!")
+    pending_prfs = get_pending_prfs(API_URL, auth, department_name)
 
-                            # Step 2: Assign Role
-                            role_result = assign_role_to_user(API_URL, auth, email, role_name)
+    if pending_prfs:
+        st.write(f"### Pending PRFs{' for ' + department_name if department_name else ''}")
+        st.dataframe(pending_prfs)
+    else:
+        st.warning("No pending PRFs found or unable to fetch records.")
 
-                            if "data" in role_result:
-                                st.success(f"🎯 Role '{role_name}' assigned to '{user_name}' successfully!")
-                            else:
-                                st.error("❌ Failed to assign role. Check role name or permissions.")
 
-                        else:
-                            st.error("❌ Failed to create user. User may already exist or check API access.")
+# Check if prompt mentions adding a user
+@handles("user")
+def handle_user(routed):
+    st.info("Detected user creation and role assignment request. Parsing details...")
 
-                    
-                    # Check if prompt mentions BOQ creation
-                    if "boq" in gpt_prompt.lower() and ("create" in gpt_prompt.lower() or "add" in gpt_prompt.lower()):
-                        st.info("Detected BOQ creation request. Parsing details...")
+    from gpt_parser import parse_user_assignment_prompt
+    from erp_api import create_user, assign_role_to_user
+    user_name, department_name, role_name = parse_user_assignment_prompt(routed.text)
 
-                        from gpt_parser import parse_boq_creation_prompt
-                        budget_amount_rm, item_name, quantity, price = parse_boq_creation_prompt(gpt_prompt)
+    auth = (API_KEY, API_SECRET)
 
-                        print("👉 DEBUG: Project Name parsed:", project_name)
-                        print("👉 DEBUG: Item Name parsed:", item_name)
-                        print("👉 DEBUG: Quantity parsed:", quantity)
-                        print("👉 DEBUG: Price parsed:", price)
+    # Assume email based on name for demo (you can improve this later)
+    email = f"{user_name.lower()}@example.com"
 
-                        auth = (API_KEY, API_SECRET)
+    # Step 1: Create the User
+    user_result = create_user(API_URL, auth, user_name, email)
 
-                        from erp_api import create_boq_entry
+    if "data" in user_result:
+        st.success(f"✅ User '{user_name}' created successfully!")
 
-                        # ✅ If we reach here, project exists and is valid → Create BOQ
-                        boq_result = create_boq_entry(API_URL, auth, budget_amount_rm, item_name, quantity, price)
-                        print("🧠 Project API Response:", boq_result)
+        # Step 2: Assign Role
+        role_result = assign_role_to_user(API_URL, auth, email, role_name)
 
-                        if "data" in boq_result:
-                            boq_data = boq_result["data"]
-                            st.success(
-                                f"📦 BOQ item **'{boq_data.get('boq_item_description')}'** created successfully '**!"
-                            )
-                        else:
-                            st.error("❌ Failed to create BOQ item. Check prompt or ERP access.")
+        if "data" in role_result:
+            st.success(f"🎯 Role '{role_name}' assigned to '{user_name}' successfully!")
+        else:
+            st.error("❌ Failed to assign role. Check role name or permissions.")
 
-                                
-                               
+    else:
+        st.error("❌ Failed to create user. User may already exist or check API access.")
 
 
-                           
-                    
-                    
-                    # Check if prompt mentions department creation
-                    if "department" in gpt_prompt.lower() and ("create" in gpt_prompt.lower() or "add" in gpt_prompt.lower()):
-                        st.info("Detected department creation request. Parsing details...")
+# Check if prompt mentions BOQ creation
+@handles("boq_create")
+def handle_boq_create(routed):
+    st.info("Detected BOQ creation request. Parsing details...")
 
-                        from gpt_parser import parse_department_prompt
-                        
-                        department_name, parent_department = parse_department_prompt(gpt_prompt)
-                        print("👉 DEBUG: Department Name parsed:", department_name)
-                        print("👉 DEBUG: Parent Department parsed:", parent_department)
+    from gpt_parser import extracted_or_parse
+    boq_entries = extracted_or_parse(routed.extracted, "boq_create", routed.text)
 
-                        auth = (API_KEY, API_SECRET)
-                        company_name = "S&I Urban Designers"  # <-- Your company
+    auth = (API_KEY, API_SECRET)
 
-                        from erp_api import create_department
-                        department_result = create_department(API_URL, API_KEY, API_SECRET, department_name, company_name, parent_department)
+    from erp_api import create_boq_entry
 
-                        if "data" in department_result:
-                            department_data = department_result["data"]
-                            st.success(
-                                f"🏢 Department **'{department_data.get('department_name')}'** created successfully under **'{department_data.get('parent_department')}'**!"
-                            )
-                        else:
-                            st.error("❌ Failed to create department. Check prompt or ERP access.")
-
-
-
-                    
-                    # Detect Project Creation or Assignment
-                    if "project" in gpt_prompt.lower() and ("create" in gpt_prompt.lower() or "assign" in gpt_prompt.lower()):
-                        st.info("Detected project management request. Parsing details...")
-
-                        from gpt_parser import parse_project_prompt
-                        from erp_api import create_project, assign_project_roles
-
-                        project_name, expected_end_date, estimated_costing, assignments = parse_project_prompt(gpt_prompt)
-                        auth = (API_KEY, API_SECRET)
-
-                        # Show parsed project data
-                        if project_name:
-                            st.info(f"🧾 Parsed Project:\n• Name: {project_name}\n• End Date: {expected_end_date or 'N/A'}\n• Cost: {estimated_costing or 'N/A'}")
-
-                        # Handle project creation
-                        if "create" in gpt_prompt.lower():
-                            if not project_name:
-                                st.error("❌ Project name is missing. Please rephrase your instruction.")
-                            else: 
-                                result = create_project(API_URL, auth, project_name, expected_end_date, estimated_costing)
-                                print("🧠 Project API Response:", result)
-
-                                if result and "data" in result:
-                                    st.success(f"🏗️ Project '{project_name}' created successfully!")
-                                else:
-                                    st.error("❌ Failed to create project. Check input details or ERP connection.")
-
-                        
-
-
-
-                    
-                    # Detect Vehicle/Asset Related Actions
-                    if "vehicle" in gpt_prompt.lower() or "asset" in gpt_prompt.lower():
-                        st.info("Detected vehicle/asset management request. Parsing details...")
-
-                        from gpt_parser import parse_vehicle_prompt
-                        from erp_api import add_vehicle, schedule_vehicle_maintenance, get_all_assets
-
-                        vehicle_name, department_name, maintenance_interval_months = parse_vehicle_prompt(gpt_prompt)
-
-                        auth = (API_KEY, API_SECRET)
-
-                        if "add" in gpt_prompt.lower() or "new vehicle" in gpt_prompt.lower():
-                            if vehicle_name:
-                                if st.checkbox(f"✅ Confirm adding Vehicle: {vehicle_name}?"):
-                                    result = add_vehicle(API_URL, auth, vehicle_name, department_name)
-                                    if "data" in result:
-                                        st.success(f"🚗 Vehicle '{vehicle_name}' added successfully!")
-                                    else:
-                                        st.error("❌ Failed to add vehicle. Check input details.")
-                                else:
-                                    st.warning("⚡ Please confirm before adding vehicle.")
-
-                        elif "schedule" in gpt_prompt.lower() and "maintenance" in gpt_prompt.lower():
-                            if vehicle_name and maintenance_interval_months:
-                                if st.checkbox(f"✅ Confirm scheduling maintenance every {maintenance_interval_months} months for {vehicle_name}?"):
-                                    result = schedule_vehicle_maintenance(API_URL, auth, vehicle_name, maintenance_interval_months)
-                                    if "data" in result:
-                                        st.success(f"🛠️ Maintenance scheduled for '{vehicle_name}' every {maintenance_interval_months} months!")
-                                    else:
-                                        st.error("❌ Failed to schedule maintenance.")
-                                else:
-                                    st.warning("⚡ Please confirm before scheduling maintenance.")
-
-                        elif "list" in gpt_prompt.lower() and ("vehicles" in gpt_prompt.lower() or "assets" in gpt_prompt.lower()):
-                            assets = get_all_assets(API_URL, auth)
-                            if assets:
-                                st.write("### Company Vehicles/Assets")
-                                st.dataframe(assets)
-                            else:
-                                st.warning("No vehicles/assets found.")
-
-                    
-                    
-                    # Detect HR Related Actions (Contract, Salary Advance, Leave)
-                    if any(word in gpt_prompt.lower() for word in ["contract", "salary advance", "leave balance", "track leave"]):
-                        st.info("Detected HR-related request. Parsing details...")
-
-                        from gpt_parser import parse_hr_prompt
-                        from erp_api import generate_contract, get_salary_advances, get_leave_balance
-
-                        employee_name, monthly_salary, start_date = parse_hr_prompt(gpt_prompt)
-
-                        auth = (API_KEY, API_SECRET)
-
-                        if "contract" in gpt_prompt.lower():
-                            if employee_name and monthly_salary and start_date:
-                                if st.checkbox(f"✅ Confirm contract generation for {employee_name}?"):
-                                    result = generate_contract(API_URL, auth, employee_name, monthly_salary, start_date)
-                                    if "data" in result:
-                                        st.success(f"📝 Employment contract created for {employee_name} (RM {monthly_salary}/month) starting {start_date}!")
-                                    else:
-                                        st.error("❌ Failed to create contract. Check input details.")
-                                else:
-                                    st.warning("⚡ Please confirm before generating contract.")
-
-                        elif "salary advance" in gpt_prompt.lower():
-                            if employee_name:
-                                advances = get_salary_advances(API_URL, auth, employee_name)
-                                if advances:
-                                    st.write(f"### Salary Advances for {employee_name}")
-                                    st.dataframe(advances)
-                                else:
-                                    st.warning(f"No salary advance records found for {employee_name}.")
-                            else:
-                                advances = get_salary_advances(API_URL, auth)
-                                if advances:
-                                    st.write("### All Salary Advances")
-                                    st.dataframe(advances)
-                                else:
-                                    st.warning("No salary advance records found.")
-
-                        elif "leave" in gpt_prompt.lower():
-                            if employee_name:
-                                leaves = get_leave_balance(API_URL, auth, employee_name)
-                                if leaves:
-                                    st.write(f"### Leave Balance for {employee_name}")
-                                    st.dataframe(leaves)
-                                else:
-                                    st.warning(f"No leave balance records found for {employee_name}.")
-                            else:
-                                st.warning("Please specify an employee name for leave balance checking.")
-
-                    
-                    
-                    # Check if prompt mentions role creation
-                    if "create" in gpt_prompt.lower() and "role" in gpt_prompt.lower():
-                        st.info("Detected role creation request. Parsing details...")
-
-                        from gpt_parser import parse_role_permission_prompt
-                        role_name, allowed_doctypes, restricted_doctypes = parse_role_permission_prompt(gpt_prompt)
-
-                        auth = (API_KEY, API_SECRET)
-
-                        # Create the Role
-                        role_result = create_role(API_URL, auth, role_name)
-                        if "data" in role_result:
-                            st.success(f"✅ Role '{role_name}' created successfully!")
-
-                            # Set Permissions for Allowed Doctypes
-                            for doctype in allowed_doctypes:
-                                perm_result = set_permission(API_URL, auth, doctype, role_name, read=1, write=1, create=1)
-                                if "data" in perm_result:
-                                    st.success(f"✅ Role **{role_name}** created and permissions assigned! 🎯")
-
-                            # Optionally: You can add logic later to restrict permissions if needed
-                            if restricted_doctypes:
-                                st.warning(f"ℹ️ Restricted Doctypes detected: {', '.join(restricted_doctypes)}. Please manually restrict via Permission Manager (recommended for security).")
+    for project_name, item_name, quantity, price in boq_entries:
+        print("👉 DEBUG: Project parsed:", project_name)
+        print("👉 DEBUG: Item Name parsed:", item_name)
+        print("👉 DEBUG: Quantity parsed:", quantity)
+        print("👉 DEBUG: Price parsed:", price)
 
-                        else:
-                            st.error("❌ Failed to create Role. Check prompt or ERP access.")
+        # ✅ If we reach here, project exists and is valid → Create BOQ
+        boq_result = create_boq_entry(API_URL, auth, project_name, item_name, quantity, price)
+        print("🧠 Project API Response:", boq_result)
 
-                    
-                    
-                    
-                    # Check if prompt mentions workflow creation
-                    if "approval workflow" in gpt_prompt.lower() or "create workflow" in gpt_prompt.lower():
-                        st.info("Detected workflow creation request. Parsing details...")
+        if "data" in boq_result:
+            boq_data = boq_result["data"]
+            st.success(
+                f"📦 BOQ item **'{boq_data.get('boq_item_description')}'** created successfully '**!"
+            )
+        else:
+            st.error("❌ Failed to create BOQ item. Check prompt or ERP access.")
 
-                        # Parse workflow
-                        from gpt_parser import parse_workflow_prompt
-                        workflow_name, document_type, states, transitions = parse_workflow_prompt(gpt_prompt)
 
-                        # Create workflow
-                        auth = (API_KEY, API_SECRET)
-                        result = create_workflow(API_URL, auth, workflow_name, document_type, states, transitions)
+# Check if prompt mentions department creation
+@handles("department")
+def handle_department(routed):
+    st.info("Detected department creation request. Parsing details...")
 
-                        if "data" in result:
-                            st.success(f"✅ Successfully created Workflow: **{workflow_name}** for {document_type}. 🚀")
-                        else:
-                            st.error("❌ Failed to create workflow. Check prompt or ERP access.")
+    from gpt_parser import extracted_or_parse
+
+    department_name, parent_department = extracted_or_parse(routed.extracted, "department", routed.text)
+    print("👉 DEBUG: Department Name parsed:", department_name)
+    print("👉 DEBUG: Parent Department parsed:", parent_department)
+
+    auth = (API_KEY, API_SECRET)
+
+    from erp_api import create_department
+    from service import COMPANY_NAME
+    department_result = create_department(API_URL, API_KEY, API_SECRET, department_name, COMPANY_NAME, parent_department)
+
+    if "data" in department_result:
+        department_data = department_result["data"]
+        st.success(
+            f"🏢 Department **'{department_data.get('department_name')}'** created successfully under **'{department_data.get('parent_department')}'**!"
+        )
+    else:
+        st.error("❌ Failed to create department. Check prompt or ERP access.")
+
+
+# Detect Project Creation or Assignment
+@handles("project")
+def handle_project(routed):
+    st.info("Detected project management request. Parsing details...")
+
+    from gpt_parser import extracted_or_parse
+    from erp_api import create_project, assign_project_roles
+
+    project_name, expected_end_date, estimated_costing, assignments = extracted_or_parse(routed.extracted, "project", routed.text)
+    auth = (API_KEY, API_SECRET)
+
+    # Show parsed project data
+    if project_name:
+        st.info(f"🧾 Parsed Project:\n• Name: {project_name}\n• End Date: {expected_end_date or 'N/A'}\n• Cost: {estimated_costing or 'N/A'}")
 
+    # Handle project creation
+    if routed.has("create"):
+        if not project_name:
+            st.error("❌ Project name is missing. Please rephrase your instruction.")
+        else: 
+            result = create_project(API_URL, auth, project_name, expected_end_date, estimated_costing)
+            print("🧠 Project API Response:", result)
+
+            if result and "data" in result:
+                st.success(f"🏗️ Project '{project_name}' created successfully!")
+            else:
+                st.error("❌ Failed to create project. Check input details or ERP connection.")
+
+
+# Detect Vehicle/Asset Related Actions
+@handles("vehicle")
+def handle_vehicle(routed):
+    st.info("Detected vehicle/asset management request. Parsing details...")
+
+    from gpt_parser import parse_vehicle_prompt
+    from erp_api import add_vehicle, schedule_vehicle_maintenance, get_all_assets
+
+    vehicle_name, department_name, maintenance_interval_months = parse_vehicle_prompt(routed.text)
+
+    auth = (API_KEY, API_SECRET)
+
+    if routed.has("add", "new vehicle"):
+        if vehicle_name:
+            if st.checkbox(f"✅ Confirm adding Vehicle: {vehicle_name}?"):
+                result = add_vehicle(API_URL, auth, vehicle_name, department_name)
+                if "data" in result:
+                    st.success(f"🚗 Vehicle '{vehicle_name}' added successfully!")
+                else:
+                    st.error("❌ Failed to add vehicle. Check input details.")
+            else:
+                st.warning("⚡ Please confirm before adding vehicle.")
+
+    elif routed.has("schedule") and routed.has("maintenance"):
+        if vehicle_name and maintenance_interval_months:
+            if st.checkbox(f"✅ Confirm scheduling maintenance every {maintenance_interval_months} months for {vehicle_name}?"):
+                result = schedule_vehicle_maintenance(API_URL, auth, vehicle_name, maintenance_interval_months)
+                if "data" in result:
+                    st.success(f"🛠️ Maintenance scheduled for '{vehicle_name}' every {maintenance_interval_months} months!")
+                else:
+                    st.error("❌ Failed to schedule maintenance.")
+            else:
+                st.warning("⚡ Please confirm before scheduling maintenance.")
+
+    elif routed.has("list") and routed.has("vehicles", "assets"):
+        assets = get_all_assets(API_URL, auth)
+        if assets:
+            st.write("### Company Vehicles/Assets")
+            st.dataframe(assets)
+        else:
+            st.warning("No vehicles/assets found.")
+
+
+# Detect HR Related Actions (Contract, Salary Advance, Leave)
+@handles("hr")
+def handle_hr(routed):
+    st.info("Detected HR-related request. Parsing details...")
+
+    from gpt_parser import parse_hr_prompt
+    from erp_api import generate_contract, get_salary_advances, get_leave_balance
+
+    employee_name, monthly_salary, start_date = parse_hr_prompt(routed.text)
+
+    auth = (API_KEY, API_SECRET)
+
+    if routed.has("contract"):
+        if employee_name and monthly_salary and start_date:
+            if st.checkbox(f"✅ Confirm contract generation for {employee_name}?"):
+                result = generate_contract(API_URL, auth, employee_name, monthly_salary, start_date)
+                if "data" in result:
+                    st.success(f"📝 Employment contract created for {employee_name} (RM {monthly_salary}/month) starting {start_date}!")
+                else:
+                    st.error("❌ Failed to create contract. Check input details.")
+            else:
+                st.warning("⚡ Please confirm before generating contract.")
+
+    elif routed.has("salary advance"):
+        if employee_name:
+            advances = get_salary_advances(API_URL, auth, employee_name)
+            if advances:
+                st.write(f"### Salary Advances for {employee_name}")
+                st.dataframe(advances)
+            else:
+                st.warning(f"No salary advance records found for {employee_name}.")
+        else:
+            advances = get_salary_advances(API_URL, auth)
+            if advances:
+                st.write("### All Salary Advances")
+                st.dataframe(advances)
+            else:
+                st.warning("No salary advance records found.")
+
+    elif routed.has("leave"):
+        if employee_name:
+            leaves = get_leave_balance(API_URL, auth, employee_name)
+            if leaves:
+                st.write(f"### Leave Balance for {employee_name}")
+                st.dataframe(leaves)
+            else:
+                st.warning(f"No leave balance records found for {employee_name}.")
+        else:
+            st.warning("Please specify an employee name for leave balance checking.")
+
+
+# Check if prompt mentions role creation
+@handles("role")
+def handle_role(routed):
+    st.info("Detected role creation request. Parsing details...")
+
+    from gpt_parser import parse_role_permission_prompt
+    from erp_api import create_role
+    role_name, allowed_doctypes, restricted_doctypes = parse_role_permission_prompt(routed.text)
+
+    auth = (API_KEY, API_SECRET)
+
+    # Create the Role
+    role_result = create_role(API_URL, auth, role_name)
+    if "data" in role_result:
+        st.success(f"✅ Role '{role_name}' created successfully!")
+
+        # Set Permissions for Allowed Doctypes (all doctypes in parallel)
+        from erp_api_async import set_permissions_concurrently
+        perm_results = set_permissions_concurrently(API_URL, auth, allowed_doctypes, role_name, read=1, write=1, create=1)
+        for doctype, perm_result in perm_results.items():
+            if "data" in perm_result:
+                st.success(f"✅ Role **{role_name}** created and permissions assigned! 🎯")
+
+        # Optionally: You can add logic later to restrict permissions if needed
+        if restricted_doctypes:
+            st.warning(f"ℹ️ Restricted Doctypes detected: {', '.join(restricted_doctypes)}. Please manually restrict via Permission Manager (recommended for security).")
+
+    else:
+        st.error("❌ Failed to create Role. Check prompt or ERP access.")
+
+
+# Check if prompt mentions workflow creation
+@handles("workflow")
+def handle_workflow(routed):
+    st.info("Detected workflow creation request. Parsing details...")
+
+    # Parse workflow
+    from gpt_parser import parse_workflow_prompt
+    from erp_api import create_workflow
+    workflow_name, document_type, states, transitions = parse_workflow_prompt(routed.text)
+
+    # Create workflow
+    auth = (API_KEY, API_SECRET)
+    result = create_workflow(API_URL, auth, workflow_name, document_type, states, transitions)
+
+    if "data" in result:
+        st.success(f"✅ Successfully created Workflow: **{workflow_name}** for {document_type}. 🚀")
+    else:
+        st.error("❌ Failed to create workflow. Check prompt or ERP access.")
+
+
+st.set_page_config(page_title="ERPNext Smart Assistant", layout="wide")
+
+if "authenticated" not in st.session_state:
+    st.session_state.authenticated = False
+
+if not st.session_state.authenticated:
+    st.title("🔐 ERPNext Assistant Login")
+    password = st.text_input("Enter Password", type="password")
+    if st.button("Login"):
+        if check_login(password):
+            st.session_state.authenticated = True
+            st.rerun()
+        else:
+            st.error("Incorrect password. Please try again.")
+
+else:
+    st.title("🤖 ERPNext Smart Assistant (Powered by GPT)")
+    st.write("Welcome! This intelligent assistant allows you to: Create and manage Doctypes, Set up Workflows and Roles, Configure Notifications and Reminders, Analyze ERP data effortlessly and many more")
+
+    action = st.radio("Choose an action", ["Ask GPT for Help", "Create Doctype Directly", "List and Explore Available Doctypes", "Bulk Import from CSV/XLSX", "Batch Instructions from File", "📚 Documentation"])
+
+    if action == "Ask GPT for Help":
+        gpt_prompt = st.text_area("Ask a question or request guidance:", height=150)
+        advice_mode = st.selectbox(
+            "GPT advice for recognised action commands",
+            [ADVICE_SKIP, ADVICE_CONCURRENT, ADVICE_FIRST],
+            help="Commands like 'Create a PRF for project X, item Y, quantity 10' run straight away; the general GPT answer is optional."
+        )
+
+        if st.button("Ask GPT"):
+            if gpt_prompt:
+                with st.spinner("GPT is thinking..."):
+                    # Route the prompt once and run only the matching action handlers
+                    routed = route(gpt_prompt)
+
+                    if not routed.intents:
+                        # A question (or an instruction the keywords missed): answer it and
+                        # let GPT classify it at the same time
+                        with ThreadPoolExecutor(max_workers=1) as pool:
+                            gpt_intents = pool.submit(classify_with_gpt, gpt_prompt)
+                            stream_gpt_answer(gpt_prompt)
+                            routed.intents, routed.source = gpt_intents.result(), "gpt"
+                        run_actions(routed)
+
+                    elif advice_mode == ADVICE_CONCURRENT:
+                        # Execute the command while the advisory answer is generated in the background
+                        with ThreadPoolExecutor(max_workers=1) as pool:
+                            advice = pool.submit(ask_gpt, gpt_prompt)
+                            run_actions(routed)
+                            try:
+                                st.success(advice.result())
+                            except GPTError as e:
+                                st.warning(f"⚠️ GPT advice unavailable: {e}")
+
+                    elif advice_mode == ADVICE_FIRST:
+                        stream_gpt_answer(gpt_prompt)
+                        run_actions(routed)
+
+                    else:
+                        st.caption("⚡ Action command detected, running it directly (general GPT advice skipped).")
+                        run_actions(routed)
             else:
                 st.error("Please enter a question or instruction.")
 
@@ -563,6 +607,9 @@ else:
 
         if st.button("Setup Reminder"):
             if reminder_prompt:
+                from gpt_parser import parse_reminder_prompt
+                from erp_api import create_scheduled_reminder
+
                 with st.spinner("Parsing and setting up scheduled reminder..."):
                     document_type, condition, message, cron = parse_reminder_prompt(reminder_prompt)
 
@@ -585,6 +632,9 @@ else:
             if not prompt:
                 st.error("Please enter a prompt.")
             else:
+                from gpt_parser import parse_doctype_prompt
+                from erp_api import create_erpnext_doctype
+
                 with st.spinner("Parsing and creating Doctype..."):
                     doctype_name, fields = parse_doctype_prompt(prompt)
                     st.write("🛠 Parsed Doctype Name:", doctype_name)
@@ -597,6 +647,8 @@ else:
                         st.error("❌ Failed to create Doctype. Check the prompt or API access.")
 
     elif action == "List and Explore Available Doctypes":
+        from erp_api import get_all_doctypes, get_records_for_doctype
+
         with st.spinner("Fetching available Doctypes..."):
             auth = (API_KEY, API_SECRET)
             doctypes = get_all_doctypes(API_URL, auth)
@@ -605,7 +657,13 @@ else:
 
                 if selected_doctype:
                     with st.spinner(f"Fetching records for {selected_doctype}..."):
-                        records = get_records_for_doctype(API_URL, auth, selected_doctype)
+                        from requests.exceptions import RequestException
+
+                        try:
+                            records = get_records_for_doctype(API_URL, auth, selected_doctype)
+                        except RequestException as e:
+                            st.error(f"❌ Could not fetch all {selected_doctype} records: {e}")
+                            st.stop()
                         if records:
                             st.write(f"### Records for {selected_doctype}")
                             st.dataframe(records)
@@ -615,13 +673,24 @@ else:
                                 boq_question = st.text_input("Optional: Ask about BOQ usage (e.g., 'Show balance for Cement in Project ABC')")
 
                                 if boq_question:
+                                    from boq_parser import parse_boq_request
+                                    from boq_index import get_boq_index
+
                                     action, project_name, boq_item = parse_boq_request(boq_question)
+                                    boq_index = get_boq_index(records)
 
                                     if action == "show_balance":
                                         if project_name and boq_item:
-                                            matching = [r for r in records if r.get("project_name", "").lower() == project_name.lower() and boq_item.lower() in r.get("boq_item_description", "").lower()]
-                                            if matching:
+                                            lookup = boq_index.balance(project_name, boq_item)
+                                            matching = lookup["matches"]
+                                            if len(matching) == 1:
                                                 st.success(f"Balance for {boq_item} in {project_name}: {matching[0].get('balance_amount', 'N/A')}")
+                                            elif matching:
+                                                st.success(f"Total balance for {boq_item} in {project_name}: {lookup['total_balance']:,.2f} ({len(matching)} BOQ lines)")
+                                                st.dataframe([
+                                                    {"BOQ Item": r.get("boq_item_description"), "Balance": r.get("balance_amount")}
+                                                    for r in matching
+                                                ])
                                             else:
                                                 st.warning(f"No matching BOQ item found for {boq_item} in {project_name}.")
                                         else:
@@ -629,7 +698,7 @@ else:
 
                                     elif action == "list_boq_items":
                                         if project_name:
-                                            project_boqs = [r for r in records if r.get("project_name", "").lower() == project_name.lower()]
+                                            project_boqs = boq_index.items(project_name)
                                             if project_boqs:
                                                 st.write(f"BOQ Items for {project_name}:")
                                                 for boq in project_boqs:
@@ -639,23 +708,58 @@ else:
                                         else:
                                             st.warning("Could not detect project name correctly.")
 
+                                with st.expander("📊 BOQ Budget Analytics"):
+                                    from boq_analytics import analyze_frame
+                                    from boq_index import get_boq_index
+
+                                    analytics = analyze_frame(get_boq_index(records).frame)
+                                    totals = analytics["totals"]
+                                    col1, col2, col3, col4 = st.columns(4)
+                                    col1.metric("Budget (RM)", f"{totals['budget_amount_rm']:,.2f}")
+                                    col2.metric("Used (RM)", f"{totals['used_amount']:,.2f}")
+                                    col3.metric("Utilisation", f"{totals['utilisation_pct']:.1f}%" if totals["utilisation_pct"] is not None else "N/A")
+                                    col4.metric("Overrun Lines", totals["overrun_lines"])
+
+                                    st.write("**Per-project totals**")
+                                    st.dataframe(analytics["projects"])
+                                    if not analytics["overruns"].empty:
+                                        st.write("**Lines over budget**")
+                                        st.dataframe(analytics["overruns"])
+                                    st.write("**Top budget consumers**")
+                                    st.dataframe(analytics["top"])
+
                             
                             
                             
                             custom_question = st.text_area("Optional: Ask GPT a specific question about these records", placeholder="e.g., Find all requests above $10,000")
 
                             if st.button("Analyze Records with GPT"):
-                                record_text = "\n".join([str(record) for record in records])
-                                if custom_question.strip():
-                                    query_prompt = f"{custom_question}\n\nHere are the records:\n{record_text}"
-                                else:
-                                    query_prompt = f"Analyze the following ERPNext {selected_doctype} records and summarize any important insights or risks you detect:\n\n{record_text}"
+                                from record_analysis import build_analysis
+                                from record_serializer import token_report
 
                                 with st.spinner("GPT is analyzing the records..."):
-                                    analysis = ask_gpt(query_prompt)
-                                    st.success(analysis)
+                                    # Large record sets are summarized batch by batch in parallel, then merged
+                                    progress_bar = st.empty()
+
+                                    def show_progress(done, total):
+                                        progress_bar.progress(done / total, text=f"Analyzed batch {done} of {total}")
+
+                                    tokens = token_report(records)
+                                    st.caption(f"🔢 {tokens['records']} records → {tokens['compact_tokens']} prompt tokens (vs {tokens['naive_tokens']} as raw records)")
+
+                                    try:
+                                        system_message, query_prompt = build_analysis(records, custom_question, selected_doctype, on_progress=show_progress)
+                                    except GPTError as e:
+                                        st.error(f"❌ OpenAI error: {e}")
+                                        st.stop()
+                                    progress_bar.empty()
+                                    analysis = stream_gpt_answer(query_prompt, system_message)
+                                    if analysis is None:
+                                        st.stop()
 
                                     # Download option
+                                    from docx import Document
+
                                     doc = Document()
                                     doc.add_heading("GPT Analysis Report", 0)
                                     doc.add_paragraph(analysis)
@@ -674,6 +778,72 @@ else:
             else:
                 st.warning("Couldn't fetch Doctypes or no access.")
 
+    elif action == "Bulk Import from CSV/XLSX":
+        from bulk_import import IMPORTERS, read_rows, validate_rows, run_import
+
+        import_kind = st.selectbox("What are you importing?", list(IMPORTERS))
+        required_columns = IMPORTERS[import_kind][1]
+        st.caption(f"Required columns: {', '.join(required_columns)}")
+
+        uploaded_file = st.file_uploader("Upload a CSV or Excel file", type=["csv", "xlsx"])
+
+        if uploaded_file:
+            rows = read_rows(uploaded_file.name, uploaded_file.getvalue())
+            valid_rows, row_errors = validate_rows(import_kind, rows)
+
+            st.write(f"### Preview ({len(valid_rows)} valid of {len(rows)} rows)")
+            st.dataframe(valid_rows[:100])
+
+            if row_errors:
+                st.warning(f"⚠️ {len(row_errors)} rows will be skipped:")
+                st.dataframe([{"line": line, "error": error} for line, error in row_errors])
+
+            if valid_rows and st.button(f"Import {len(valid_rows)} {import_kind}"):
+                with st.spinner(f"Importing {import_kind} in bulk..."):
+                    auth = (API_KEY, API_SECRET)
+                    result = run_import(API_URL, auth, import_kind, valid_rows)
+
+                if not result["failed"]:
+                    st.success(f"✅ Imported {len(result['inserted'])} {import_kind} successfully!")
+                else:
+                    st.warning(f"⚠️ Imported {len(result['inserted'])} {import_kind}, {len(result['failed'])} failed.")
+                    st.dataframe([{"document": str(f["doc"]), "error": f["error"][:300]} for f in result["failed"]])
+
+                st.write("Chunks sent to ERPNext:")
+                st.dataframe(result["chunks"])
+
+    elif action == "Batch Instructions from File":
+        from batch_prompts import read_instructions, run_batch
+
+        st.caption("One instruction per line (TXT) or an \"instruction\" column (CSV). "
+                   "Supported: project, BOQ, PRF and claim creation, inventory items and suppliers.")
+
+        uploaded_file = st.file_uploader("Upload a TXT or CSV file of instructions", type=["txt", "csv"])
+
+        if uploaded_file:
+            instructions = read_instructions(uploaded_file.name, uploaded_file.getvalue())
+
+            st.write(f"### Preview ({len(instructions)} instructions)")
+            st.dataframe([{"line": n, "instruction": text} for n, text in instructions[:100]])
+
+            if instructions and st.button(f"Run {len(instructions)} instructions"):
+                progress = st.progress(0.0, text="Parsing instructions...")
+
+                def show_progress(done, total):
+                    progress.progress(done / total, text=f"Parsed {done} of {total} instructions")
+
+                auth = (API_KEY, API_SECRET)
+                with st.spinner("Parsing instructions and sending them to ERPNext in bulk..."):
+                    results = run_batch(API_URL, auth, instructions, on_progress=show_progress)
+                progress.progress(1.0, text="Done")
+
+                created = sum(row["status"] == "✅ Created" for row in results)
+                if created == len(results):
+                    st.success(f"✅ All {created} actions completed successfully!")
+                else:
+                    st.warning(f"⚠️ {created} of {len(results)} actions completed; see the table for the rest.")
+                st.dataframe(results)
+
     elif action == "📚 Documentation":
         st.title("📚 ERPNext Smart Assistant - Full User Guide")
 
@@ -702,6 +872,7 @@ else:
         - "Generate monthly financial report for Director."
         - Click the button to send your instruction.
         - GPT will understand, process, and execute your request live!
+        - Recognised action commands run straight away. Use "GPT advice for recognised action commands" to also get a general GPT answer, either alongside the result or before it.
 
         **Best Tip:**  
         Be as clear as possible when typing instructions for best results!
@@ -737,6 +908,35 @@ else:
         If records are not showing, ensure that ERP permissions are correctly set for your API user.
         """)
 
+        st.header("📥 Bulk Import from CSV/XLSX")
+        st.write("""
+        Load hundreds of BOQ lines, PRFs, inventory items, suppliers or users in one go.
+
+        **How to Use:**
+        1. Select "Bulk Import from CSV/XLSX" and choose what you are importing.
+        2. Upload a CSV or Excel file with the required columns shown on screen (e.g. Item Name, Quantity, Price).
+        3. Check the preview and skipped rows, then click "Import".
+        4. Rows are sent to ERPNext in batches; any rows ERPNext rejects are listed with the reason.
+
+        **Best Tip:**  
+        Column names are matched case-insensitively, so "Item Name" and "item_name" both work.
+        """)
+
+        st.header("🗂️ Batch Instructions from File")
+        st.write("""
+        Run a whole list of chat-style instructions at once.
+
+        **How to Use:**
+        1. Select "Batch Instructions from File".
+        2. Upload a TXT file with one instruction per line, or a CSV with an "instruction" column.
+        3. Check the preview, then click "Run".
+        4. Instructions are parsed in parallel; the resulting records are created in ERPNext in bulk, grouped by type.
+        5. The results table shows, per line, what was created, skipped or rejected and why.
+
+        **Best Tip:**  
+        Lines starting with # are ignored, so you can keep notes in the file.
+        """)
+
         st.header("🏢 Department and Role Setup")
         st.write("""
         Manage departments and assign users automatically.
@@ -4,9 +4,9 @@ def check_login(password_input: str) -> bool:
     For now, the correct password is loaded from environment variables.
     """
     import os
-    from dotenv import load_dotenv
+    from config import load_env
 
-    load_dotenv()
+    load_env()
     correct_password = os.getenv("APP_PASSWORD")
 
     if password_input == correct_password:
@@ -0,0 +1,200 @@
+import csv
+import io
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from erp_api import (
+    boq_entry_doc, claim_doc, insert_many, inventory_item_doc, prf_doc, project_doc, supplier_doc
+)
+from gpt_client import MAX_CONCURRENCY
+from gpt_parser import (
+    STRUCTURED_INTENTS, extracted_or_parse, parse_claim_prompt, parse_inventory_prompt,
+    parse_multi_intent_prompt, parse_prf_prompt
+)
+from intent_router import route
+
+
+# Doctypes are inserted in this order, so Projects exist before the
+# PRFs, Claims and BOQ lines that refer to them.
+INSERT_ORDER = ["Project", "Supplier", "Item", "Project BOQ", "Purchase Request", "Project Claim"]
+
+
+def read_instructions(file_name: str, data: bytes) -> list:
+    """
+    Read an uploaded TXT (one instruction per line, '#' for comments) or CSV
+    file (an "instruction" or "prompt" column, else the first column).
+    Returns (line number in the file, instruction) pairs.
+    """
+    content = data.decode("utf-8-sig")
+    if file_name.lower().endswith(".csv"):
+        reader = csv.reader(io.StringIO(content))
+        rows, line_number = [], 1
+        for row in reader:
+            rows.append((line_number, row))
+            line_number = reader.line_num + 1  # a quoted cell may span several lines
+        headers = [str(h).strip().lower() for h in rows[0][1]] if rows else []
+        column = next((headers.index(h) for h in ("instruction", "prompt") if h in headers), None)
+        if column is None:
+            column = 0
+        else:
+            rows = rows[1:]
+        lines = [(n, row[column] if len(row) > column else "") for n, row in rows]
+    else:
+        lines = list(enumerate(content.splitlines(), start=1))
+
+    lines = [(n, line.strip()) for n, line in lines]
+    return [(n, line) for n, line in lines if line and not line.startswith("#")]
+
+
+# ---- planners: routed instruction -> list of (action, doc or None, detail) ----
+
+def _plan_project(routed):
+    if not routed.has("create"):
+        return []
+    project_name, expected_end_date, estimated_costing, _ = extracted_or_parse(routed.extracted, "project", routed.text)
+    if not project_name:
+        return [("Create Project", None, "Project name is missing")]
+    return [("Create Project", project_doc(project_name, expected_end_date, estimated_costing), project_name)]
+
+
+def _plan_boq_create(routed):
+    actions = []
+    for project_name, item_name, quantity, price in extracted_or_parse(routed.extracted, "boq_create", routed.text):
+        if item_name and quantity is not None and price is not None:
+            actions.append(("Create BOQ Entry", boq_entry_doc(project_name, item_name, quantity, price), item_name))
+        else:
+            actions.append(("Create BOQ Entry", None, "Could not detect item, quantity or price"))
+    return actions or [("Create BOQ Entry", None, "No BOQ item found in the instruction")]
+
+
+def _plan_prf_create(routed):
+    project_name, item_name, quantity = parse_prf_prompt(routed.text)
+    if not (project_name and item_name and quantity):
+        return [("Create PRF", None, "Could not detect project, item or quantity")]
+    return [("Create PRF", prf_doc(project_name, item_name, quantity), f"{item_name} under {project_name} (Qty: {quantity})")]
+
+
+def _plan_claim(routed):
+    if not routed.has("submit", "create"):
+        return []
+    project_name, claim_name, amount = parse_claim_prompt(routed.text)
+    if not (project_name and claim_name and amount):
+        return [("Create Claim", None, "Could not detect project, claim name or amount")]
+    return [("Create Claim", claim_doc(project_name, claim_name, amount), f"{claim_name} for {project_name} (RM {amount})")]
+
+
+def _plan_inventory(routed):
+    item_name, quantity, department_name, supplier_name, contact_number = parse_inventory_prompt(routed.text)
+    if routed.has("item"):
+        if not (item_name and quantity):
+            return [("Add Inventory Item", None, "Could not detect item or quantity")]
+        return [("Add Inventory Item", inventory_item_doc(item_name, quantity, department_name), item_name)]
+    if routed.has("supplier"):
+        if not supplier_name:
+            return [("Add Supplier", None, "Could not detect supplier name")]
+        return [("Add Supplier", supplier_doc(supplier_name, contact_number), supplier_name)]
+    return []
+
+
+# Intent -> planner, in the same order the chat handlers run
+PLANNERS = {
+    "project": _plan_project,
+    "boq_create": _plan_boq_create,
+    "prf_create": _plan_prf_create,
+    "claim": _plan_claim,
+    "inventory": _plan_inventory,
+}
+
+
+# Nearly every PRF, claim or BOQ line names a project and an item; only treat
+# a line as creating one when it says so, so a batch of PRFs doesn't also
+# create the project and an inventory item per line.
+def _batch_intents(routed) -> list:
+    intents = [intent for intent in routed.intents if intent in PLANNERS]
+    if "project" in intents and not routed.creates_project():
+        intents.remove("project")
+    if "inventory" in intents and ("prf_create" in intents or "boq_create" in intents):
+        intents.remove("inventory")
+    return intents
+
+
+def plan_instruction(text: str) -> list:
+    """
+    Route one instruction and parse it into the documents it asks for.
+    Returns a list of (action, doc or None, detail); doc is None when the
+    instruction could not be parsed, and detail then says why.
+    """
+    routed = route(text, use_gpt_fallback=True)
+    intents = _batch_intents(routed)
+    if sum(intent in STRUCTURED_INTENTS for intent in intents) > 1:
+        routed.extracted = parse_multi_intent_prompt(routed.text)
+
+    actions = []
+    for intent in intents:
+        actions.extend(PLANNERS[intent](routed))
+
+    if not actions:
+        detected = ", ".join(routed.intents) or "none"
+        return [("-", None, f"No supported batch action (detected: {detected})")]
+    return actions
+
+
+def run_batch(api_url: str, auth: tuple, instructions: list, max_workers: int = MAX_CONCURRENCY,
+              on_progress=None, chunk_size: int = None) -> list:
+    """
+    Parse every instruction in a thread pool (GPT-backed parsers spend their
+    time waiting on OpenAI), then send the documents grouped by doctype with
+    one insert_many per doctype.
+    - instructions: (line number, instruction) pairs, as read_instructions returns them
+    - on_progress(done, total): called from this thread as instructions finish parsing
+    Returns one row per action: line, instruction, action, status, detail.
+    """
+    plans = [None] * len(instructions)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(plan_instruction, text): index for index, (_, text) in enumerate(instructions)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            try:
+                plans[index] = future.result()
+            except Exception as e:
+                print("🔴 Batch Parsing Error:", e)
+                plans[index] = [("-", None, f"Parsing failed: {e}")]
+            if on_progress:
+                on_progress(done, len(instructions))
+
+    results = []
+    by_doctype = {}
+    for (line_number, text), actions in zip(instructions, plans):
+        for action, doc, detail in actions:
+            row = {
+                "line": line_number,
+                "instruction": text,
+                "action": action,
+                "status": "⚠️ Skipped" if doc is None else "⏳ Pending",
+                "detail": detail,
+            }
+            results.append(row)
+            if doc is not None:
+                by_doctype.setdefault(doc["doctype"], []).append((doc, row))
+
+    kwargs = {"chunk_size": chunk_size} if chunk_size else {}
+    doctypes = sorted(by_doctype, key=lambda d: INSERT_ORDER.index(d) if d in INSERT_ORDER else len(INSERT_ORDER))
+    for doctype in doctypes:
+        pending = by_doctype[doctype]
+        try:
+            outcome = insert_many(api_url, auth, [doc for doc, _ in pending], **kwargs)
+        except Exception as e:
+            # Only this doctype's rows fail; the other doctypes still get sent
+            print(f"🔴 Batch {doctype} Insert Error:", e)
+            error = f"{e.__class__.__name__}: {e}"
+            outcome = {"documents": [{"name": None, "error": error} for _ in pending]}
+        documents = outcome.get("documents", [])
+        for position, (_, row) in enumerate(pending):
+            document = documents[position] if position < len(documents) else {"name": None, "error": "No response"}
+            if document["error"] is None:
+                row["status"] = "✅ Created"
+                row["detail"] = f"{document['name']}: {row['detail']}"
+            else:
+                row["status"] = "❌ Failed"
+                row["detail"] = document["error"]
+
+    return results
@@ -0,0 +1,88 @@
+"""
+BOQ analytics benchmark: per-record Python loops vs the vectorized boq_analytics module.
+
+Generates synthetic Project BOQ lines (as returned by get_records_for_doctype)
+and computes per-project totals, utilisation, overrun lines and the top-N
+consumers both ways. The one-off cost of loading the records into columns
+(to_frame) is reported separately from the analytics run on them.
+
+Usage:
+    python benchmarks/bench_boq_analytics.py [lines] [projects]
+"""
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from boq_analytics import analyze_frame, to_frame
+
+
+def synthetic_boq(lines: int, projects: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    items = ["Cement", "Steel bar", "Sand", "Aggregate", "Formwork", "Cable", "Paint", "Tiles"]
+    records = []
+    for i in range(lines):
+        budget = round(rng.uniform(500, 50000), 2)
+        records.append({
+            "name": f"BOQ-{i:06d}",
+            "project_name": f"PRJ-{rng.randrange(projects):04d}",
+            "boq_item_description": f"{rng.choice(items)} lot {i % 97}",
+            "quantity": rng.randint(1, 500),
+            "budget_amount_rm": budget,
+            "balance_amount": round(budget * rng.uniform(-0.2, 1.0), 2),
+        })
+    return records
+
+
+def analyze_loop(records: list, top_n: int = 10) -> dict:
+    projects = defaultdict(lambda: {"lines": 0, "budget": 0.0, "balance": 0.0, "overrun_lines": 0})
+    lines = []
+    for r in records:
+        budget = float(r.get("budget_amount_rm") or 0)
+        balance = float(r.get("balance_amount") or 0)
+        p = projects[r.get("project_name") or ""]
+        p["lines"] += 1
+        p["budget"] += budget
+        p["balance"] += balance
+        p["overrun_lines"] += balance < 0
+        lines.append((budget - balance, r))
+    for p in projects.values():
+        p["utilisation_pct"] = (p["budget"] - p["balance"]) / p["budget"] * 100 if p["budget"] > 0 else None
+    top = sorted(lines, key=lambda x: x[0], reverse=True)[:top_n]
+    return {"projects": projects, "top": top}
+
+
+def timed(fn, *args, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    projects = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    records = synthetic_boq(lines, projects)
+
+    df = to_frame(records)
+    loop = analyze_loop(records)
+    vectorized = analyze_frame(df)
+    assert len(loop["projects"]) == len(vectorized["projects"])
+    assert [r["name"] for _, r in loop["top"]] == list(vectorized["top"]["name"])
+
+    loop_time = timed(analyze_loop, records)
+    load_time = timed(to_frame, records)
+    vectorized_time = timed(analyze_frame, df)
+    print(f"{lines} BOQ lines, {projects} projects (best of 5)")
+    print(f"  python loops        : {loop_time * 1000:8.1f} ms")
+    print(f"  load into columns   : {load_time * 1000:8.1f} ms  (once per fetch)")
+    print(f"  vectorized analytics: {vectorized_time * 1000:8.1f} ms  ({loop_time / vectorized_time:.1f}x vs loops)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Round-trip latency benchmark: module-level requests.post vs the pooled ERPNextClient.
+
+Starts a local stub ERPNext server (HTTP/1.1 keep-alive) and sends the same
+small create_* style payload N times through each path.
+
+Usage:
+    python benchmarks/bench_erp_client.py [iterations]
+"""
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from erp_client import ERPNextClient
+
+
+class StubERPNextHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        body = json.dumps({"data": payload}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def timed(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<28} mean {statistics.mean(samples):7.3f} ms   p50 {statistics.median(samples):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubERPNextHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_address[1]}"
+    auth = ("key", "secret")
+    payload = {"doctype": "Role", "role_name": "Benchmark Role"}
+
+    def unpooled():
+        requests.post(f"{api_url}/api/resource/Role", auth=auth, json=payload).raise_for_status()
+
+    client = ERPNextClient(api_url, auth)
+
+    def pooled():
+        client.post("/api/resource/Role", json=payload).raise_for_status()
+
+    # Warm up both paths once so we compare steady-state behaviour.
+    unpooled()
+    pooled()
+
+    print(f"{iterations} POST round trips against {api_url}")
+    report("requests.post (no pool)", timed(unpooled, iterations))
+    report("ERPNextClient (pooled)", timed(pooled, iterations))
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Cold-start import time of app.py, measured with `python -X importtime`.
+
+Runs the Streamlit script bare (no server) in a fresh interpreter, as a
+rerun-free cold start, and reports the cumulative import time of the repo's
+own modules next to Streamlit's. Also works as a regression check: exits
+with status 1 when a module that app.py should only import lazily shows up
+at startup, or when the repo's own modules take longer than the budget.
+
+Usage:
+    python benchmarks/bench_import_time.py [--runs 3] [--budget-ms 100]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imported by the branch or handler that needs them, never at startup
+LAZY_MODULES = ["openai", "docx", "pandas", "numpy", "openpyxl", "requests", "erp_api", "gpt_parser"]
+
+
+def own_modules() -> set:
+    return {name[:-3] for name in os.listdir(REPO) if name.endswith(".py")}
+
+
+def measure() -> dict:
+    """
+    One cold start: top-level module -> cumulative import time in µs
+    (modules imported by other modules are counted in their importer).
+    """
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "app.py"],
+        cwd=REPO, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+
+    imported = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imported[name[1:].rstrip()] = int(cumulative)  # nested imports keep their indent
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="cold starts to measure (best one is reported)")
+    parser.add_argument("--budget-ms", type=float, default=100, help="max import time of the repo's own modules")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    own = own_modules()
+
+    def top_level(run):
+        return {name: us for name, us in run.items() if not name.startswith(" ")}
+
+    best = min(runs, key=lambda run: sum(top_level(run).values()))
+    top = top_level(best)
+    total = sum(top.values()) / 1000
+    own_total = sum(us for name, us in top.items() if name in own) / 1000
+    streamlit_total = top.get("streamlit", 0) / 1000
+
+    print(f"cold start imports: {total:.0f} ms (streamlit {streamlit_total:.0f} ms, repo modules {own_total:.1f} ms)")
+    print("slowest top-level imports:")
+    for name, us in sorted(top.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {us / 1000:>8.1f} ms  {name}")
+
+    loaded = {name.strip() for name in best}
+    eager = [name for name in LAZY_MODULES if name in loaded]
+    failures = []
+    if eager:
+        failures.append(f"imported at startup but should be lazy: {', '.join(eager)}")
+    if own_total > args.budget_ms:
+        failures.append(f"repo modules took {own_total:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    for failure in failures:
+        print(f"🔴 {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Per-prompt parse time of the rule-based parsers (gpt_parser + boq_parser).
+
+Each parser runs on a sample prompt. As a reference, the same rule tables are
+also evaluated the old way: lowercasing and calling re.search / re.findall
+with the pattern string on every call (a lookup in re's pattern cache each
+time), converting each match the same way.
+
+Usage:
+    python benchmarks/bench_rule_parsers.py [iterations]
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")  # gpt_parser imports gpt_client
+
+import boq_parser
+import gpt_parser
+
+
+PARSERS = {
+    "prf": (gpt_parser.parse_prf_prompt, gpt_parser.PRF_RULES,
+            "Create a PRF for project ABC, item: Paint Brushes, quantity: 100"),
+    "claim": (gpt_parser.parse_claim_prompt, gpt_parser.CLAIM_RULES,
+              "Submit claim C001 for project Alpha amount RM 12,500.50"),
+    "hr": (gpt_parser.parse_hr_prompt, gpt_parser.HR_RULES,
+           "Create a contract for Ahmad Ali with salary RM 3,500 start 1 June 2025"),
+    "vehicle": (gpt_parser.parse_vehicle_prompt, gpt_parser.VEHICLE_RULES,
+                "Add new vehicle Toyota Hilux to Logistics, maintenance every 6 months"),
+    "inventory": (gpt_parser.parse_inventory_prompt, gpt_parser.INVENTORY_RULES,
+                  "Add item Steel Rod quantity: 50 department: Site Ops supplier Acme contact 0123456"),
+    "financial": (gpt_parser.parse_financial_prompt, gpt_parser.FINANCIAL_RULES,
+                  "Create profit sharing rule for Design department to HOD after 20% profit"),
+    "workflow": (gpt_parser.parse_workflow_prompt, gpt_parser.WORKFLOW_RULES,
+                 "Set up an approval workflow for PRFs where HOD submits and Director approves"),
+    "boq_request": (boq_parser.parse_boq_request, boq_parser.BOQ_REQUEST_RULES,
+                    "Show balance for Cement in Project ABC"),
+}
+
+
+# Prompts and what the parsers returned for them before the rule engine;
+# every rule now runs on every prompt, so stray captures must not break these.
+BASELINE_OUTPUTS = [
+    (gpt_parser.parse_financial_prompt,
+     "Set profit sharing rule 10% to HOD after project completion for Design department. Please confirm.",
+     ("profit_sharing", "Design", "Hod", 10.0)),
+    (gpt_parser.parse_financial_prompt, "Set management fee of RM 500 for Design department",
+     ("management_fee", "Design", None, 500.0)),
+]
+
+
+def converted(rule, value):
+    try:
+        return rule.convert(value)
+    except ValueError:
+        return rule.default
+
+
+def search_per_call(extractor, prompt):
+    # What the parsers used to do: inline pattern strings looked up on every call
+    normalized = prompt.lower() if extractor.lowercase else prompt
+    values = {}
+    for rule in extractor.rules:
+        if rule.find_all:
+            values[rule.name] = []
+            for value in re.findall(rule.pattern, normalized, extractor.flags):
+                try:
+                    values[rule.name].append(rule.convert(value))
+                except ValueError:
+                    pass
+        else:
+            match = re.search(rule.pattern, normalized, extractor.flags)
+            values[rule.name] = converted(rule, match.group(rule.group)) if match else rule.default
+    return values
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for parse, prompt, expected in BASELINE_OUTPUTS:
+        assert parse(prompt) == expected, f"{parse.__name__}({prompt!r}) = {parse(prompt)!r}, expected {expected!r}"
+        for extractor in (extractor for _, extractor, _ in PARSERS.values()):
+            assert search_per_call(extractor, prompt) == extractor.extract(prompt)
+
+    print(f"{'parser':<12} {'per-call re':>12} {'compiled':>10} {'full parse':>11}   (µs per prompt, {iterations} runs)")
+    total_old = total_new = total_parsed = 0.0
+    for name, (parse, extractor, prompt) in PARSERS.items():
+        assert search_per_call(extractor, prompt) == extractor.extract(prompt)
+        old = timeit.timeit(lambda: search_per_call(extractor, prompt), number=iterations) / iterations * 1e6
+        new = timeit.timeit(lambda: extractor.extract(prompt), number=iterations) / iterations * 1e6
+        parsed = timeit.timeit(lambda: parse(prompt), number=iterations) / iterations * 1e6
+        total_old += old
+        total_new += new
+        total_parsed += parsed
+        print(f"{name:<12} {old:>12.2f} {new:>10.2f} {parsed:>11.2f}")
+    print(f"{'all parsers':<12} {total_old:>12.2f} {total_new:>10.2f} {total_parsed:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+
+NUMERIC_FIELDS = ["quantity", "budget_amount_rm", "balance_amount"]
+TEXT_FIELDS = ["name", "project_name", "boq_item_description"]
+DEFAULT_TOP_N = 10
+
+
+def to_frame(records: list) -> pd.DataFrame:
+    """
+    Load Project BOQ records into columns, adding per-line derived metrics:
+    - used_amount: budget_amount_rm - balance_amount
+    - utilisation_pct: used / budget * 100 (NaN when there is no budget)
+    - overrun: the line has spent more than its budget (negative balance)
+    Only the BOQ columns are loaded; missing or non-numeric amounts count as 0.
+    """
+    df = pd.DataFrame({column: [r.get(column) for r in records] for column in TEXT_FIELDS + NUMERIC_FIELDS})
+    for column in NUMERIC_FIELDS:
+        df[column] = pd.to_numeric(df[column], errors="coerce").fillna(0.0)
+
+    df["project_name"] = df["project_name"].fillna("").astype(str)
+    budget = df["budget_amount_rm"].to_numpy(dtype=float)
+    balance = df["balance_amount"].to_numpy(dtype=float)
+    used = budget - balance
+
+    df["used_amount"] = used
+    df["utilisation_pct"] = _percent(used, budget)
+    df["overrun"] = balance < 0
+    return df
+
+
+def _percent(part: np.ndarray, whole: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(whole > 0, part / whole * 100.0, np.nan)
+
+
+def project_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-project totals, utilisation and overrun count, highest utilisation first.
+    """
+    summary = df.groupby("project_name", sort=False).agg(
+        lines=("used_amount", "size"),
+        quantity=("quantity", "sum"),
+        budget_amount_rm=("budget_amount_rm", "sum"),
+        balance_amount=("balance_amount", "sum"),
+        used_amount=("used_amount", "sum"),
+        overrun_lines=("overrun", "sum"),
+    )
+    summary["utilisation_pct"] = _percent(summary["used_amount"].to_numpy(), summary["budget_amount_rm"].to_numpy())
+    summary["overrun"] = summary["balance_amount"] < 0
+    return summary.sort_values("utilisation_pct", ascending=False, na_position="last").reset_index()
+
+
+def overruns(df: pd.DataFrame) -> pd.DataFrame:
+    return df[df["overrun"].to_numpy()].sort_values("balance_amount")
+
+
+def top_consumers(df: pd.DataFrame, n: int = DEFAULT_TOP_N) -> pd.DataFrame:
+    """
+    The n BOQ lines that have used the most budget.
+    """
+    return df.nlargest(n, "used_amount")
+
+
+def analyze_frame(df: pd.DataFrame, top_n: int = DEFAULT_TOP_N) -> dict:
+    """
+    All BOQ analytics for a frame from to_frame:
+    {"totals": {...}, "projects": DataFrame, "overruns": DataFrame, "top": DataFrame}
+    """
+    budget = float(df["budget_amount_rm"].sum())
+    used = float(df["used_amount"].sum())
+    return {
+        "totals": {
+            "lines": len(df),
+            "budget_amount_rm": budget,
+            "used_amount": used,
+            "balance_amount": float(df["balance_amount"].sum()),
+            "utilisation_pct": used / budget * 100.0 if budget > 0 else None,
+            "overrun_lines": int(df["overrun"].sum()),
+        },
+        "projects": project_summary(df),
+        "overruns": overruns(df),
+        "top": top_consumers(df, top_n),
+    }
+
+
+def analyze_boq(records: list, top_n: int = DEFAULT_TOP_N) -> dict:
+    return analyze_frame(to_frame(records), top_n)
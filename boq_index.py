@@ -0,0 +1,128 @@
+import re
+import threading
+from collections import OrderedDict, defaultdict
+
+
+_TOKEN_RE = re.compile(r"\w+")
+_INDEX_CACHE_SIZE = 4
+
+
+def _normalize(text) -> str:
+    return " ".join(str(text or "").lower().split())
+
+
+def _tokens(text) -> list:
+    return _TOKEN_RE.findall(_normalize(text))
+
+
+def _to_number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class BOQIndex:
+    """
+    Project BOQ records indexed once for the explorer's BOQ questions:
+    - project (normalized) -> its BOQ lines, for list_boq_items
+    - per project, description token -> line positions, for show_balance
+    """
+
+    def __init__(self, records: list):
+        self.records = records
+        self._frame = None
+        self._by_project = defaultdict(list)
+        self._token_index = defaultdict(lambda: defaultdict(set))
+        self._descriptions = {}
+
+        for record in records:
+            project = _normalize(record.get("project_name"))
+            lines = self._by_project[project]
+            position = len(lines)
+            lines.append(record)
+
+            description = _normalize(record.get("boq_item_description"))
+            self._descriptions[(project, position)] = description
+            for token in _tokens(description):
+                self._token_index[project][token].add(position)
+
+    @property
+    def frame(self):
+        """
+        The records loaded into columns for boq_analytics, built on first use.
+        """
+        if self._frame is None:
+            from boq_analytics import to_frame
+
+            self._frame = to_frame(self.records)
+        return self._frame
+
+    def items(self, project_name: str) -> list:
+        return self._by_project.get(_normalize(project_name), [])
+
+    def find(self, project_name: str, boq_item: str) -> list:
+        """
+        BOQ lines of the project whose description contains boq_item.
+        Whole-word queries are answered from the token index; partial words
+        ("cem" for "cement") fall back to a scan of that project's lines only.
+        """
+        project = _normalize(project_name)
+        item = _normalize(boq_item)
+        lines = self._by_project.get(project, [])
+        if not lines or not item:
+            return []
+
+        token_index = self._token_index[project]
+        query_tokens = _tokens(item)
+        if query_tokens and all(token in token_index for token in query_tokens):
+            candidates = set.intersection(*(token_index[token] for token in query_tokens))
+        else:
+            candidates = range(len(lines))
+
+        return [
+            lines[position] for position in sorted(candidates)
+            if item in self._descriptions[(project, position)]
+        ]
+
+    def balance(self, project_name: str, boq_item: str) -> dict:
+        """
+        Matching lines plus their balances summed, e.g.
+        {"matches": [...], "total_balance": 1250.0}
+        """
+        matches = self.find(project_name, boq_item)
+        return {
+            "matches": matches,
+            "total_balance": sum(_to_number(r.get("balance_amount")) for r in matches),
+        }
+
+
+_index_cache = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def _fingerprint(records: list):
+    # name + modified change whenever ERPNext saves a row; balance covers rows without modified
+    return hash(tuple(
+        (r.get("name"), r.get("modified"), r.get("project_name"), r.get("boq_item_description"), r.get("balance_amount"))
+        for r in records
+    ))
+
+
+def get_boq_index(records: list) -> BOQIndex:
+    """
+    BOQIndex for the records, reused across Streamlit reruns until the fetched
+    records change.
+    """
+    key = _fingerprint(records)
+    with _index_lock:
+        if key in _index_cache:
+            _index_cache.move_to_end(key)
+            return _index_cache[key]
+
+    index = BOQIndex(records)
+    with _index_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
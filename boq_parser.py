@@ -1,29 +1,31 @@
-import re
+from rule_extraction import FieldRule, RuleExtractor, flag
+
+BOQ_REQUEST_RULES = RuleExtractor([
+    flag("balance", r"balance"),
+    flag("list", r"list"),
+    flag("boq", r"boq"),
+    FieldRule("project_name", r"project\s+(\w+)"),
+    FieldRule("boq_item", r"for\s+([\w\s]+)\s+in\s+project"),
+])
 
 def parse_boq_request(user_prompt: str):
-    user_prompt = user_prompt.lower()
-    
+    parsed = BOQ_REQUEST_RULES.extract(user_prompt)
+
     # Default
     action = None
-    project_name = None
-    boq_item = None
 
     # Detect if asking for balance
-    if "balance" in user_prompt:
+    if parsed["balance"]:
         action = "show_balance"
-    
+
     # Detect if asking to list BOQ items
-    elif "list" in user_prompt and "boq" in user_prompt:
+    elif parsed["list"] and parsed["boq"]:
         action = "list_boq_items"
 
     # Extract Project Name (very basic for now)
-    match = re.search(r"project\s+(\w+)", user_prompt)
-    if match:
-        project_name = match.group(1)
+    project_name = parsed["project_name"]
 
     # Extract BOQ item if mentioned
-    item_match = re.search(r"for\s+([\w\s]+)\s+in\s+project", user_prompt)
-    if item_match:
-        boq_item = item_match.group(1).strip()
+    boq_item = parsed["boq_item"]
 
-    return action, project_name, boq_item
+    return action, project_name, boq_item
\ No newline at end of file
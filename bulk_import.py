@@ -0,0 +1,76 @@
+import csv
+import io
+
+from erp_api import add_inventory_items, add_suppliers, create_boq_entries, create_prfs, create_users
+
+
+# Import kind -> (batch function, required columns, numeric columns)
+IMPORTERS = {
+    "BOQ Entries": (create_boq_entries, ["item_name", "quantity", "price"], ["quantity", "price"]),
+    "PRFs": (create_prfs, ["project_name", "item_name", "quantity"], ["quantity"]),
+    "Inventory Items": (add_inventory_items, ["item_name", "quantity"], ["quantity"]),
+    "Suppliers": (add_suppliers, ["supplier_name"], []),
+    "Users": (create_users, ["first_name", "email"], []),
+}
+
+
+def _normalize_header(header) -> str:
+    return str(header or "").strip().lower().replace(" ", "_")
+
+
+def read_rows(file_name: str, data: bytes) -> list:
+    """
+    Read an uploaded CSV or XLSX file into (line number in the file, row) pairs,
+    each row a dict keyed by normalized column names ("Item Name" -> "item_name").
+    """
+    if file_name.lower().endswith((".xlsx", ".xlsm")):
+        from openpyxl import load_workbook  # optional, only needed for Excel uploads
+
+        sheet = load_workbook(io.BytesIO(data), read_only=True, data_only=True).active
+        values = sheet.iter_rows(values_only=True)
+        headers = [_normalize_header(h) for h in next(values, [])]
+        rows = [(line, dict(zip(headers, row))) for line, row in enumerate(values, start=2)]
+    else:
+        reader = csv.reader(io.StringIO(data.decode("utf-8-sig")))
+        headers = [_normalize_header(h) for h in next(reader, [])]
+        rows, line = [], reader.line_num + 1
+        for values in reader:
+            rows.append((line, dict(zip(headers, values))))
+            line = reader.line_num + 1  # a quoted cell may span several lines
+
+    # Drop completely empty lines (common at the end of spreadsheets)
+    return [(line, row) for line, row in rows if any(v not in (None, "") for v in row.values())]
+
+
+def validate_rows(kind: str, rows: list):
+    """
+    Check required columns and convert numeric ones in the (line number, row)
+    pairs from read_rows.
+    Returns (valid_rows, errors) where errors is a list of (line_number, message).
+    """
+    _, required, numeric = IMPORTERS[kind]
+    valid, errors = [], []
+
+    for line, row in rows:
+        missing = [col for col in required if row.get(col) in (None, "")]
+        if missing:
+            errors.append((line, f"Missing {', '.join(missing)}"))
+            continue
+        try:
+            for col in numeric:
+                row[col] = float(str(row[col]).replace(",", ""))
+        except ValueError:
+            errors.append((line, f"Non-numeric value in {col}: {row[col]}"))
+            continue
+        valid.append(row)
+
+    return valid, errors
+
+
+def run_import(api_url: str, auth: tuple, kind: str, rows: list, chunk_size: int = None):
+    """
+    Send validated rows to ERPNext through the matching bulk function.
+    """
+    batch_function = IMPORTERS[kind][0]
+    kwargs = {"chunk_size": chunk_size} if chunk_size else {}
+    return batch_function(api_url, auth, rows, **kwargs)
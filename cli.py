@@ -0,0 +1,111 @@
+"""
+Headless entry point: run the assistant's actions from a shell, cron or a
+worker without Streamlit. Results are printed as JSON on stdout; debug output
+goes to stderr. The exit code is 1 if any action failed.
+
+Usage:
+    python cli.py prf "Create a PRF for project ABC, item: Paint, quantity: 100"
+    python cli.py run "Create project ABC and add department Signage"
+    python cli.py report --docx erp_summary_report.docx
+    python cli.py batch instructions.txt
+    python cli.py jobs jobs.json        # or: ... | python cli.py jobs -
+
+A jobs file is a JSON list of {"action": "prf", "prompt": "..."} objects
+("action" defaults to "run", which routes the prompt like the chat box).
+"""
+import argparse
+import contextlib
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import service
+
+
+def run_job(api_url: str, auth: tuple, job: dict) -> dict:
+    """
+    Run one job; an exception (e.g. ERPNext or OpenAI unreachable) becomes
+    that job's {"action", "error"} result so the other jobs still run.
+    """
+    action = job.get("action", "run")
+    prompt = job.get("prompt", "")
+    try:
+        if action == "run":
+            return service.run_prompt(api_url, auth, prompt)
+        if action not in service.ACTIONS:
+            return {"action": action, "error": f"Unknown action: {action}"}
+        if action == "report":
+            return service.generate_report(api_url, auth, prompt, docx_path=job.get("docx_path"))
+        return service.ACTIONS[action](api_url, auth, prompt)
+    except Exception as e:
+        print(f"🔴 Job {action} Error:", e)
+        return {"action": action, "error": f"{e.__class__.__name__}: {e}"}
+
+
+def read_jobs(path: str) -> list:
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with stream:
+        jobs = json.load(stream)
+    if isinstance(jobs, dict):
+        jobs = [jobs]
+    return [{"prompt": job} if isinstance(job, str) else job for job in jobs]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="ERPNext Smart Assistant (headless)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for action in service.ACTIONS:
+        if action != "report":
+            commands.add_parser(action, help=f"parse and run a {action} instruction").add_argument("prompt")
+
+    commands.add_parser("run", help="route a free-form instruction like the chat box").add_argument("prompt")
+
+    report = commands.add_parser("report", help="generate the summary report")
+    report.add_argument("prompt", nargs="?", default="", help="e.g. \"monthly financial report for Director\"")
+    report.add_argument("--docx", help="also save the report as a Word document")
+
+    batch = commands.add_parser("batch", help="run a TXT/CSV file of instructions with bulk writes")
+    batch.add_argument("file")
+
+    jobs = commands.add_parser("jobs", help="run a JSON list of {action, prompt} jobs ('-' = stdin)")
+    jobs.add_argument("file")
+    jobs.add_argument("--workers", type=int, default=1, help="jobs run in parallel")
+
+    return parser
+
+
+def main(argv: list = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    # The parsers and ERP functions print debug lines; keep stdout for the JSON result
+    with contextlib.redirect_stdout(sys.stderr):
+        api_url, auth = service.settings_from_env()
+
+        if args.command == "batch":
+            from batch_prompts import read_instructions, run_batch
+
+            with open(args.file, "rb") as file:
+                instructions = read_instructions(args.file, file.read())
+            output = run_batch(api_url, auth, instructions)
+            failed = any(row["status"] != "✅ Created" for row in output)
+
+        elif args.command == "jobs":
+            jobs = read_jobs(args.file)
+            with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+                output = list(pool.map(lambda job: run_job(api_url, auth, job), jobs))
+            failed = any("error" in result for result in output)
+
+        else:
+            job = {"action": args.command, "prompt": args.prompt}
+            if args.command == "report":
+                job["docx_path"] = args.docx
+            output = run_job(api_url, auth, job)
+            failed = "error" in output
+
+    print(json.dumps(output, indent=2, ensure_ascii=False, default=str))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
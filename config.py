@@ -0,0 +1,13 @@
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def load_env():
+    """
+    Load .env into the environment once per process. Streamlit re-runs app.py
+    on every interaction, so calling load_dotenv() there would re-read the
+    file each time.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
@@ -1,5 +1,23 @@
+import json
+
 import requests
 
+from erp_cache import cached_metadata, invalidate_metadata
+from erp_client import get_client
+from erp_query import ListQuery
+
+
+DEFAULT_PAGE_SIZE = 100
+
+# Default columns returned by the list functions below; pass fields=[...] to override.
+BOQ_FIELDS = ["name", "project_name", "boq_item_description", "quantity", "budget_amount_rm", "balance_amount"]
+PRF_FIELDS = ["name", "project", "item_name", "quantity", "department", "status"]
+CLAIM_FIELDS = ["name", "project_name", "claim_name", "amount", "due_date", "status"]
+SALARY_ADVANCE_FIELDS = ["name", "employee_name", "advance_amount", "paid_amount", "posting_date", "status"]
+LEAVE_ALLOCATION_FIELDS = ["name", "employee_name", "leave_type", "from_date", "to_date", "total_leaves_allocated"]
+ASSET_FIELDS = ["name", "asset_name", "asset_category", "department", "status"]
+
+
 def create_erpnext_doctype(api_url: str, auth: tuple, doctype_name: str, fields: list):
     payload = {
         "doctype": "DocType",
@@ -9,37 +27,113 @@ def create_erpnext_doctype(api_url: str, auth: tuple, doctype_name: str, fields:
         "fields": fields
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/DocType",
-        auth=auth,
+    response = get_client(api_url, auth).post(
+        "/api/resource/DocType",
         json=payload
     )
 
     try:
         response.raise_for_status()
+        invalidate_metadata("doctypes", "doctype_meta")
         return response.json()
     except requests.exceptions.HTTPError as e:
         print("🔴 Error Response:", response.text)
         return {"error": response.text}
 
 
-def get_records_for_doctype(api_url: str, auth: tuple, doctype_name: str) -> list:
-    response = requests.get(f"{api_url}/api/resource/{doctype_name}", auth=auth)
-    if response.status_code == 200:
-        return response.json().get("data", [])
-    return []
+_mirror = None
+
+
+def use_mirror(mirror):
+    """
+    Serve list queries for the mirrored Doctypes from a local ERPMirror
+    (see erp_mirror.py). Pass None to go back to querying ERPNext directly.
+    """
+    global _mirror
+    _mirror = mirror
+
+
+def get_mirror():
+    return _mirror
 
+
+def iter_query(api_url: str, auth: tuple, query: ListQuery, page_size: int = DEFAULT_PAGE_SIZE, limit: int = None,
+               use_mirror: bool = True):
+    """
+    Yield the rows of a ListQuery one by one, fetching them page by page
+    with limit_start / limit_page_length so large Doctypes never sit in memory at once.
+    - page_size: rows requested per HTTP call
+    - limit: stop after this many rows (None = walk every page)
+    Callers can also simply break out of the loop; no further pages are fetched.
+    Without an explicit order_by the rows are ordered by name so they don't
+    shift between pages.
+    When a mirror is enabled and covers the Doctype, rows come from the local
+    copy instead (synced first if older than its staleness bound).
+    Raises requests.exceptions.HTTPError if a page cannot be fetched, so a
+    failed fetch never looks like a short (or empty) list.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+
+    if use_mirror and _mirror is not None and _mirror.covers(api_url, query):
+        yield from _mirror.iter_query(query, limit)
+        return
+
+    params = query.to_params()
+    params["limit_page_length"] = page_size
+    params.setdefault("order_by", "name asc")
+
+    client = get_client(api_url, auth)
+    start = query.start or 0
+    yielded = 0
+
+    while True:
+        params["limit_start"] = start
+        response = client.get(f"/api/resource/{query.doctype}", params=params)
+        if response.status_code != 200:
+            print(f"🔴 Error fetching {query.doctype} records:", response.text)
+            raise requests.exceptions.HTTPError(
+                f"Error fetching {query.doctype} records (from row {start}): {response.status_code} {response.text}",
+                response=response
+            )
+
+        rows = response.json().get("data", [])
+        for row in rows:
+            yield row
+            yielded += 1
+            if limit is not None and yielded >= limit:
+                return
+
+        if len(rows) < page_size:
+            return
+        start += page_size
+
+
+def iter_records(api_url: str, auth: tuple, doctype_name: str, fields: list = None, filters: list = None,
+                 page_size: int = DEFAULT_PAGE_SIZE, limit: int = None, order_by: str = None):
+    """
+    Shortcut for iter_query when the fields/filters are already at hand.
+    - filters: ERPNext filter list, e.g. [["Project Claim", "status", "=", "Draft"]]
+    """
+    query = ListQuery(doctype_name, fields=list(fields or []), filters=list(filters or []), order_by=order_by)
+    return iter_query(api_url, auth, query, page_size=page_size, limit=limit)
+
+
+def get_records_for_doctype(api_url: str, auth: tuple, doctype_name: str, fields: list = None, limit: int = None) -> list:
+    return list(iter_records(api_url, auth, doctype_name, fields=fields or ["*"], limit=limit))
+
+@cached_metadata("doctypes")
 def get_all_doctypes(api_url: str, auth: tuple):
     try:
-        url = f"{api_url}/api/method/frappe.client.get_list"
+        url = "/api/method/frappe.client.get_list"
         headers = {"Content-Type": "application/json"}
-        payload = {
-            "doctype": "DocType",
-            "fields": ["name", "module", "issingle", "istable", "custom"],
-            "limit_page_length": 999
-        }
+        query = ListQuery(
+            "DocType",
+            fields=["name", "module", "issingle", "istable", "custom"],
+            limit=999
+        )
 
-        response = requests.post(url, headers=headers, auth=auth, json=payload)
+        response = get_client(api_url, auth).post(url, headers=headers, json=query.to_params(include_doctype=True))
         response.raise_for_status()
         data = response.json()
 
@@ -56,8 +150,29 @@ def get_all_doctypes(api_url: str, auth: tuple):
     except Exception as e:
         print(f"Error fetching doctypes: {e}")
         return []
-    
-    
+
+
+@cached_metadata("doctype_meta")
+def get_doctype_meta(api_url: str, auth: tuple, doctype_name: str) -> dict:
+    """
+    Fetch a DocType definition (fields, permissions, settings).
+    """
+    response = get_client(api_url, auth).get(f"/api/resource/DocType/{doctype_name}")
+    if response.status_code == 200:
+        return response.json().get("data", {})
+    return {}
+
+
+@cached_metadata("roles")
+def get_roles(api_url: str, auth: tuple) -> list:
+    query = ListQuery("Role", fields=["name"]).where("disabled", "=", 0)
+    return [row["name"] for row in iter_query(api_url, auth, query)]
+
+
+@cached_metadata("departments")
+def get_departments(api_url: str, auth: tuple) -> list:
+    query = ListQuery("Department", fields=["name", "department_name", "parent_department", "company"])
+    return list(iter_query(api_url, auth, query))
 
 
 def create_workflow(api_url: str, auth: tuple, workflow_name: str, document_type: str, states: list, transitions: list):
@@ -71,9 +186,8 @@ def create_workflow(api_url: str, auth: tuple, workflow_name: str, document_type
         "transitions": transitions
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/Workflow",
-        auth=auth,
+    response = get_client(api_url, auth).post(
+        "/api/resource/Workflow",
         json=payload
     )
 
@@ -93,22 +207,22 @@ def create_role(api_url: str, auth: tuple, role_name: str):
         "role_name": role_name,
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/Role",
-        auth=auth,
+    response = get_client(api_url, auth).post(
+        "/api/resource/Role",
         json=payload
     )
 
     try:
         response.raise_for_status()
+        invalidate_metadata("roles")
         return response.json()
     except requests.exceptions.HTTPError as e:
         print("🔴 Role Creation Error:", response.text)
         return {"error": response.text}
     
     
-def set_permission(api_url: str, auth: tuple, doctype: str, role: str, perm_level=0, read=1, write=0, create=0, delete=0, submit=0):
-    payload = {
+def build_permission_payload(doctype: str, role: str, perm_level=0, read=1, write=0, create=0, delete=0, submit=0):
+    return {
         "doctype": "Custom DocPerm",
         "parenttype": "DocType",
         "parent": doctype,
@@ -121,9 +235,12 @@ def set_permission(api_url: str, auth: tuple, doctype: str, role: str, perm_leve
         "submit": submit
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/Custom DocPerm",
-        auth=auth,
+
+def set_permission(api_url: str, auth: tuple, doctype: str, role: str, perm_level=0, read=1, write=0, create=0, delete=0, submit=0):
+    payload = build_permission_payload(doctype, role, perm_level, read, write, create, delete, submit)
+
+    response = get_client(api_url, auth).post(
+        "/api/resource/Custom DocPerm",
         json=payload
     )
 
@@ -146,9 +263,8 @@ def create_notification(api_url: str, auth: tuple, subject: str, document_type:
         "message": message
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/Notification",
-        auth=auth,
+    response = get_client(api_url, auth).post(
+        "/api/resource/Notification",
         json=payload
     )
 
@@ -181,9 +297,8 @@ def create_scheduled_reminder(api_url: str, auth: tuple, doctype: str, condition
         "filters": condition
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/Auto Repeat",
-        auth=auth,
+    response = get_client(api_url, auth).post(
+        "/api/resource/Auto Repeat",
         json=payload
     )
     return response.json()
@@ -207,14 +322,15 @@ def create_department(api_url: str, api_key: str, api_secret: str, department_na
     }
     print("👉 DEBUG: Payload being sent to ERPNext:", payload)
 
-    response = requests.post(
-        f"{api_url}/api/resource/Department",
+    response = get_client(api_url).post(
+        "/api/resource/Department",
         headers=headers,
         json=payload
     )
 
     try:
         response.raise_for_status()
+        invalidate_metadata("departments")
         return response.json()
     except requests.exceptions.HTTPError as e:
         print("🔴 Department Creation Error:", response.text)
@@ -222,11 +338,8 @@ def create_department(api_url: str, api_key: str, api_secret: str, department_na
 
 
 
-def create_user(api_url: str, auth: tuple, first_name: str, email: str):
-    """
-    Create a new User in ERPNext.
-    """
-    payload = {
+def user_doc(first_name: str, email: str) -> dict:
+    return {
         "doctype": "User",
         "first_name": first_name,
         "email": email,
@@ -235,9 +348,15 @@ def create_user(api_url: str, auth: tuple, first_name: str, email: str):
         "send_welcome_email": 0
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/User",
-        auth=auth,
+
+def create_user(api_url: str, auth: tuple, first_name: str, email: str):
+    """
+    Create a new User in ERPNext.
+    """
+    payload = user_doc(first_name, email)
+
+    response = get_client(api_url, auth).post(
+        "/api/resource/User",
         json=payload
     )
 
@@ -259,9 +378,8 @@ def assign_role_to_user(api_url: str, auth: tuple, user_email: str, role_name: s
         "role": role_name
     }
 
-    response = requests.post(
-        f"{api_url}/api/method/frappe.core.doctype.user.user.add_role",
-        auth=auth,
+    response = get_client(api_url, auth).post(
+        "/api/method/frappe.core.doctype.user.user.add_role",
         json=payload
     )
 
@@ -275,21 +393,12 @@ def assign_role_to_user(api_url: str, auth: tuple, user_email: str, role_name: s
 
 
 
-def get_boq_records(api_url: str, auth: tuple, project_name: str = None):
-    params = {}
+def get_boq_records(api_url: str, auth: tuple, project_name: str = None, fields: list = None):
+    query = ListQuery("Project BOQ", fields=fields or BOQ_FIELDS)
     if project_name:
-        params["filters"] = f'[["Project BOQ", "project_name", "=", "{project_name}"]]'
-    
-    response = requests.get(
-        f"{api_url}/api/resource/Project BOQ",
-        auth=auth,
-        params=params
-    )
-    
-    if response.status_code == 200:
-        return response.json().get("data", [])
-    else:
-        return []
+        query.where("project_name", "=", project_name)
+
+    return list(iter_query(api_url, auth, query))
 
 
 
@@ -303,9 +412,8 @@ def create_management_fee_rule(api_url: str, auth: tuple, department_name: str,
         "monthly_fee": fee_amount
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/Management Fee Rule",
-        auth=auth,
+    response = get_client(api_url, auth).post(
+        "/api/resource/Management Fee Rule",
         json=payload
     )
 
@@ -328,9 +436,8 @@ def create_profit_sharing_rule(api_url: str, auth: tuple, department_name: str,
         "profit_percentage": percentage
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/Profit Sharing Rule",
-        auth=auth,
+    response = get_client(api_url, auth).post(
+        "/api/resource/Profit Sharing Rule",
         json=payload
     )
 
@@ -343,11 +450,8 @@ def create_profit_sharing_rule(api_url: str, auth: tuple, department_name: str,
 
 
 
-def create_prf(api_url: str, auth: tuple, project_name: str, item_name: str, quantity: float):
-    """
-    Create a new Purchase Request Form (PRF) in ERPNext.
-    """
-    payload = {
+def prf_doc(project_name: str, item_name: str, quantity: float) -> dict:
+    return {
         "doctype": "Purchase Request",  # or your PRF doctype name
         "project": project_name,
         "item_name": item_name,
@@ -355,9 +459,15 @@ def create_prf(api_url: str, auth: tuple, project_name: str, item_name: str, qua
         "status": "Draft"  # Initially PRFs are created as Drafts
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/Purchase Request",
-        auth=auth,
+
+def create_prf(api_url: str, auth: tuple, project_name: str, item_name: str, quantity: float):
+    """
+    Create a new Purchase Request Form (PRF) in ERPNext.
+    """
+    payload = prf_doc(project_name, item_name, quantity)
+
+    response = get_client(api_url, auth).post(
+        "/api/resource/Purchase Request",
         json=payload
     )
 
@@ -370,36 +480,20 @@ def create_prf(api_url: str, auth: tuple, project_name: str, item_name: str, qua
 
 
 
-def get_pending_prfs(api_url: str, auth: tuple, department_name: str = None):
+def get_pending_prfs(api_url: str, auth: tuple, department_name: str = None, fields: list = None):
     """
     Fetch pending PRFs (Draft or Open) optionally filtered by Department.
     """
-    filters = [["Purchase Request", "status", "in", ["Draft", "Open"]]]
+    query = ListQuery("Purchase Request", fields=fields or PRF_FIELDS).where("status", "in", ["Draft", "Open"])
 
     if department_name:
-        filters.append(["Purchase Request", "department", "=", department_name])
-
-    params = {
-        "filters": str(filters)
-    }
+        query.where("department", "=", department_name)
 
-    response = requests.get(
-        f"{api_url}/api/resource/Purchase Request",
-        auth=auth,
-        params=params
-    )
-
-    if response.status_code == 200:
-        return response.json().get("data", [])
-    else:
-        return []
+    return list(iter_query(api_url, auth, query))
 
 
-def create_claim(api_url: str, auth: tuple, project_name: str, claim_name: str, amount: float, due_date: str = None):
-    """
-    Create a new Claim in ERPNext.
-    """
-    payload = {
+def claim_doc(project_name: str, claim_name: str, amount: float, due_date: str = None) -> dict:
+    return {
         "doctype": "Project Claim",  # Or whatever your ERPNext Claim Doctype is called
         "project_name": project_name,
         "claim_name": claim_name,
@@ -408,9 +502,15 @@ def create_claim(api_url: str, auth: tuple, project_name: str, claim_name: str,
         "status": "Draft"
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/Project Claim",
-        auth=auth,
+
+def create_claim(api_url: str, auth: tuple, project_name: str, claim_name: str, amount: float, due_date: str = None):
+    """
+    Create a new Claim in ERPNext.
+    """
+    payload = claim_doc(project_name, claim_name, amount, due_date)
+
+    response = get_client(api_url, auth).post(
+        "/api/resource/Project Claim",
         json=payload
     )
 
@@ -423,39 +523,22 @@ def create_claim(api_url: str, auth: tuple, project_name: str, claim_name: str,
 
 
 
-def get_claims(api_url: str, auth: tuple, project_name: str = None, status: str = None):
+def get_claims(api_url: str, auth: tuple, project_name: str = None, status: str = None, fields: list = None):
     """
     Fetch claims from ERPNext, optionally filtered by project or status.
     """
-    filters = []
+    query = ListQuery("Project Claim", fields=fields or CLAIM_FIELDS)
 
     if project_name:
-        filters.append(["Project Claim", "project_name", "=", project_name])
+        query.where("project_name", "=", project_name)
     if status:
-        filters.append(["Project Claim", "status", "=", status])
+        query.where("status", "=", status)
 
-    params = {
-        "filters": str(filters)
-    }
+    return list(iter_query(api_url, auth, query))
 
-    response = requests.get(
-        f"{api_url}/api/resource/Project Claim",
-        auth=auth,
-        params=params
-    )
 
-    if response.status_code == 200:
-        return response.json().get("data", [])
-    else:
-        return []
-
-
-def create_project(api_url: str, auth: tuple, project_name: str, expected_end_date: str = None, estimated_cost: float = None):
-    """
-    Create a new Project in ERPNext with optional expected end date and estimated cost.
-    """
-
-    payload = {
+def project_doc(project_name: str, expected_end_date: str = None, estimated_cost: float = None) -> dict:
+    doc = {
         "doctype": "Project",
         "project_name": project_name,
         "project_type": "External",  # You can change to "Internal" if needed
@@ -464,15 +547,22 @@ def create_project(api_url: str, auth: tuple, project_name: str, expected_end_da
 
     # Add optional fields if provided
     if expected_end_date:
-        payload["expected_end_date"] = expected_end_date
+        doc["expected_end_date"] = expected_end_date
 
     if estimated_cost is not None:
-        payload["estimated_costing"] = estimated_cost
+        doc["estimated_costing"] = estimated_cost
+    return doc
+
+
+def create_project(api_url: str, auth: tuple, project_name: str, expected_end_date: str = None, estimated_cost: float = None):
+    """
+    Create a new Project in ERPNext with optional expected end date and estimated cost.
+    """
+    payload = project_doc(project_name, expected_end_date, estimated_cost)
 
     try:
-        response = requests.post(
-            f"{api_url}/api/resource/Project",
-            auth=auth,
+        response = get_client(api_url, auth).post(
+            "/api/resource/Project",
             json=payload
         )
         response.raise_for_status()
@@ -488,9 +578,8 @@ def assign_project_roles(api_url: str, auth: tuple, project_name: str, user_role
     user_role_pairs: list of tuples (user_email, role)
     """
     # Fetch the existing Project first
-    response = requests.get(
-        f"{api_url}/api/resource/Project/{project_name}",
-        auth=auth
+    response = get_client(api_url, auth).get(
+        f"/api/resource/Project/{project_name}"
     )
 
     if response.status_code != 200:
@@ -515,9 +604,8 @@ def assign_project_roles(api_url: str, auth: tuple, project_name: str, user_role
         "team_members": team_members
     }
 
-    update_response = requests.put(
-        f"{api_url}/api/resource/Project/{project_name}",
-        auth=auth,
+    update_response = get_client(api_url, auth).put(
+        f"/api/resource/Project/{project_name}",
         json=update_payload
     )
 
@@ -541,9 +629,8 @@ def generate_contract(api_url: str, auth: tuple, employee_name: str, monthly_sal
         "status": "Active"
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/Employment Contract",
-        auth=auth,
+    response = get_client(api_url, auth).post(
+        "/api/resource/Employment Contract",
         json=payload
     )
 
@@ -555,50 +642,25 @@ def generate_contract(api_url: str, auth: tuple, employee_name: str, monthly_sal
         return {"error": response.text}
 
 
-def get_salary_advances(api_url: str, auth: tuple, employee_name: str = None):
+def get_salary_advances(api_url: str, auth: tuple, employee_name: str = None, fields: list = None):
     """
     Fetch salary advance requests, optionally filtered by employee name.
     """
-    filters = []
+    query = ListQuery("Salary Advance", fields=fields or SALARY_ADVANCE_FIELDS)
 
     if employee_name:
-        filters.append(["Salary Advance", "employee_name", "=", employee_name])
-
-    params = {
-        "filters": str(filters)
-    }
+        query.where("employee_name", "=", employee_name)
 
-    response = requests.get(
-        f"{api_url}/api/resource/Salary Advance",
-        auth=auth,
-        params=params
-    )
-
-    if response.status_code == 200:
-        return response.json().get("data", [])
-    else:
-        return []
+    return list(iter_query(api_url, auth, query))
 
 
-def get_leave_balance(api_url: str, auth: tuple, employee_name: str):
+def get_leave_balance(api_url: str, auth: tuple, employee_name: str, fields: list = None):
     """
     Fetch leave balance for a specific employee.
     """
-    params = {
-        "filters": str([["Leave Allocation", "employee_name", "=", employee_name]])
-    }
+    query = ListQuery("Leave Allocation", fields=fields or LEAVE_ALLOCATION_FIELDS).where("employee_name", "=", employee_name)
 
-    response = requests.get(
-        f"{api_url}/api/resource/Leave Allocation",
-        auth=auth,
-        params=params
-    )
-
-    if response.status_code == 200:
-        leave_data = response.json().get("data", [])
-        return leave_data
-    else:
-        return []
+    return list(iter_query(api_url, auth, query))
 
 
 def add_vehicle(api_url: str, auth: tuple, vehicle_name: str, department: str = None):
@@ -613,9 +675,8 @@ def add_vehicle(api_url: str, auth: tuple, vehicle_name: str, department: str =
         "status": "Active"
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/Asset",
-        auth=auth,
+    response = get_client(api_url, auth).post(
+        "/api/resource/Asset",
         json=payload
     )
 
@@ -638,9 +699,8 @@ def schedule_vehicle_maintenance(api_url: str, auth: tuple, vehicle_name: str, f
         "status": "Planned"
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/Maintenance Schedule",
-        auth=auth,
+    response = get_client(api_url, auth).post(
+        "/api/resource/Maintenance Schedule",
         json=payload
     )
 
@@ -651,26 +711,15 @@ def schedule_vehicle_maintenance(api_url: str, auth: tuple, vehicle_name: str, f
         print("🔴 Vehicle Maintenance Scheduling Error:", response.text)
         return {"error": response.text}
 
-def get_all_assets(api_url: str, auth: tuple):
+def get_all_assets(api_url: str, auth: tuple, fields: list = None):
     """
     Fetch all vehicles/assets from ERPNext.
     """
-    response = requests.get(
-        f"{api_url}/api/resource/Asset",
-        auth=auth
-    )
-
-    if response.status_code == 200:
-        return response.json().get("data", [])
-    else:
-        return []
+    return list(iter_query(api_url, auth, ListQuery("Asset", fields=fields or ASSET_FIELDS)))
 
 
-def add_inventory_item(api_url: str, auth: tuple, item_name: str, quantity: int, department: str = None):
-    """
-    Add a new inventory item into ERPNext.
-    """
-    payload = {
+def inventory_item_doc(item_name: str, quantity: int, department: str = None) -> dict:
+    return {
         "doctype": "Item",
         "item_name": item_name,
         "opening_stock": quantity,
@@ -678,9 +727,15 @@ def add_inventory_item(api_url: str, auth: tuple, item_name: str, quantity: int,
         "default_warehouse": department
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/Item",
-        auth=auth,
+
+def add_inventory_item(api_url: str, auth: tuple, item_name: str, quantity: int, department: str = None):
+    """
+    Add a new inventory item into ERPNext.
+    """
+    payload = inventory_item_doc(item_name, quantity, department)
+
+    response = get_client(api_url, auth).post(
+        "/api/resource/Item",
         json=payload
     )
 
@@ -692,11 +747,8 @@ def add_inventory_item(api_url: str, auth: tuple, item_name: str, quantity: int,
         return {"error": response.text}
 
 
-def add_supplier(api_url: str, auth: tuple, supplier_name: str, contact_number: str = None):
-    """
-    Add a new Supplier into ERPNext.
-    """
-    payload = {
+def supplier_doc(supplier_name: str, contact_number: str = None) -> dict:
+    doc = {
         "doctype": "Supplier",
         "supplier_name": supplier_name,
         "supplier_group": "All Supplier Groups",  # You can adjust if you have different groups
@@ -704,11 +756,18 @@ def add_supplier(api_url: str, auth: tuple, supplier_name: str, contact_number:
     }
 
     if contact_number:
-        payload["contact_number"] = contact_number
+        doc["contact_number"] = contact_number
+    return doc
+
 
-    response = requests.post(
-        f"{api_url}/api/resource/Supplier",
-        auth=auth,
+def add_supplier(api_url: str, auth: tuple, supplier_name: str, contact_number: str = None):
+    """
+    Add a new Supplier into ERPNext.
+    """
+    payload = supplier_doc(supplier_name, contact_number)
+
+    response = get_client(api_url, auth).post(
+        "/api/resource/Supplier",
         json=payload
     )
 
@@ -722,62 +781,109 @@ def add_supplier(api_url: str, auth: tuple, supplier_name: str, contact_number:
 
 
 
-def generate_summary_report(api_url: str, auth: tuple):
+def count_query_params(doctype: str, filters: list = None) -> dict:
+    params = {"doctype": doctype}
+    if filters:
+        params["filters"] = json.dumps(filters)
+    return params
+
+
+def group_count_query_params(doctype: str, group_field: str = "status", filters: list = None) -> dict:
+    query = ListQuery(
+        doctype,
+        fields=[group_field, "count(name) as count"],
+        filters=list(filters or []),
+        group_by=group_field,
+        limit=0  # 0 = no limit; one row per distinct value
+    )
+    return query.to_params(include_doctype=True)
+
+
+def group_counts_from_rows(rows: list, group_field: str = "status") -> dict:
+    return {(row.get(group_field) or "Not Set"): row.get("count", 0) for row in rows}
+
+
+def get_count(api_url: str, auth: tuple, doctype: str, filters: list = None):
     """
-    Fetch PRFs, Claims, Expenses, and create a simple summary report.
+    Count rows of a Doctype on the server (frappe.client.get_count).
+    Returns None if the count could not be fetched.
     """
-    summary = {}
+    response = get_client(api_url, auth).get(
+        "/api/method/frappe.client.get_count",
+        params=count_query_params(doctype, filters)
+    )
+    if response.status_code == 200:
+        return response.json().get("message", 0)
+    return None
 
-    # Fetch PRFs
-    prf_response = requests.get(f"{api_url}/api/resource/PRF", auth=auth)
-    if prf_response.status_code == 200:
-        prfs = prf_response.json().get("data", [])
-        summary["Total PRFs"] = len(prfs)
-    else:
-        summary["Total PRFs"] = "Error Fetching"
-
-    # Fetch Claims
-    claim_response = requests.get(f"{api_url}/api/resource/Claim", auth=auth)
-    if claim_response.status_code == 200:
-        claims = claim_response.json().get("data", [])
-        summary["Total Claims"] = len(claims)
-    else:
-        summary["Total Claims"] = "Error Fetching"
-
-    # Fetch Expenses (if you track expenses in a specific Doctype)
-    expense_response = requests.get(f"{api_url}/api/resource/Expense Claim", auth=auth)
-    if expense_response.status_code == 200:
-        expenses = expense_response.json().get("data", [])
-        summary["Total Expenses"] = len(expenses)
-    else:
-        summary["Total Expenses"] = "Error Fetching"
-
-    # Fetch Projects
-    project_response = requests.get(f"{api_url}/api/resource/Project", auth=auth)
-    if project_response.status_code == 200:
-        projects = project_response.json().get("data", [])
-        summary["Total Projects"] = len(projects)
-    else:
-        summary["Total Projects"] = "Error Fetching"
 
-    return summary
+def get_group_counts(api_url: str, auth: tuple, doctype: str, group_field: str = "status", filters: list = None):
+    """
+    Count rows per distinct value of group_field with one group-by query,
+    e.g. {"Draft": 12, "Approved": 30}. Returns None if the query failed
+    (for instance when the Doctype has no such field).
+    """
+    response = get_client(api_url, auth).get(
+        "/api/method/frappe.client.get_list",
+        params=group_count_query_params(doctype, group_field, filters)
+    )
+    if response.status_code == 200:
+        return group_counts_from_rows(response.json().get("message", []), group_field)
+    return None
 
 
-def create_boq_entry(api_url: str, auth: tuple, project_name: str, item_name: str, quantity: float, price: float):
+# (summary name, doctype) pairs counted by generate_summary_report
+SUMMARY_DOCTYPES = [
+    ("PRFs", "PRF"),
+    ("Claims", "Claim"),
+    ("Expenses", "Expense Claim"),  # if you track expenses in a specific Doctype
+    ("Projects", "Project"),
+]
+
+
+def add_summary_counts(summary: dict, name: str, total, by_status: dict = None):
+    summary[f"Total {name}"] = total if total is not None else "Error Fetching"
+    if by_status is not None:
+        summary[f"{name} by Status"] = by_status
+
+
+def generate_summary_report(api_url: str, auth: tuple, filters: list = None, status_breakdown: bool = True):
     """
-    Create a new BOQ (Bill of Quantities) entry for a project.
+    Count PRFs, Claims, Expenses and Projects on the server and build a simple summary report.
+    - filters: optional ERPNext filters applied to every Doctype, e.g. [["creation", ">=", "2025-01-01"]]
+    - status_breakdown: also return per-status counts (one group-by query per Doctype;
+      the total is the sum of the groups, falling back to get_count if the Doctype has no status)
     """
-    payload = {
+    summary = {}
+
+    for name, doctype in SUMMARY_DOCTYPES:
+        by_status = get_group_counts(api_url, auth, doctype, "status", filters) if status_breakdown else None
+        if by_status is not None:
+            total = sum(by_status.values())
+        else:
+            total = get_count(api_url, auth, doctype, filters)
+        add_summary_counts(summary, name, total, by_status)
+
+    return summary
+
+
+def boq_entry_doc(project_name: str, item_name: str, quantity: float, price: float) -> dict:
+    return {
         "doctype": "Project BOQ",  # Assuming your ERPNext BOQ Doctype is called 'Project BOQ'
         "boq_item_description": item_name,
         "quantity": quantity,
         "budget_amount_rm": price,
-        
     }
 
-    response = requests.post(
-        f"{api_url}/api/resource/Project BOQ",
-        auth=auth,
+
+def create_boq_entry(api_url: str, auth: tuple, project_name: str, item_name: str, quantity: float, price: float):
+    """
+    Create a new BOQ (Bill of Quantities) entry for a project.
+    """
+    payload = boq_entry_doc(project_name, item_name, quantity, price)
+
+    response = get_client(api_url, auth).post(
+        "/api/resource/Project BOQ",
         json=payload
     )
 
@@ -797,9 +903,8 @@ def project_exists(api_url: str, auth: tuple, project_name: str) -> bool:
     Check if a project with the given name exists in ERPNext.
     """
     try:
-        response = requests.get(
-            f"{api_url}/api/resource/Project/{project_name}",
-            auth=auth
+        response = get_client(api_url, auth).get(
+            f"/api/resource/Project/{project_name}"
         )
         if response.status_code == 200:
             return True
@@ -808,3 +913,126 @@ def project_exists(api_url: str, auth: tuple, project_name: str) -> bool:
     except Exception as e:
         print("🔴 Project Check Error:", e)
         return False
+
+
+# ---- Bulk creation (frappe.client.insert_many) ----
+
+INSERT_MANY_CHUNK_SIZE = 200  # frappe.client.insert_many refuses more than 200 docs per call
+
+
+def insert_many(api_url: str, auth: tuple, docs: list, chunk_size: int = INSERT_MANY_CHUNK_SIZE, retry_failed_individually: bool = True):
+    """
+    Insert many documents with one frappe.client.insert_many call per chunk.
+    Each chunk is all-or-nothing on the ERPNext side, so when a chunk fails
+    (and retry_failed_individually is set) its documents are re-posted one by one
+    to find the bad rows and still insert the good ones. A chunk whose request
+    raises (timeout, dropped connection) is reported as failed, not retried,
+    because ERPNext may still have saved it.
+
+    Returns:
+    {
+        "inserted": [names of created documents],
+        "failed": [{"doc": {...}, "error": "..."}],
+        "chunks": [{"chunk": 0, "size": 200, "inserted": 200, "error": None}, ...],
+        "documents": [{"name": "...", "error": None}, ...]  # one per doc, in docs order
+    }
+    """
+    result = {"inserted": [], "failed": [], "chunks": [], "documents": []}
+    client = get_client(api_url, auth)
+
+    for index, start in enumerate(range(0, len(docs), chunk_size)):
+        chunk = docs[start:start + chunk_size]
+        try:
+            response = client.post(
+                "/api/method/frappe.client.insert_many",
+                json={"docs": json.dumps(chunk)}
+            )
+        except requests.exceptions.RequestException as e:
+            # e.g. a read timeout: the chunk may or may not have been saved, so
+            # it is reported as failed rather than re-posted one by one
+            print(f"🔴 Bulk Insert Error (chunk {index}):", e)
+            error = f"{e.__class__.__name__}: {e}"
+            result["failed"].extend({"doc": doc, "error": error} for doc in chunk)
+            result["documents"].extend({"name": None, "error": error} for doc in chunk)
+            result["chunks"].append({"chunk": index, "size": len(chunk), "inserted": 0, "error": error})
+            continue
+
+        if response.status_code == 200:
+            names = response.json().get("message", [])
+            result["inserted"].extend(names)
+            result["documents"].extend({"name": name, "error": None} for name in names)
+            result["chunks"].append({"chunk": index, "size": len(chunk), "inserted": len(names), "error": None})
+            continue
+
+        print(f"🔴 Bulk Insert Error (chunk {index}):", response.text)
+        chunk_report = {"chunk": index, "size": len(chunk), "inserted": 0, "error": response.text}
+
+        if retry_failed_individually:
+            for doc in chunk:
+                try:
+                    single = client.post(f"/api/resource/{doc['doctype']}", json=doc)
+                except requests.exceptions.RequestException as e:
+                    error = f"{e.__class__.__name__}: {e}"
+                    result["failed"].append({"doc": doc, "error": error})
+                    result["documents"].append({"name": None, "error": error})
+                    continue
+                if single.status_code == 200:
+                    name = single.json().get("data", {}).get("name")
+                    result["inserted"].append(name)
+                    result["documents"].append({"name": name, "error": None})
+                    chunk_report["inserted"] += 1
+                else:
+                    result["failed"].append({"doc": doc, "error": single.text})
+                    result["documents"].append({"name": None, "error": single.text})
+        else:
+            result["failed"].extend({"doc": doc, "error": response.text} for doc in chunk)
+            result["documents"].extend({"name": None, "error": response.text} for doc in chunk)
+
+        result["chunks"].append(chunk_report)
+
+    return result
+
+
+def create_boq_entries(api_url: str, auth: tuple, entries: list, **kwargs):
+    """
+    Bulk version of create_boq_entry.
+    entries: list of dicts with project_name, item_name, quantity, price
+    """
+    docs = [boq_entry_doc(e.get("project_name"), e["item_name"], e["quantity"], e["price"]) for e in entries]
+    return insert_many(api_url, auth, docs, **kwargs)
+
+
+def create_prfs(api_url: str, auth: tuple, prfs: list, **kwargs):
+    """
+    Bulk version of create_prf.
+    prfs: list of dicts with project_name, item_name, quantity
+    """
+    docs = [prf_doc(p["project_name"], p["item_name"], p["quantity"]) for p in prfs]
+    return insert_many(api_url, auth, docs, **kwargs)
+
+
+def add_inventory_items(api_url: str, auth: tuple, items: list, **kwargs):
+    """
+    Bulk version of add_inventory_item.
+    items: list of dicts with item_name, quantity and optional department
+    """
+    docs = [inventory_item_doc(i["item_name"], i["quantity"], i.get("department")) for i in items]
+    return insert_many(api_url, auth, docs, **kwargs)
+
+
+def add_suppliers(api_url: str, auth: tuple, suppliers: list, **kwargs):
+    """
+    Bulk version of add_supplier.
+    suppliers: list of dicts with supplier_name and optional contact_number
+    """
+    docs = [supplier_doc(s["supplier_name"], s.get("contact_number")) for s in suppliers]
+    return insert_many(api_url, auth, docs, **kwargs)
+
+
+def create_users(api_url: str, auth: tuple, users: list, **kwargs):
+    """
+    Bulk version of create_user.
+    users: list of dicts with first_name and email
+    """
+    docs = [user_doc(u["first_name"], u["email"]) for u in users]
+    return insert_many(api_url, auth, docs, **kwargs)
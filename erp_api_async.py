@@ -0,0 +1,236 @@
+import asyncio
+
+import httpx
+
+from erp_api import (
+    DEFAULT_PAGE_SIZE,
+    SUMMARY_DOCTYPES,
+    add_summary_counts,
+    build_permission_payload,
+    count_query_params,
+    group_count_query_params,
+    group_counts_from_rows,
+)
+from erp_cache import invalidate_metadata
+from erp_client import DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT
+from erp_query import ListQuery
+from erp_transport import RetryPolicy, TokenBucket, site_rate_limiter
+
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+class AsyncERPNextClient:
+    """
+    Async counterpart of erp_client.ERPNextClient built on httpx.AsyncClient.
+    At most max_concurrency requests are in flight at once, so fan-outs
+    (summary reports, per-doctype permissions) don't flood ERPNext.
+    Retries follow the same erp_transport policy as the sync client, and
+    requests draw from the site's shared rate limit (site_rate_limiter), so
+    async fan-outs and sync calls to one site stay under a single limit.
+    Both come from the environment unless passed in.
+
+    Use it as an async context manager inside a single event loop:
+
+        async with AsyncERPNextClient(api_url, auth) as client:
+            summary = await generate_summary_report(client)
+    """
+
+    def __init__(self, base_url: str, auth: tuple = None, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 retry_policy: RetryPolicy = None, rate_limiter: TokenBucket = None):
+        connect_timeout, read_timeout = timeout
+        self.retry_policy = retry_policy or RetryPolicy.from_env()
+        self.rate_limiter = rate_limiter or site_rate_limiter(base_url)
+        self._client = httpx.AsyncClient(
+            base_url=(base_url or "").rstrip("/"),
+            auth=auth,
+            headers={"Accept": "application/json"},
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        attempt = 0
+
+        while True:
+            async with self._semaphore:
+                if self.rate_limiter:
+                    await self.rate_limiter.acquire_async()
+                try:
+                    response = await self._client.request(method, "/" + path.lstrip("/"), **kwargs)
+                except httpx.TransportError as e:
+                    connect_failed = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                    if not self.retry_policy.retry_error(method, connect_failed, attempt):
+                        raise
+                    delay = self.retry_policy.delay(attempt)
+                    print(f"⚠️ {method} {path} failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+                else:
+                    if not self.retry_policy.retry_status(method, response.status_code, attempt):
+                        return response
+                    delay = self.retry_policy.delay(attempt, response.headers.get("Retry-After"))
+                    print(f"⚠️ {method} {path} returned {response.status_code}, retrying in {delay:.1f}s")
+
+            # wait outside the semaphore so backing-off requests don't hold a slot
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", path, **kwargs)
+
+    async def post(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", path, **kwargs)
+
+    async def put(self, path: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", path, **kwargs)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+def _json_or_error(response: httpx.Response, label: str) -> dict:
+    try:
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError:
+        print(f"🔴 {label}:", response.text)
+        return {"error": response.text}
+
+
+async def get_records_for_doctype(client: AsyncERPNextClient, doctype_name: str, fields: list = None, limit: int = None,
+                                  page_size: int = DEFAULT_PAGE_SIZE) -> list:
+    """
+    Async counterpart of erp_api.get_records_for_doctype: every row (or the
+    first `limit`), fetched page by page in name order.
+    Raises httpx.HTTPStatusError if a page cannot be fetched, so a failed
+    fetch never looks like a short (or empty) list.
+    """
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+
+    params = ListQuery(doctype_name, fields=fields or ["*"], order_by="name asc").to_params()
+    params["limit_page_length"] = page_size
+    rows = []
+    start = 0
+
+    while True:
+        params["limit_start"] = start
+        response = await client.get(f"/api/resource/{doctype_name}", params=params)
+        if response.status_code != 200:
+            print(f"🔴 Error fetching {doctype_name} records:", response.text)
+            raise httpx.HTTPStatusError(
+                f"Error fetching {doctype_name} records (from row {start}): {response.status_code} {response.text}",
+                request=response.request,
+                response=response
+            )
+
+        page = response.json().get("data", [])
+        rows.extend(page)
+        if limit is not None and len(rows) >= limit:
+            return rows[:limit]
+        if len(page) < page_size:
+            return rows
+        start += page_size
+
+
+async def create_role(client: AsyncERPNextClient, role_name: str):
+    response = await client.post(
+        "/api/resource/Role",
+        json={"doctype": "Role", "role_name": role_name}
+    )
+    result = _json_or_error(response, "Role Creation Error")
+    if "error" not in result:
+        invalidate_metadata("roles")
+    return result
+
+
+async def set_permission(client: AsyncERPNextClient, doctype: str, role: str, perm_level=0, read=1, write=0, create=0, delete=0, submit=0):
+    payload = build_permission_payload(doctype, role, perm_level, read, write, create, delete, submit)
+    response = await client.post("/api/resource/Custom DocPerm", json=payload)
+    return _json_or_error(response, "Permission Error")
+
+
+async def set_permissions(client: AsyncERPNextClient, doctypes: list, role: str, **perms) -> dict:
+    """
+    Set the same permissions for one role on many doctypes concurrently.
+    Returns {doctype: result} in the order the doctypes were given.
+    """
+    results = await asyncio.gather(*[
+        set_permission(client, doctype, role, **perms) for doctype in doctypes
+    ])
+    return dict(zip(doctypes, results))
+
+
+async def get_count(client: AsyncERPNextClient, doctype: str, filters: list = None):
+    response = await client.get("/api/method/frappe.client.get_count", params=count_query_params(doctype, filters))
+    if response.status_code == 200:
+        return response.json().get("message", 0)
+    return None
+
+
+async def get_group_counts(client: AsyncERPNextClient, doctype: str, group_field: str = "status", filters: list = None):
+    response = await client.get(
+        "/api/method/frappe.client.get_list",
+        params=group_count_query_params(doctype, group_field, filters)
+    )
+    if response.status_code == 200:
+        return group_counts_from_rows(response.json().get("message", []), group_field)
+    return None
+
+
+async def _summary_counts(client: AsyncERPNextClient, doctype: str, filters: list, status_breakdown: bool):
+    by_status = await get_group_counts(client, doctype, "status", filters) if status_breakdown else None
+    if by_status is not None:
+        return sum(by_status.values()), by_status
+    return await get_count(client, doctype, filters), None
+
+
+async def generate_summary_report(client: AsyncERPNextClient, filters: list = None, status_breakdown: bool = True) -> dict:
+    """
+    Same summary as erp_api.generate_summary_report, with all doctypes counted
+    in parallel so latency is roughly the slowest single request.
+    """
+    results = await asyncio.gather(*[
+        _summary_counts(client, doctype, filters, status_breakdown) for _, doctype in SUMMARY_DOCTYPES
+    ])
+
+    summary = {}
+    for (name, _), (total, by_status) in zip(SUMMARY_DOCTYPES, results):
+        add_summary_counts(summary, name, total, by_status)
+    return summary
+
+
+async def project_exists(client: AsyncERPNextClient, project_name: str) -> bool:
+    try:
+        response = await client.get(f"/api/resource/Project/{project_name}")
+        return response.status_code == 200
+    except httpx.HTTPError as e:
+        print("🔴 Project Check Error:", e)
+        return False
+
+
+# Blocking entry points for callers without an event loop (e.g. Streamlit scripts)
+
+def generate_summary_report_concurrently(api_url: str, auth: tuple, filters: list = None, status_breakdown: bool = True,
+                                         max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> dict:
+    async def run():
+        async with AsyncERPNextClient(api_url, auth, max_concurrency=max_concurrency) as client:
+            return await generate_summary_report(client, filters, status_breakdown)
+
+    return asyncio.run(run())
+
+
+def set_permissions_concurrently(api_url: str, auth: tuple, doctypes: list, role: str,
+                                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, **perms) -> dict:
+    async def run():
+        async with AsyncERPNextClient(api_url, auth, max_concurrency=max_concurrency) as client:
+            return await set_permissions(client, doctypes, role, **perms)
+
+    return asyncio.run(run())
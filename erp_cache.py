@@ -0,0 +1,142 @@
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Small in-process LRU cache whose entries expire after `ttl` seconds.
+    - maxsize: entries kept before the least recently used one is evicted
+    - ttl: default time-to-live in seconds
+    - persist_path: optional JSON file the cache is loaded from and written to,
+      so cached metadata survives process restarts (values must be JSON-serializable)
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 600, persist_path: str = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.persist_path = persist_path
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._load()
+
+    def get(self, key: str):
+        """
+        Return (True, value) on a fresh hit, (False, None) otherwise.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value, ttl: float = None):
+        with self._lock:
+            self._data[key] = (time.time() + (ttl if ttl is not None else self.ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            self._save()
+
+    def invalidate(self, prefix: str = ""):
+        """
+        Drop every entry whose key starts with prefix (all entries if empty).
+        """
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+            self._save()
+
+    def _load(self):
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            now = time.time()
+            for key, (expires_at, value) in stored.items():
+                if expires_at >= now:
+                    self._data[key] = (expires_at, value)
+        except (OSError, ValueError) as e:
+            print("🔴 Metadata cache load error:", e)
+
+    def _save(self):
+        if not self.persist_path:
+            return
+        try:
+            with open(self.persist_path, "w", encoding="utf-8") as f:
+                json.dump(self._data, f)
+        except (OSError, TypeError) as e:
+            print("🔴 Metadata cache save error:", e)
+
+
+_metadata_cache = None
+_metadata_cache_lock = threading.Lock()
+
+
+def get_metadata_cache() -> TTLCache:
+    """
+    The shared metadata cache, built on first use so the ERP_METADATA_* settings
+    are read after .env has been loaded (erp_api is often imported first).
+    """
+    global _metadata_cache
+    if _metadata_cache is None:
+        with _metadata_cache_lock:
+            if _metadata_cache is None:
+                from config import load_env
+
+                load_env()
+                _metadata_cache = TTLCache(
+                    maxsize=int(os.getenv("ERP_METADATA_CACHE_SIZE", 256)),
+                    ttl=float(os.getenv("ERP_METADATA_TTL", 600)),
+                    persist_path=os.getenv("ERP_METADATA_CACHE_FILE")
+                )
+    return _metadata_cache
+
+
+def _site_key(api_url: str, auth) -> str:
+    # Different API users may see different metadata; hash auth so secrets never hit the disk cache.
+    auth_hash = hashlib.sha256(repr(auth).encode()).hexdigest()[:12]
+    return f"{api_url}|{auth_hash}"
+
+
+def cached_metadata(namespace: str, ttl: float = None):
+    """
+    Cache the result of an erp_api metadata function `fn(api_url, auth, *args)`.
+    Empty results (which erp_api functions return on errors) are not cached.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(api_url, auth, *args, **kwargs):
+            key = f"{namespace}|{_site_key(api_url, auth)}|{json.dumps([args, kwargs], sort_keys=True, default=str)}"
+            cache = get_metadata_cache()
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            value = fn(api_url, auth, *args, **kwargs)
+            if value:
+                cache.set(key, value, ttl)
+            return value
+        return wrapper
+    return decorator
+
+
+def invalidate_metadata(*namespaces: str):
+    """
+    Drop cached entries for the given namespaces (everything if none given),
+    e.g. invalidate_metadata("doctypes") after creating a DocType.
+    """
+    cache = get_metadata_cache()
+    if not namespaces:
+        cache.invalidate()
+    for namespace in namespaces:
+        cache.invalidate(f"{namespace}|")
@@ -0,0 +1,135 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from erp_transport import RetryPolicy, TokenBucket, site_rate_limiter
+
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (5, 30)  # (connect, read) seconds
+
+
+class ERPNextClient:
+    """
+    Thin wrapper around a pooled requests.Session bound to one ERPNext site.
+    - base_url: the ERPNext site URL (e.g. https://erp.example.com)
+    - auth: (api_key, api_secret) tuple, or None to pass auth per request
+    - pool_size: max keep-alive connections kept open to the site
+    - timeout: default (connect, read) timeout in seconds
+    - retry_policy: erp_transport.RetryPolicy for timeouts, 429s and 5xx (None = no retries)
+    - rate_limiter: erp_transport.TokenBucket shared by the requests to this site (None = unlimited)
+    """
+
+    def __init__(self, base_url: str, auth: tuple = None, pool_size: int = DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 retry_policy: RetryPolicy = None, rate_limiter: TokenBucket = None):
+        self.base_url = (base_url or "").rstrip("/")
+        self.timeout = timeout
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=0)
+        self.rate_limiter = rate_limiter
+
+        self.session = requests.Session()
+        self.session.auth = auth
+        self.session.headers.update({
+            "Accept": "application/json",
+            "Connection": "keep-alive"
+        })
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Send a request under the client's rate limit, retrying per its retry policy.
+        Returns the last response (callers keep handling error statuses as before);
+        transport errors are re-raised once retries are exhausted.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                response = self.session.request(method, self.url(path), **kwargs)
+            except requests.exceptions.RequestException as e:
+                if not self.retry_policy.retry_error(method, _connect_failed(e), attempt):
+                    raise
+                delay = self.retry_policy.delay(attempt)
+                print(f"⚠️ {method} {path} failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+            else:
+                if not self.retry_policy.retry_status(method, response.status_code, attempt):
+                    return response
+                delay = self.retry_policy.delay(attempt, response.headers.get("Retry-After"))
+                print(f"⚠️ {method} {path} returned {response.status_code}, retrying in {delay:.1f}s")
+
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path: str, **kwargs) -> requests.Response:
+        return self.request("PUT", path, **kwargs)
+
+    def delete(self, path: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+def _connect_failed(error: requests.exceptions.RequestException) -> bool:
+    # True when the request never reached ERPNext, so even a POST is safe to resend
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_url: str, auth: tuple = None, pool_size: int = DEFAULT_POOL_SIZE) -> ERPNextClient:
+    """
+    Return the shared client for (api_url, auth), creating it on first use.
+    Every erp_api function goes through here so connections are reused
+    across calls (and across Streamlit reruns within the same process).
+    Clients retry per RetryPolicy.from_env() and share the site's rate limit
+    (erp_transport.site_rate_limiter) with every other client of that site.
+    """
+    key = (api_url, auth)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = ERPNextClient(
+                    api_url,
+                    auth,
+                    pool_size=pool_size,
+                    retry_policy=RetryPolicy.from_env(),
+                    rate_limiter=site_rate_limiter(api_url)
+                )
+                _clients[key] = client
+    return client
+
+
+def close_clients():
+    """
+    Close every shared client (e.g. at process shutdown or in scripts).
+    """
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
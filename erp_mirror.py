@@ -0,0 +1,213 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from erp_query import ListQuery
+
+
+DEFAULT_MAX_STALENESS = 300        # seconds before a read triggers an incremental sync
+DEFAULT_FULL_SYNC_INTERVAL = 86400  # full reload (picks up deleted rows) once a day
+SYNC_PAGE_SIZE = 500
+
+
+def _like_to_regex(pattern: str):
+    return re.compile("^" + re.escape(str(pattern)).replace("%", ".*").replace("_", ".") + "$", re.IGNORECASE)
+
+
+def _matches(row: dict, condition: list) -> bool:
+    # ERPNext filter rows are [doctype, field, operator, value] or [field, operator, value]
+    fieldname, operator, value = condition[-3:]
+    actual = row.get(fieldname)
+    operator = operator.lower()
+
+    if operator == "=":
+        return actual == value
+    if operator == "!=":
+        return actual != value
+    if operator == "in":
+        return actual in value
+    if operator == "not in":
+        return actual not in value
+    if operator == "like":
+        return actual is not None and bool(_like_to_regex(value).match(str(actual)))
+    if operator == "not like":
+        return actual is None or not _like_to_regex(value).match(str(actual))
+    if operator == "is":
+        return (actual not in (None, "")) if value == "set" else (actual in (None, ""))
+    if actual is None:
+        return False
+    if operator == ">":
+        return actual > value
+    if operator == "<":
+        return actual < value
+    if operator == ">=":
+        return actual >= value
+    if operator == "<=":
+        return actual <= value
+    raise ValueError(f"Unsupported filter operator for the local mirror: {operator}")
+
+
+class ERPMirror:
+    """
+    Opt-in local SQLite copy of selected ERPNext Doctypes.
+    - db_path: SQLite file holding the mirrored rows
+    - api_url / auth: the ERPNext site being mirrored
+    - doctypes: Doctypes to mirror (e.g. ["Project BOQ", "Project Claim"])
+    - max_staleness: reads sync first if the last sync is older than this (seconds)
+    - full_sync_interval: how often a full reload replaces the incremental sync,
+      since syncing on `modified` cannot see deleted rows
+
+    The first sync of a Doctype loads every row page by page; later syncs only
+    fetch rows whose `modified` timestamp is at or after the last one seen.
+    """
+
+    def __init__(self, db_path: str, api_url: str, auth: tuple, doctypes: list,
+                 max_staleness: float = DEFAULT_MAX_STALENESS, full_sync_interval: float = DEFAULT_FULL_SYNC_INTERVAL):
+        self.db_path = db_path
+        self.api_url = api_url
+        self.auth = auth
+        self.doctypes = set(doctypes)
+        self.max_staleness = max_staleness
+        self.full_sync_interval = full_sync_interval
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " doctype TEXT NOT NULL,"
+            " name TEXT NOT NULL,"
+            " modified TEXT,"
+            " data TEXT NOT NULL,"
+            " PRIMARY KEY (doctype, name));"
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            " doctype TEXT PRIMARY KEY,"
+            " last_modified TEXT,"
+            " last_synced_at REAL,"
+            " last_full_sync_at REAL);"
+        )
+        self._conn.commit()
+
+    def covers(self, api_url: str, query: ListQuery) -> bool:
+        """
+        Whether a list query can be answered from the mirror: same site, a
+        mirrored Doctype, and no server-side aggregation.
+        """
+        return (
+            api_url == self.api_url
+            and query.doctype in self.doctypes
+            and not query.group_by
+            and not any("(" in f for f in query.fields)
+        )
+
+    def _state(self, doctype: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_modified, last_synced_at, last_full_sync_at FROM sync_state WHERE doctype = ?", (doctype,)
+            ).fetchone()
+        return row or (None, None, None)
+
+    def sync(self, doctype: str, full: bool = False) -> int:
+        """
+        Pull changes for one Doctype from ERPNext. Returns the number of rows written.
+        Every page is fetched before anything is written; if a page fails the
+        requests error is raised and the mirror keeps its previous rows and
+        sync state.
+        """
+        from erp_api import iter_query  # erp_api imports this module's users lazily
+
+        with self._lock:
+            last_modified, _, last_full_sync_at = self._state(doctype)
+            now = time.time()
+            full = full or last_modified is None or (now - (last_full_sync_at or 0)) > self.full_sync_interval
+
+            # name breaks ties: rows sharing a timestamp must keep one order across pages
+            query = ListQuery(doctype, fields=["*"], order_by="modified asc, name asc")
+            if not full:
+                # ">=" re-reads rows sharing the last timestamp; upserts make that harmless
+                query.where("modified", ">=", last_modified)
+
+            newest = None if full else last_modified
+            fetched = []
+            for row in iter_query(self.api_url, self.auth, query, page_size=SYNC_PAGE_SIZE, use_mirror=False):
+                fetched.append((doctype, row.get("name"), row.get("modified"), json.dumps(row, default=str)))
+                if row.get("modified") and (newest is None or row["modified"] > newest):
+                    newest = row["modified"]
+
+            # One transaction: the rows and the sync state change together or not at all
+            with self._conn:
+                if full:
+                    self._conn.execute("DELETE FROM records WHERE doctype = ?", (doctype,))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO records (doctype, name, modified, data) VALUES (?, ?, ?, ?)", fetched
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sync_state (doctype, last_modified, last_synced_at, last_full_sync_at) VALUES (?, ?, ?, ?)",
+                    (doctype, newest, now, now if full else last_full_sync_at)
+                )
+            print(f"🔄 Mirror sync {doctype}: {len(fetched)} rows ({'full' if full else 'incremental'})")
+            return len(fetched)
+
+    def sync_all(self, full: bool = False) -> dict:
+        return {doctype: self.sync(doctype, full) for doctype in sorted(self.doctypes)}
+
+    def ensure_fresh(self, doctype: str):
+        _, last_synced_at, _ = self._state(doctype)
+        if last_synced_at is None or time.time() - last_synced_at > self.max_staleness:
+            self.sync(doctype)
+
+    def iter_query(self, query: ListQuery, limit: int = None):
+        """
+        Answer a ListQuery from the local copy (filters, field projection,
+        simple "field asc/desc" ordering, start and limit).
+        """
+        self.ensure_fresh(query.doctype)
+
+        with self._lock:
+            rows = [json.loads(data) for (data,) in self._conn.execute(
+                "SELECT data FROM records WHERE doctype = ?", (query.doctype,)
+            )]
+
+        rows = [row for row in rows if all(_matches(row, condition) for condition in query.filters)]
+
+        if query.order_by:
+            for clause in reversed(query.order_by.split(",")):
+                parts = clause.split()
+                fieldname = parts[0].strip("`")
+                reverse = len(parts) > 1 and parts[1].lower() == "desc"
+                rows.sort(key=lambda r: (r.get(fieldname) is None, r.get(fieldname) if r.get(fieldname) is not None else 0),
+                          reverse=reverse)
+
+        start = query.start or 0
+        end = start + limit if limit is not None else None
+        fields = [f for f in query.fields if f != "*"]
+
+        for row in rows[start:end]:
+            yield {f: row.get(f) for f in fields} if fields and "*" not in query.fields else row
+
+
+def enable_from_env(api_url: str, auth: tuple):
+    """
+    Turn on the mirror for erp_api when ERP_MIRROR_DOCTYPES is set, e.g.
+    ERP_MIRROR_DOCTYPES="Project BOQ,Project Claim,Purchase Request"
+    (optional: ERP_MIRROR_PATH, ERP_MIRROR_MAX_STALENESS). Safe to call on every rerun.
+    """
+    doctypes = [d.strip() for d in os.getenv("ERP_MIRROR_DOCTYPES", "").split(",") if d.strip()]
+    if not doctypes:
+        return None
+
+    import erp_api
+
+    if erp_api.get_mirror() is not None:
+        return erp_api.get_mirror()
+
+    mirror = ERPMirror(
+        os.getenv("ERP_MIRROR_PATH", "erp_mirror.sqlite"),
+        api_url,
+        auth,
+        doctypes,
+        max_staleness=float(os.getenv("ERP_MIRROR_MAX_STALENESS", DEFAULT_MAX_STALENESS))
+    )
+    erp_api.use_mirror(mirror)
+    return mirror
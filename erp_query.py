@@ -0,0 +1,57 @@
+import json
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ListQuery:
+    """
+    Declarative ERPNext list query, shared by every list function in erp_api.
+    - doctype: the Doctype to query (e.g. "Project Claim")
+    - fields: columns to return; ERPNext returns only "name" if empty
+    - filters: ERPNext filter rows [doctype, fieldname, operator, value]
+    - order_by / group_by: SQL-style clauses, e.g. "modified desc", "status"
+    - limit: rows per request (limit_page_length); 0 = no limit
+    - start: offset of the first row (limit_start)
+
+    Example:
+        query = ListQuery("Project Claim", fields=["name", "amount"]).where("status", "=", "Draft")
+        params = query.to_params()
+    """
+    doctype: str
+    fields: list = field(default_factory=list)
+    filters: list = field(default_factory=list)
+    order_by: str = None
+    group_by: str = None
+    limit: int = None
+    start: int = None
+
+    def where(self, fieldname: str, operator: str, value) -> "ListQuery":
+        self.filters.append([self.doctype, fieldname, operator, value])
+        return self
+
+    def select(self, *fieldnames: str) -> "ListQuery":
+        self.fields.extend(fieldnames)
+        return self
+
+    def to_params(self, include_doctype: bool = False) -> dict:
+        """
+        Serialize to request parameters, JSON-encoding fields and filters once.
+        include_doctype is needed for /api/method endpoints (frappe.client.*),
+        where the Doctype is not part of the URL.
+        """
+        params = {}
+        if include_doctype:
+            params["doctype"] = self.doctype
+        if self.fields:
+            params["fields"] = json.dumps(self.fields)
+        if self.filters:
+            params["filters"] = json.dumps(self.filters)
+        if self.order_by:
+            params["order_by"] = self.order_by
+        if self.group_by:
+            params["group_by"] = self.group_by
+        if self.limit is not None:
+            params["limit_page_length"] = self.limit
+        if self.start is not None:
+            params["limit_start"] = self.start
+        return params
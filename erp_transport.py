@@ -0,0 +1,140 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+@dataclass
+class RetryPolicy:
+    """
+    When and how long to wait before re-sending an ERPNext request.
+    - Idempotent methods (GET, PUT, DELETE, ...) are retried on timeouts,
+      connection errors and the retry_statuses.
+    - POST is only retried when ERPNext cannot have processed it: a 429
+      (rejected by the rate limiter) or a connection that was never opened.
+    Waits grow exponentially (backoff_base * 2^attempt, capped at backoff_max)
+    with full jitter, unless the response carries a Retry-After header.
+    """
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 10.0
+    retry_statuses: set = field(default_factory=lambda: {429, 502, 503, 504})
+
+    @classmethod
+    def from_env(cls):
+        """
+        Defaults overridable with ERP_MAX_RETRIES / ERP_BACKOFF_BASE / ERP_BACKOFF_MAX.
+        """
+        return cls(
+            max_retries=int(os.getenv("ERP_MAX_RETRIES", 3)),
+            backoff_base=float(os.getenv("ERP_BACKOFF_BASE", 0.5)),
+            backoff_max=float(os.getenv("ERP_BACKOFF_MAX", 10.0)),
+        )
+
+    def retry_status(self, method: str, status_code: int, attempt: int) -> bool:
+        if attempt >= self.max_retries or status_code not in self.retry_statuses:
+            return False
+        return method.upper() in IDEMPOTENT_METHODS or status_code == 429
+
+    def retry_error(self, method: str, connect_failed: bool, attempt: int) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        return method.upper() in IDEMPOTENT_METHODS or connect_failed
+
+    def delay(self, attempt: int, retry_after: str = None) -> float:
+        """
+        Seconds to wait before retry number attempt + 1.
+        """
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+def parse_retry_after(value: str):
+    """
+    Retry-After as seconds (it may be a number of seconds or an HTTP date), or None.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Client-side rate limiter: on average `rate` requests per second, with
+    bursts of up to `capacity`. Callers reserve a token under the lock and
+    sleep outside it, so the same bucket works from threads (acquire) and
+    from an event loop (acquire_async).
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """
+        A bucket from ERP_RATE_LIMIT (requests/second) and ERP_RATE_BURST,
+        or None when no rate limit is configured.
+        """
+        rate = float(os.getenv("ERP_RATE_LIMIT", 0) or 0)
+        if rate <= 0:
+            return None
+        return cls(rate, float(os.getenv("ERP_RATE_BURST", 0) or 0) or None)
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+_site_limiters = {}
+_site_limiters_lock = threading.Lock()
+
+
+def site_rate_limiter(api_url: str):
+    """
+    The TokenBucket shared by every sync and async client of one ERPNext site,
+    created from the environment on first use (None when no rate limit is
+    configured), so new clients don't each start with their own full burst.
+    """
+    key = (api_url or "").rstrip("/")
+    limiter = _site_limiters.get(key)
+    if limiter is None:
+        with _site_limiters_lock:
+            limiter = _site_limiters.get(key)
+            if limiter is None:
+                limiter = TokenBucket.from_env()
+                if limiter is not None:
+                    _site_limiters[key] = limiter
+    return limiter
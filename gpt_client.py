@@ -1,42 +1,227 @@
-from openai import OpenAI
+import json
 import os
-from dotenv import load_dotenv
+import threading
+import time
+
+from config import load_env
+from erp_transport import RetryPolicy
+from llm_cache import LLMResponseCache, get_response_cache
 
 # Load environment variables
-load_dotenv()
+load_env()
+
+TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", 60))              # seconds per OpenAI request
+MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", 4))  # OpenAI calls in flight per process
+RETRY_POLICY = RetryPolicy(
+    max_retries=int(os.getenv("OPENAI_MAX_RETRIES", 3)),
+    backoff_base=1.0,
+    backoff_max=30.0
+)
+
+# OpenAI client, built by get_client() on first use: importing openai is the
+# slowest part of starting the app, and most reruns never call GPT.
+# Assign your own client here to replace it.
+client = None
+_client_lock = threading.Lock()
+
+MODEL = "gpt-4o-mini"  # or "gpt-4-turbo", etc
+MAX_TOKENS = 1000
+ADVISOR_SYSTEM_MESSAGE = "You are an expert ERPNext assistant and business consultant."
+
+# Shared by every Streamlit session in the process, so a burst of users queues
+# here instead of piling rate-limited requests onto OpenAI
+_call_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+
+class GPTError(Exception):
+    """
+    An OpenAI call failed (after retrying, where retrying makes sense).
+    """
+
+
+class GPTRateLimitError(GPTError):
+    pass
+
+
+class GPTTimeoutError(GPTError):
+    pass
+
+
+def get_client():
+    """
+    The shared OpenAI client (retries are handled by _create_completion).
+    """
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                from openai import OpenAI
+
+                client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), timeout=TIMEOUT, max_retries=0)
+    return client
+
+
+def _to_gpt_error(error: Exception) -> GPTError:
+    import openai
+
+    if isinstance(error, openai.RateLimitError):
+        return GPTRateLimitError(f"rate limit reached ({error})")
+    if isinstance(error, openai.APITimeoutError):
+        return GPTTimeoutError(f"request timed out after {TIMEOUT:.0f}s")
+    return GPTError(str(error))
+
+
+def _create_with_retries(**kwargs):
+    import openai
+
+    completions = get_client().chat.completions
+    retryable_errors = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+    attempt = 0
+    while True:
+        try:
+            return completions.create(**kwargs)
+        except retryable_errors as e:
+            if attempt >= RETRY_POLICY.max_retries:
+                raise _to_gpt_error(e) from e
+            response = getattr(e, "response", None)
+            delay = RETRY_POLICY.delay(attempt, response.headers.get("retry-after") if response is not None else None)
+            print(f"⚠️ OpenAI call failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+        except openai.OpenAIError as e:
+            raise _to_gpt_error(e) from e
+
+        # the slot stays taken while backing off, so retries slow the burst down
+        time.sleep(delay)
+        attempt += 1
+
+
+def _create_completion(**kwargs):
+    """
+    chat.completions.create with a per-request timeout, at most MAX_CONCURRENCY
+    calls in flight and retries with backoff on rate limits, timeouts and 5xx.
+    Raises GPTError (or a subclass) when the call ultimately fails.
+    """
+    with _call_slots:
+        return _create_with_retries(**kwargs)
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 def ask_gpt(prompt: str) -> str:
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # or "gpt-4-turbo", etc
-            messages=[
-                {"role": "system", "content": "You are an expert ERPNext assistant and business consultant."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2,
-            max_tokens=1000,
-        )
-        return response.choices[0].message.content.strip()
+    response = _create_completion(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": ADVISOR_SYSTEM_MESSAGE},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.2,
+        max_tokens=MAX_TOKENS,
+    )
+    return response.choices[0].message.content.strip()
+
+
+def ask_gpt_custom(system_message: str, user_prompt: str, response_format: dict = None) -> str:
+    """
+    One blocking completion for a custom system message. Raises GPTError on failure
+    (failures are never cached).
+    - response_format: optional OpenAI response_format, e.g. a JSON schema (see ask_gpt_structured)
+    """
+    # temperature=0 makes the answer deterministic, so identical requests are served from the response cache
+    params = {"temperature": 0, "max_tokens": MAX_TOKENS}
+    if response_format:
+        params["response_format"] = response_format
+    cache = get_response_cache()
+    cache_key = LLMResponseCache.make_key(MODEL, system_message, user_prompt, params)
+
+    if cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    response = _create_completion(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": user_prompt}
+        ],
+        **params,
+    )
+    message = response.choices[0].message
+    if message.content is None:
+        raise GPTError(getattr(message, "refusal", None) or "OpenAI returned an empty response")
+    answer = message.content.strip()
 
-    except Exception as e:
-        return f"Error contacting OpenAI: {e}"
+    if cache:
+        cache.set(cache_key, answer)
+    return answer
 
 
-def ask_gpt_custom(system_message: str, user_prompt: str) -> str:
+def ask_gpt_structured(system_message: str, user_prompt: str, name: str, schema: dict) -> dict:
+    """
+    Ask for an answer that follows a JSON schema (OpenAI structured outputs,
+    strict mode) and return it parsed. Raises GPTError if no valid JSON comes back.
+    """
+    response_format = {
+        "type": "json_schema",
+        "json_schema": {"name": name, "strict": True, "schema": schema},
+    }
+    answer = ask_gpt_custom(system_message, user_prompt, response_format)
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        return json.loads(answer)
+    except ValueError as e:
+        raise GPTError(f"invalid JSON for {name}: {e}") from e
+
+
+class TimedStream:
+    """
+    Wraps a token generator and records time-to-first-token and total time
+    (in seconds, measured from when the request was started).
+    """
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self.started = time.perf_counter()
+        self.time_to_first_token = None
+        self.total_time = None
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            if self.time_to_first_token is None:
+                self.time_to_first_token = time.perf_counter() - self.started
+            yield chunk
+        self.total_time = time.perf_counter() - self.started
+        print(f"⏱️ GPT stream: first token {self.time_to_first_token or 0:.2f}s, total {self.total_time:.2f}s")
+
+
+def _stream_completion(system_message: str, user_prompt: str, temperature: float):
+    import openai
+
+    # The call slot is held until the stream has been read to the end
+    with _call_slots:
+        stream = _create_with_retries(
+            model=MODEL,
             messages=[
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": user_prompt}
             ],
-            temperature=0,
-            max_tokens=1000,
+            temperature=temperature,
+            max_tokens=MAX_TOKENS,
+            stream=True,
         )
-        return response.choices[0].message.content.strip()
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except openai.OpenAIError as e:
+            raise _to_gpt_error(e) from e
+
+
+def ask_gpt_stream(prompt: str) -> TimedStream:
+    """
+    Streaming variant of ask_gpt: iterate to receive the answer token by token.
+    Iterating raises GPTError if the call fails.
+    """
+    return TimedStream(_stream_completion(ADVISOR_SYSTEM_MESSAGE, prompt, 0.2))
+
 
-    except Exception as e:
-        return f"Error contacting OpenAI: {e}"
+def ask_gpt_custom_stream(system_message: str, user_prompt: str) -> TimedStream:
+    """
+    Streaming variant of ask_gpt_custom (not cached, since the answer is consumed as it arrives).
+    """
+    return TimedStream(_stream_completion(system_message, user_prompt, 0))
@@ -1,49 +1,48 @@
 import re
-import json
-from gpt_client import ask_gpt
-from gpt_client import ask_gpt_custom
+from dataclasses import dataclass, field
+from typing import Literal, Optional
+from gpt_client import GPTError
+from structured_output import extract
+from rule_extraction import FieldRule, RuleExtractor, flag, number, title
+from keyword_automaton import KeywordAutomaton
 
 
-def parse_doctype_prompt(prompt: str):
-    from gpt_client import ask_gpt_custom
-    import json
+ERPNEXT_FIELDTYPES = Literal[
+    "Data", "Int", "Float", "Currency", "Percent", "Check", "Date", "Datetime", "Time",
+    "Select", "Link", "Small Text", "Text", "Long Text", "Attach"
+]
+
+
+@dataclass
+class DoctypeFieldSpec:
+    label: str
+    fieldtype: ERPNEXT_FIELDTYPES
+
+
+@dataclass
+class DoctypeSpec:
+    doctype_name: str
+    fields: list[DoctypeFieldSpec] = field(default_factory=list)
 
+
+def parse_doctype_prompt(prompt: str):
     RESERVED_FIELDNAMES = {"name", "owner", "creation", "modified", "modified_by", "docstatus"}
 
     system_message = (
         "You are an ERP Assistant.\n"
         "Your job is to extract the following information from the user's instruction to create a custom Doctype:\n"
-        "- doctype_name (string)\n"
-        "- fields (list of objects, each having 'label', 'fieldname', and 'fieldtype')\n\n"
-        "fieldname should be generated automatically by converting the label to lowercase and replacing spaces with underscores.\n"
-        "If the fieldname is a reserved ERPNext word (like 'name', 'owner', 'creation'), add '_field' to it.\n\n"
-        "Respond ONLY in pure JSON format like this:\n"
-        "{\n"
-        "  \"doctype_name\": \"\",\n"
-        "  \"fields\": [\n"
-        "    {\"label\": \"\", \"fieldname\": \"\", \"fieldtype\": \"\"}\n"
-        "  ]\n"
-        "}"
+        "- doctype_name\n"
+        "- fields: one entry per field with its label and ERPNext fieldtype"
     )
 
     try:
-        gpt_response = ask_gpt_custom(system_message, prompt)
-
-        print("🛠 RAW GPT RESPONSE (DOCTYPE PARSE):")
-        print(gpt_response)
-
-        if gpt_response.startswith("```"):
-            gpt_response = gpt_response.strip('```json').strip('```').strip()
-
-        parsed_data = json.loads(gpt_response)
-
-        doctype_name = parsed_data.get("doctype_name", "UnnamedDoctype")
-        raw_fields = parsed_data.get("fields", [])
+        spec = extract(DoctypeSpec, system_message, prompt)
+        print("🛠 DOCTYPE PARSE:", spec)
 
         fields = []
-        for field in raw_fields:
-            label = field.get("label")
-            fieldtype = field.get("fieldtype")
+        for doctype_field in spec.fields:
+            label = doctype_field.label
+            fieldtype = doctype_field.fieldtype
 
             fieldname = label.lower().replace(" ", "_")
             if fieldname in RESERVED_FIELDNAMES:
@@ -56,34 +55,41 @@ def parse_doctype_prompt(prompt: str):
             }
 
             # Special handling for Link fields
-            if fieldtype.lower() == "link":
+            if fieldtype == "Link":
                 field_entry["options"] = "Project"  # or any default Doctype you want
 
             fields.append(field_entry)
 
-        return doctype_name, fields
+        return spec.doctype_name or "UnnamedDoctype", fields
 
-    except Exception as e:
-        print("🔴 Doctype Parsing Error:", e)
+    except GPTError as e:
+        print("🔴 OpenAI Error:", e)
         return "UnnamedDoctype", []
 
 
 
 
 
+
+WORKFLOW_RULES = RuleExtractor([
+    FieldRule("document_type", r"for\s+(.*?)\s+where", convert=lambda v: v.rstrip('s'), default="Document"),
+    FieldRule("roles", r"\b(\w+)\s+(?:submits|approves?)", find_all=True),
+], lowercase=False, flags=re.IGNORECASE)
+
+
 def parse_workflow_prompt(prompt: str):
     """
     Parses a workflow creation instruction into Doctype, States, and Transitions.
     Example prompt:
     "Set up an approval workflow for PRFs where HOD submits and Director approves."
     """
+    parsed = WORKFLOW_RULES.extract(prompt)
 
     # Guess Doctype from sentence
-    doctype_match = re.search(r"for\s+(.*?)\s+where", prompt, re.IGNORECASE)
-    document_type = doctype_match.group(1).rstrip('s') if doctype_match else "Document"
+    document_type = parsed["document_type"]
 
     # Extract roles involved
-    roles = re.findall(r"\b(\w+)\s+(?:submits|approves?)", prompt, re.IGNORECASE)
+    roles = parsed["roles"]
 
     if not roles or len(roles) < 2:
         # fallback if not properly matched
@@ -171,33 +177,36 @@ def parse_notification_prompt(prompt: str):
     return subject, document_type, condition, message
 
 
+REMINDER_KEYWORDS = KeywordAutomaton(["weekly", "monthly", "daily", "prf", "claim"])
+
+
 def parse_reminder_prompt(prompt: str):
     """
     Parse reminder prompts like:
     "Send weekly reminders for all pending PRFs."
     """
-    prompt = prompt.lower()
+    found = REMINDER_KEYWORDS.find(prompt.lower())
     cron = ""
     document_type = ""
     condition = ""
     message = ""
 
     # Simple mapping based on common patterns
-    if "weekly" in prompt:
+    if "weekly" in found:
         cron = "0 9 * * MON"  # every Monday at 9am
-    elif "monthly" in prompt:
+    elif "monthly" in found:
         cron = "0 9 1 * *"    # 1st of every month 9am
-    elif "daily" in prompt:
+    elif "daily" in found:
         cron = "0 9 * * *"    # every day at 9am
     else:
         cron = "0 9 * * MON"  # fallback to weekly
 
-    if "prf" in prompt:
+    if "prf" in found:
         document_type = "PRF"  # assuming PRF is a DocType
         condition = "docstatus == 0"  # pending = draft
         message = "Reminder: You have pending PRF(s) awaiting approval."
     
-    elif "claim" in prompt:
+    elif "claim" in found:
         document_type = "Claim"
         condition = "docstatus == 0"
         message = "Reminder: You have pending claims to review."
@@ -216,8 +225,11 @@ def parse_reminder_prompt(prompt: str):
 
 
 
-from gpt_client import ask_gpt_custom
-import json
+@dataclass
+class DepartmentSpec:
+    department_name: str
+    parent_department: str = "Management"
+
 
 def parse_department_prompt(prompt: str):
     """
@@ -229,37 +241,20 @@ def parse_department_prompt(prompt: str):
 
     system_message = (
         "You are an ERP Assistant.\n"
-        "Your job is to extract department creation details from the user's instruction.\n"
-        "Extract exactly these two fields:\n"
-        "- department_name (string)\n"
-        "- parent_department (string)\n\n"
-        "If the parent_department is not mentioned, default it to 'Management'.\n"
-        "Respond ONLY in pure JSON format like this:\n"
-        "{\n"
-        "  \"department_name\": \"\",\n"
-        "  \"parent_department\": \"Management\"\n"
-        "}"
+        "Your job is to extract department creation details from the user's instruction:\n"
+        "- department_name\n"
+        "- parent_department\n\n"
+        "If the parent_department is not mentioned, use 'Management'."
     )
 
     try:
-        gpt_response = ask_gpt_custom(system_message, prompt)
-
-        print("🛠 RAW GPT RESPONSE (DEPARTMENT PARSE):")
-        print(gpt_response)
-
-        # Remove possible ```json ``` wrappers
-        if gpt_response.startswith("```"):
-            gpt_response = gpt_response.strip('```json').strip('```').strip()
+        spec = extract(DepartmentSpec, system_message, prompt)
+        print("🛠 DEPARTMENT PARSE:", spec)
 
-        parsed_data = json.loads(gpt_response)
+        return spec.department_name, spec.parent_department or "Management"
 
-        department_name = parsed_data.get("department_name")
-        parent_department = parsed_data.get("parent_department", "Management")
-
-        return department_name, parent_department
-
-    except Exception as e:
-        print("🔴 Department Parsing Error:", e)
+    except GPTError as e:
+        print("🔴 OpenAI Error:", e)
         return None, "Management"
 
 
@@ -268,7 +263,6 @@ def parse_department_prompt(prompt: str):
 
 
 
-
 def parse_user_assignment_prompt(prompt: str):
     """
     Parses a user assignment prompt.
@@ -288,11 +282,21 @@ def parse_user_assignment_prompt(prompt: str):
 
 
 
+FINANCIAL_RULES = RuleExtractor([
+    flag("management_fee", r"management fee"),
+    flag("profit_sharing", r"profit sharing|profit rule"),
+    FieldRule("department", r"for\s+(.*?)\s+department", convert=title),
+    FieldRule("fee_amount", r"rm\s?([\d,\.]+)", convert=number),
+    FieldRule("role", r"to\s+(.*?)\s+after", convert=title),
+    FieldRule("percent", r"(\d+)%", convert=float),
+])
+
+
 def parse_financial_prompt(prompt: str):
     """
     Parses prompts related to Management Fee and Profit Sharing.
     """
-    prompt = prompt.lower()
+    parsed = FINANCIAL_RULES.extract(prompt)
 
     action = None
     department = None
@@ -300,269 +304,172 @@ def parse_financial_prompt(prompt: str):
     amount = None
 
     # Detect Management Fee
-    if "management fee" in prompt:
+    if parsed["management_fee"]:
         action = "management_fee"
-        dept_match = re.search(r"for\s+(.*?)\s+department", prompt)
-        amount_match = re.search(r"rm\s?([\d,\.]+)", prompt)
-        if dept_match:
-            department = dept_match.group(1).strip().title()
-        if amount_match:
-            amount = float(amount_match.group(1).replace(",", ""))
-    
+        department = parsed["department"]
+        amount = parsed["fee_amount"]
+
     # Detect Profit Sharing
-    elif "profit sharing" in prompt or "profit rule" in prompt:
+    elif parsed["profit_sharing"]:
         action = "profit_sharing"
-        dept_match = re.search(r"for\s+(.*?)\s+department", prompt)
-        role_match = re.search(r"to\s+(.*?)\s+after", prompt)
-        percent_match = re.search(r"(\d+)%", prompt)
-
-        if dept_match:
-            department = dept_match.group(1).strip().title()
-        if role_match:
-            role = role_match.group(1).strip().title()
-        if percent_match:
-            amount = float(percent_match.group(1))
-    
+        department = parsed["department"]
+        role = parsed["role"]
+        amount = parsed["percent"]
+
     return action, department, role, amount
 
 
 
+PRF_RULES = RuleExtractor([
+    FieldRule("project_name", r"project\s+(\w+)"),
+    FieldRule("item_name", r"item[:\s]+([\w\s]+?)(,|quantity|$)"),
+    FieldRule("quantity", r"quantity[:\s]+([\d\.]+)", convert=float),
+])
+
+
 def parse_prf_prompt(prompt: str):
     """
     Parses PRF creation prompt.
     """
-    prompt = prompt.lower()
-
-    project_name = None
-    item_name = None
-    quantity = None
-
-    # Find Project Name
-    project_match = re.search(r"project\s+(\w+)", prompt)
-    if project_match:
-        project_name = project_match.group(1)
-
-    # Find Item Name
-    item_match = re.search(r"item[:\s]+([\w\s]+?)(,|quantity|$)", prompt)
-    if item_match:
-        item_name = item_match.group(1).strip()
+    parsed = PRF_RULES.extract(prompt)
+    return parsed["project_name"], parsed["item_name"], parsed["quantity"]
 
-    # Find Quantity
-    quantity_match = re.search(r"quantity[:\s]+([\d\.]+)", prompt)
-    if quantity_match:
-        quantity = float(quantity_match.group(1))
 
-    return project_name, item_name, quantity
+CLAIM_RULES = RuleExtractor([
+    FieldRule("project_name", r"project\s+(\w+)"),
+    FieldRule("claim_name", r"claim\s+(\w+)"),
+    FieldRule("amount", r"rm\s?([\d,\.]+)", convert=number),
+])
 
 
 def parse_claim_prompt(prompt: str):
     """
     Parses claim creation or query prompt.
     """
-    prompt = prompt.lower()
+    parsed = CLAIM_RULES.extract(prompt)
+    return parsed["project_name"], parsed["claim_name"], parsed["amount"]
 
-    project_name = None
-    claim_name = None
-    amount = None
-
-    # Find Project Name
-    project_match = re.search(r"project\s+(\w+)", prompt)
-    if project_match:
-        project_name = project_match.group(1)
+@dataclass
+class AssignmentSpec:
+    user: str
+    role: str
 
-    # Find Claim Name
-    claim_match = re.search(r"claim\s+(\w+)", prompt)
-    if claim_match:
-        claim_name = claim_match.group(1)
 
-    # Find Amount
-    amount_match = re.search(r"rm\s?([\d,\.]+)", prompt)
-    if amount_match:
-        amount = float(amount_match.group(1).replace(",", ""))
+@dataclass
+class ProjectSpec:
+    project_name: str
+    expected_end_date: Optional[str] = None  # YYYY-MM-DD
+    estimated_cost: Optional[float] = None
+    assignments: list[AssignmentSpec] = field(default_factory=list)
 
-    return project_name, claim_name, amount
-
-from gpt_client import ask_gpt_custom
-import json
 
+def _project_values(spec: ProjectSpec):
+    assignments = [(a.user.title(), a.role.title()) for a in spec.assignments]
+    return spec.project_name, spec.expected_end_date, spec.estimated_cost, assignments
 
 
 def parse_project_prompt(prompt: str):
     system_message = (
         "You are an ERP Assistant.\n"
         "Extract the following fields from the user's instruction:\n"
-        "- project_name (string)\n"
-        "- expected_end_date (string, format YYYY-MM-DD, if available)\n"
-        "- estimated_cost (number, if available)\n"
-        "- assignments (list of objects with 'user' and 'role')\n\n"
-        "If any field is missing, set it to null or empty list.\n"
-        "Respond ONLY in pure JSON format without any Markdown syntax like ```."
+        "- project_name\n"
+        "- expected_end_date (format YYYY-MM-DD)\n"
+        "- estimated_cost\n"
+        "- assignments (the users to assign and their roles)\n\n"
+        "If a field is not mentioned, set it to null or an empty list."
     )
 
     try:
-        gpt_response = ask_gpt_custom(system_message, prompt)
-
-        print("🛠 RAW GPT RESPONSE (PROJECT PARSE):")
-        print(gpt_response)
+        spec = extract(ProjectSpec, system_message, prompt)
+        print("🛠 PROJECT PARSE:", spec)
 
-        # 🔥 Strip any ```json ``` wrappers
-        if gpt_response.startswith("```"):
-            gpt_response = gpt_response.strip('```json').strip('```').strip()
+        return _project_values(spec)
 
-        parsed_data = json.loads(gpt_response)
-
-        project_name = parsed_data.get("project_name")
-        expected_end_date = parsed_data.get("expected_end_date")
-        estimated_costing = parsed_data.get("estimated_cost")
-        assignments = []
+    except GPTError as e:
+        print("🔴 OpenAI Error:", e)
+        return None, None, None, []
 
-        assignment_list = parsed_data.get("assignments", [])
-        if assignment_list:
-            for a in assignment_list:
-                user = a.get("user", "").title()
-                role = a.get("role", "").title()
-                assignments.append((user, role))
 
-        return project_name, expected_end_date, estimated_costing, assignments
-
-    except Exception as e:
-        print("🔴 Project Parsing Error:", e)
-        return None, None, None, []
 
+HR_RULES = RuleExtractor([
+    FieldRule("employee_name", r"for\s+([\w\s]+)", convert=title),
+    FieldRule("monthly_salary", r"rm\s?([\d,\.]+)", convert=number),
+    FieldRule("start_date", r"start[:\s]+([\w\s\d]+)"),
+])
 
 
 def parse_hr_prompt(prompt: str):
     """
     Parses HR related prompts like contract creation, salary advance, leave tracking.
     """
-    prompt = prompt.lower()
-
-    employee_name = None
-    monthly_salary = None
-    start_date = None
+    parsed = HR_RULES.extract(prompt)
+    return parsed["employee_name"], parsed["monthly_salary"], parsed["start_date"]
 
-    # Find Employee Name
-    employee_match = re.search(r"for\s+([\w\s]+)", prompt)
-    if employee_match:
-        employee_name = employee_match.group(1).strip().title()
 
-    # Find Monthly Salary
-    salary_match = re.search(r"rm\s?([\d,\.]+)", prompt)
-    if salary_match:
-        monthly_salary = float(salary_match.group(1).replace(",", ""))
-
-    # Find Start Date
-    start_date_match = re.search(r"start[:\s]+([\w\s\d]+)", prompt)
-    if start_date_match:
-        start_date = start_date_match.group(1).strip()
-
-    return employee_name, monthly_salary, start_date
+VEHICLE_RULES = RuleExtractor([
+    FieldRule("vehicle_name", r"vehicle\s+([\w\s]+)", convert=title),
+    FieldRule("department_name", r"to\s+([\w\s]+)", convert=title),
+    FieldRule("maintenance_interval_months", r"every\s+(\d+)\s+month", convert=int),
+])
 
 
 def parse_vehicle_prompt(prompt: str):
     """
     Parses vehicle/asset-related prompts like addition, maintenance scheduling.
     """
-    prompt = prompt.lower()
-
-    vehicle_name = None
-    department_name = None
-    maintenance_interval_months = None
+    parsed = VEHICLE_RULES.extract(prompt)
+    return parsed["vehicle_name"], parsed["department_name"], parsed["maintenance_interval_months"]
 
-    # Find Vehicle Name
-    vehicle_match = re.search(r"vehicle\s+([\w\s]+)", prompt)
-    if vehicle_match:
-        vehicle_name = vehicle_match.group(1).strip().title()
 
-    # Find Department
-    dept_match = re.search(r"to\s+([\w\s]+)", prompt)
-    if dept_match:
-        department_name = dept_match.group(1).strip().title()
+INVENTORY_RULES = RuleExtractor([
+    FieldRule("item_name", r"item\s+([\w\s]+)", convert=title),
+    FieldRule("quantity", r"quantity[:\s]+(\d+)", convert=int),
+    FieldRule("department_name", r"department[:\s]+([\w\s]+)", convert=title),
+    FieldRule("supplier_name", r"supplier\s+([\w\s]+)", convert=title),
+    FieldRule("contact_number", r"contact\s+(\d+)"),
+])
 
-    # Find Maintenance Frequency
-    maintenance_match = re.search(r"every\s+(\d+)\s+month", prompt)
-    if maintenance_match:
-        maintenance_interval_months = int(maintenance_match.group(1))
-
-    return vehicle_name, department_name, maintenance_interval_months
 
 def parse_inventory_prompt(prompt: str):
     """
     Parses inventory-related prompts like item addition, supplier creation.
     """
-    prompt = prompt.lower()
-
-    item_name = None
-    quantity = None
-    department_name = None
-    supplier_name = None
-    contact_number = None
-
-    # Find Item Name
-    item_match = re.search(r"item\s+([\w\s]+)", prompt)
-    if item_match:
-        item_name = item_match.group(1).strip().title()
-
-    # Find Quantity
-    quantity_match = re.search(r"quantity[:\s]+(\d+)", prompt)
-    if quantity_match:
-        quantity = int(quantity_match.group(1))
-
-    # Find Department
-    dept_match = re.search(r"department[:\s]+([\w\s]+)", prompt)
-    if dept_match:
-        department_name = dept_match.group(1).strip().title()
-
-    # Find Supplier Name
-    supplier_match = re.search(r"supplier\s+([\w\s]+)", prompt)
-    if supplier_match:
-        supplier_name = supplier_match.group(1).strip().title()
+    parsed = INVENTORY_RULES.extract(prompt)
+    return (
+        parsed["item_name"],
+        parsed["quantity"],
+        parsed["department_name"],
+        parsed["supplier_name"],
+        parsed["contact_number"],
+    )
 
-    # Find Contact Number
-    contact_match = re.search(r"contact\s+(\d+)", prompt)
-    if contact_match:
-        contact_number = contact_match.group(1)
 
-    return item_name, quantity, department_name, supplier_name, contact_number
+# Checked in order; the first keyword found wins
+DASHBOARD_AUDIENCES = [("hod", "HOD"), ("director", "Director"), ("finance", "Finance")]
+DASHBOARD_REPORT_TYPES = [("prf", "PRF"), ("claim", "Claim"), ("expense", "Expense"), ("project", "Project"), ("summary", "Summary")]
+DASHBOARD_FREQUENCIES = [("weekly", "Weekly"), ("monthly", "Monthly"), ("daily", "Daily")]
+DASHBOARD_KEYWORDS = KeywordAutomaton(
+    keyword for keyword, _ in DASHBOARD_AUDIENCES + DASHBOARD_REPORT_TYPES + DASHBOARD_FREQUENCIES
+)
 
 
 def parse_dashboard_prompt(prompt: str):
     """
     Parses prompts related to dashboard/report generation.
     """
-    prompt = prompt.lower()
+    found = DASHBOARD_KEYWORDS.find(prompt.lower())
 
-    target_audience = None
-    report_type = None
-    frequency = None
+    def first_found(options):
+        return next((value for keyword, value in options if keyword in found), None)
 
     # Detect Target Audience
-    if "hod" in prompt:
-        target_audience = "HOD"
-    elif "director" in prompt:
-        target_audience = "Director"
-    elif "finance" in prompt:
-        target_audience = "Finance"
+    target_audience = first_found(DASHBOARD_AUDIENCES)
 
     # Detect Report Type
-    if "prf" in prompt:
-        report_type = "PRF"
-    elif "claim" in prompt:
-        report_type = "Claim"
-    elif "expense" in prompt:
-        report_type = "Expense"
-    elif "project" in prompt:
-        report_type = "Project"
-    elif "summary" in prompt:
-        report_type = "Summary"
+    report_type = first_found(DASHBOARD_REPORT_TYPES)
 
     # Detect Frequency
-    if "weekly" in prompt:
-        frequency = "Weekly"
-    elif "monthly" in prompt:
-        frequency = "Monthly"
-    elif "daily" in prompt:
-        frequency = "Daily"
+    frequency = first_found(DASHBOARD_FREQUENCIES)
 
     return target_audience, report_type, frequency
 
@@ -572,33 +479,100 @@ def parse_dashboard_prompt(prompt: str):
 
 
 
+@dataclass
+class BOQEntrySpec:
+    project_name: str
+    item_name: str
+    quantity: float
+    price: float
+
+
 def parse_boq_creation_prompt(prompt: str):
     system_message = (
         "You are an ERP Assistant.\n"
         "Extract the following fields strictly from the user's instruction:\n"
-        "- project_name (string)\n"
-        "- item_name (string)\n"
-        "- quantity (number)\n"
-        "- price (number)\n\n"
-        "Always respond ONLY in this JSON format:\n"
-        "{\n"
-        "  \"budget_amount_rm\": \"\",\n"
-        "  \"item_name\": \"\",\n"
-        "  \"quantity\": 0,\n"
-        "  \"price\": 0\n"
-        "}\n"
+        "- project_name\n"
+        "- item_name\n"
+        "- quantity\n"
+        "- price"
     )
 
     try:
-        gpt_response = ask_gpt_custom(system_message, prompt)
+        spec = extract(BOQEntrySpec, system_message, prompt)
+        print("🛠 BOQ PARSE:", spec)
 
-        print("🛠 RAW GPT RESPONSE:")
-        print(gpt_response)  # 👉 Debug print here
+        return spec.project_name, spec.item_name, spec.quantity, spec.price
 
-        parsed_data = json.loads(gpt_response)
+    except GPTError as e:
+        print("🔴 OpenAI Error:", e)
+        return None, None, None, None
 
-        return parsed_data.get("budget_amount_rm"), parsed_data.get("item_name"), parsed_data.get("quantity"), parsed_data.get("price")
 
-    except Exception as e:
-        print("🔴 Parsing Error:", e)
-        return None, None, None, None
+
+# Intents whose arguments are extracted by GPT; a prompt combining several of
+# them is parsed with one parse_multi_intent_prompt call instead of one call each
+STRUCTURED_INTENTS = ("project", "department", "boq_create")
+
+
+@dataclass
+class MultiIntentSpec:
+    project: Optional[ProjectSpec]
+    department: Optional[DepartmentSpec]
+    boq_entries: list[BOQEntrySpec]
+
+
+def parse_multi_intent_prompt(prompt: str) -> dict:
+    """
+    Extract the project, department and BOQ items of a combined instruction
+    (e.g. "Create project ABC and add department Signage and a BOQ item ...")
+    in one structured GPT call.
+    Returns the arguments per intent, shaped like the single parsers' results:
+    {"project": (...), "department": (...), "boq_create": [(...), ...]}
+    Actions not in the prompt get the single parsers' empty results.
+    Returns {} if the call fails, so callers can fall back to the single parsers.
+    """
+    system_message = (
+        "You are an ERP Assistant.\n"
+        "The user's instruction may ask for several actions at once. Extract each one:\n"
+        "- project: a project to create or assign people to (project_name, expected_end_date as YYYY-MM-DD, "
+        "estimated_cost, assignments of users and roles), or null\n"
+        "- department: a department to create (department_name, parent_department; "
+        "use 'Management' if no parent is mentioned), or null\n"
+        "- boq_entries: every BOQ item to add (project_name, item_name, quantity, price), or an empty list\n\n"
+        "If a field is not mentioned, set it to null or an empty list."
+    )
+
+    try:
+        spec = extract(MultiIntentSpec, system_message, prompt)
+        print("🛠 MULTI-INTENT PARSE:", spec)
+
+    except GPTError as e:
+        print("🔴 OpenAI Error:", e)
+        return {}
+
+    department = spec.department
+    return {
+        "project": _project_values(spec.project) if spec.project else (None, None, None, []),
+        "department": (department.department_name, department.parent_department or "Management") if department else (None, "Management"),
+        "boq_create": [(b.project_name, b.item_name, b.quantity, b.price) for b in spec.boq_entries],
+    }
+
+
+def extracted_or_parse(extracted: dict, intent: str, prompt: str):
+    """
+    The arguments parse_multi_intent_prompt extracted for one of the
+    STRUCTURED_INTENTS, or the single parser's result when the combined call
+    found nothing usable for it (no project or department name, no BOQ item).
+    For "boq_create" this is a list of entries, like extracted["boq_create"].
+    """
+    values = extracted.get(intent)
+    if intent == "boq_create":
+        if values and any(item_name for _, item_name, _, _ in values):
+            return values
+        return [parse_boq_creation_prompt(prompt)]
+
+    if values and values[0]:
+        return values
+    if intent == "project":
+        return parse_project_prompt(prompt)
+    return parse_department_prompt(prompt)
@@ -0,0 +1,187 @@
+import json
+import re
+from dataclasses import dataclass, field
+
+from keyword_automaton import KeywordAutomaton
+
+
+# Intent -> keyword groups. An intent matches when every group has at least one
+# keyword in the prompt (substring match on the lowercased prompt, overlaps included), e.g.
+# "prf_create" needs "prf" and one of "create"/"submit". Order = dispatch order.
+INTENT_RULES = {
+    "notification": [["notify", "send email"]],
+    "inventory": [["inventory", "item", "supplier", "stock"]],
+    "dashboard": [["dashboard", "report", "summary"]],
+    "claim": [["claim"]],
+    "financial": [["management fee", "profit sharing", "profit rule"]],
+    "prf_create": [["prf"], ["create", "submit"]],
+    "prf_list": [["list"], ["pending prf"]],
+    "user": [["user"], ["add", "create"]],
+    "boq_create": [["boq"], ["create", "add"]],
+    "department": [["department"], ["create", "add"]],
+    "project": [["project"], ["create", "assign"]],
+    "vehicle": [["vehicle", "asset"]],
+    "hr": [["contract", "salary advance", "leave balance", "track leave"]],
+    "role": [["create"], ["role"]],
+    "workflow": [["approval workflow", "create workflow"]],
+}
+
+# Extra words the handlers branch on once an intent is chosen
+BRANCH_KEYWORDS = [
+    "submit", "due", "status", "low stock", "new vehicle", "schedule", "maintenance",
+    "vehicles", "assets", "leave",
+]
+
+INTENT_DESCRIPTIONS = {
+    "notification": "set up an email notification when a document changes status",
+    "inventory": "add inventory items or suppliers, list low stock",
+    "dashboard": "generate a summary report or dashboard",
+    "claim": "create/submit a project claim or list claims",
+    "financial": "set a management fee or profit sharing rule",
+    "prf_create": "create a PRF (purchase request)",
+    "prf_list": "list pending PRFs",
+    "user": "create a user and assign a role",
+    "boq_create": "add a BOQ (bill of quantities) item",
+    "department": "create a department",
+    "project": "create a project or assign people to it",
+    "vehicle": "add a vehicle/asset, schedule maintenance, list assets",
+    "hr": "employment contract, salary advance or leave balance",
+    "role": "create a role with doctype permissions",
+    "workflow": "create an approval workflow",
+}
+
+
+_VOCABULARY = [k for groups in INTENT_RULES.values() for group in groups for k in group] + BRANCH_KEYWORDS
+_AUTOMATON = KeywordAutomaton(_VOCABULARY)
+
+
+# Nearly every PRF, claim or BOQ prompt names a project ("... for project ABC");
+# only "create/add/new project" asks for one to be created.
+_CREATE_PROJECT = re.compile(r"\b(?:create|add|new)\s+(?:a\s+)?(?:new\s+)?project\b")
+
+
+def find_keywords(normalized: str) -> set:
+    """
+    Return every vocabulary keyword found in the (already lowercased) text in one scan.
+    """
+    return _AUTOMATON.find(normalized)
+
+
+@dataclass
+class RoutedPrompt:
+    """
+    A prompt normalized once, with the keywords found in it (and where) and the
+    intents it matched. Handlers use has(...) instead of re-lowercasing and
+    re-scanning the prompt.
+    """
+    text: str
+    normalized: str
+    keywords: set = field(default_factory=set)
+    positions: dict = field(default_factory=dict)  # keyword -> start offsets in normalized
+    intents: list = field(default_factory=list)
+    source: str = "keywords"  # "keywords" or "gpt"
+    extracted: dict = field(default_factory=dict)  # intent -> arguments already parsed for its handler
+
+    def has(self, *words: str) -> bool:
+        return any(word in self.keywords for word in words)
+
+    def creates_project(self) -> bool:
+        """
+        Whether the prompt asks for a new project, not just mentions one.
+        """
+        return bool(_CREATE_PROJECT.search(self.normalized))
+
+    def intent_positions(self) -> dict:
+        """
+        intent -> sorted start offsets of the keywords that triggered it.
+        """
+        return {
+            intent: sorted(
+                start
+                for group in INTENT_RULES.get(intent, [])
+                for keyword in group
+                for start in self.positions.get(keyword, [])
+            )
+            for intent in self.intents
+        }
+
+
+def classify(keywords: set) -> list:
+    return [
+        intent for intent, groups in INTENT_RULES.items()
+        if all(any(k in keywords for k in group) for group in groups)
+    ]
+
+
+def classify_with_gpt(prompt: str) -> list:
+    """
+    Fallback for prompts no keyword rule recognised. Uses ask_gpt_custom at
+    temperature 0, so repeated prompts are answered from the LLM response cache.
+    """
+    from gpt_client import GPTError, ask_gpt_custom
+
+    system_message = (
+        "You are an ERP Assistant that routes user instructions.\n"
+        "Pick which of these actions the instruction asks for:\n"
+        + "\n".join(f"- {intent}: {description}" for intent, description in INTENT_DESCRIPTIONS.items())
+        + "\n\nRespond ONLY with a JSON list of action names, e.g. [\"claim\"]. "
+        "Respond with [] if the user is only asking a question."
+    )
+
+    try:
+        intents = json.loads(ask_gpt_custom(system_message, prompt))
+    except (GPTError, ValueError, TypeError) as e:
+        print("🔴 Intent Routing Error:", e)
+        return []
+
+    if not isinstance(intents, list):
+        return []
+    return [intent for intent in INTENT_RULES if intent in intents]
+
+
+def route(prompt: str, use_gpt_fallback: bool = False) -> RoutedPrompt:
+    """
+    Normalize the prompt once, find all keywords (with positions) in a single
+    automaton pass and classify it.
+    With use_gpt_fallback, prompts matching no rule are classified by GPT.
+    """
+    normalized = prompt.lower()
+    positions = _AUTOMATON.positions(normalized)
+    keywords = set(positions)
+    routed = RoutedPrompt(prompt, normalized, keywords, positions, classify(keywords))
+
+    if not routed.intents and use_gpt_fallback:
+        routed.intents = classify_with_gpt(prompt)
+        routed.source = "gpt"
+
+    return routed
+
+
+_handlers = {}
+
+
+def handles(intent: str):
+    """
+    Register a handler function `fn(routed: RoutedPrompt)` for an intent.
+    """
+    if intent not in INTENT_RULES:
+        raise ValueError(f"Unknown intent: {intent}")
+
+    def decorator(fn):
+        _handlers[intent] = fn
+        return fn
+    return decorator
+
+
+def dispatch(routed: RoutedPrompt) -> list:
+    """
+    Run the registered handler of every matched intent, in INTENT_RULES order.
+    Returns the intents that were handled.
+    """
+    handled = []
+    for intent in routed.intents:
+        handler = _handlers.get(intent)
+        if handler:
+            handler(routed)
+            handled.append(intent)
+    return handled
@@ -0,0 +1,69 @@
+from collections import deque
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed keyword list, built once (typically at
+    import). One left-to-right pass over the text reports every occurrence of
+    every keyword, including overlapping ones ("workflow stock" contains both
+    "flow" and "low stock"), so it answers the same question as a series of
+    `keyword in text` checks.
+    Matching is case-sensitive; pass lowercased keywords and text.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(k for k in keywords if k))
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = next_state
+            self._out[state] += (keyword,)
+
+        # Breadth-first: a state's fail link points at the longest proper suffix
+        # that is also a keyword prefix; outputs are inherited along fail links
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._out[next_state] += self._out[self._fail[next_state]]
+
+    def iter_matches(self, text: str):
+        """
+        Yield (start, keyword) for every occurrence, in order of where it ends.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for end, char in enumerate(text, start=1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword in out[state]:
+                yield end - len(keyword), keyword
+
+    def positions(self, text: str) -> dict:
+        """
+        keyword -> start offsets of its occurrences, for the keywords found.
+        """
+        found = {}
+        for start, keyword in self.iter_matches(text):
+            found.setdefault(keyword, []).append(start)
+        return found
+
+    def find(self, text: str) -> set:
+        return {keyword for _, keyword in self.iter_matches(text)}
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of chat completion responses stored in SQLite.
+    - path: SQLite file (":memory:" for a per-process cache)
+    - max_entries: least recently used entries beyond this are evicted
+
+    Keys are a SHA-256 of (model, system message, user prompt, params), so
+    only byte-identical requests hit. Only deterministic calls (temperature=0)
+    should be cached.
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, system_message: str, user_prompt: str, params: dict) -> str:
+        raw = json.dumps([model, system_message, user_prompt, params], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def set(self, key: str, response: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Shared cache used by gpt_client, created on first use from
+    LLM_CACHE_PATH / LLM_CACHE_MAX_ENTRIES. Returns None when
+    LLM_CACHE_PATH is set to an empty string (caching disabled).
+    """
+    global _response_cache
+    if _response_cache is None:
+        path = os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite")
+        if not path:
+            return None
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = LLMResponseCache(path, int(os.getenv("LLM_CACHE_MAX_ENTRIES", 5000)))
+    return _response_cache
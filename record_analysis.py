@@ -0,0 +1,145 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from gpt_client import ADVISOR_SYSTEM_MESSAGE, ask_gpt_custom
+from record_serializer import count_tokens, serialize_rows
+
+
+DEFAULT_CHUNK_TOKENS = 6000   # record tokens per map call, well inside the model context
+DEFAULT_MAX_WORKERS = 4       # map calls in flight at once
+
+MAP_SYSTEM_MESSAGE = (
+    "You are an ERP data analyst.\n"
+    "You are given ONE batch of ERPNext records out of several (as CSV with a header row), plus a task.\n"
+    "Work only from this batch. List the concrete findings relevant to the task, "
+    "quoting record names and figures, and include totals/counts you computed for this batch.\n"
+    "If nothing in the batch is relevant, answer exactly: No relevant findings.\n"
+    "Be concise; your notes will be merged with the notes from the other batches."
+)
+
+COMBINE_SYSTEM_MESSAGE = (
+    "You are an ERP data analyst.\n"
+    "You are given a task and the notes an analyst wrote for several batches of ERPNext records.\n"
+    "Merge them into one set of notes for the task: keep every concrete finding, record name and figure, "
+    "combine totals and counts across the batches and remove duplicates.\n"
+    "Be concise; your notes will be merged with other merged notes."
+)
+
+REDUCE_SYSTEM_MESSAGE = (
+    "You are an expert ERPNext assistant and business consultant.\n"
+    "You are given a task and the notes an analyst wrote for each batch of the records.\n"
+    "Merge them into one answer to the task: combine totals and counts across batches, "
+    "remove duplicates, and ignore batches with no relevant findings."
+)
+
+
+def chunk_records(records: list, token_budget: int = DEFAULT_CHUNK_TOKENS) -> list:
+    """
+    Serialize records compactly (CSV with the header repeated per chunk) and
+    split them into chunks of at most token_budget tokens each.
+    Returns a list of chunk texts.
+    """
+    if not records:
+        return []
+
+    header, rows = serialize_rows(records)
+    header_cost = count_tokens(header)
+    chunks, lines, used = [], [], header_cost
+    for row in rows:
+        cost = count_tokens(row) + 1  # + newline
+        if lines and used + cost > token_budget:
+            chunks.append("\n".join([header] + lines))
+            lines, used = [], header_cost
+        lines.append(row)
+        used += cost
+    if lines:
+        chunks.append("\n".join([header] + lines))
+    return chunks
+
+
+def default_task(doctype_name: str) -> str:
+    return f"Analyze the following ERPNext {doctype_name} records and summarize any important insights or risks you detect"
+
+
+def map_chunks(chunks: list, task: str, max_workers: int = DEFAULT_MAX_WORKERS, on_progress=None) -> list:
+    """
+    Summarize every chunk for the task in parallel (at most max_workers at once).
+    Map calls go through ask_gpt_custom (temperature 0), so re-asking the same
+    question over unchanged records is served from the LLM response cache.
+    on_progress(done, total) is called from the calling thread as chunks finish.
+    Returns the notes in chunk order.
+    """
+    prompts = [f"Task: {task}\n\nBatch {i + 1} of {len(chunks)}:\n{chunk}" for i, chunk in enumerate(chunks)]
+    return _ask_all(MAP_SYSTEM_MESSAGE, prompts, max_workers, on_progress)
+
+
+def _ask_all(system_message: str, prompts: list, max_workers: int, on_progress=None) -> list:
+    answers = [None] * len(prompts)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(ask_gpt_custom, system_message, prompt): i for i, prompt in enumerate(prompts)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            answers[futures[future]] = future.result()
+            if on_progress:
+                on_progress(done, len(prompts))
+    return answers
+
+
+def _join_notes(notes: list, label: str) -> str:
+    return "\n\n".join(f"{label} {i + 1} notes:\n{note}" for i, note in enumerate(notes))
+
+
+def reduce_notes(notes: list, task: str, token_budget: int = DEFAULT_CHUNK_TOKENS,
+                 max_workers: int = DEFAULT_MAX_WORKERS) -> str:
+    """
+    Shrink the per-batch notes until they fit in token_budget for the final call.
+    While they don't, the notes are packed into groups of at most token_budget
+    tokens (at least two notes per group, so every round halves them or better)
+    and each group is merged by its own call.
+    Returns the notes text for the final call.
+    """
+    label = "Batch"
+    joined = _join_notes(notes, label)
+    while len(notes) > 1 and count_tokens(joined) > token_budget:
+        groups, group, used = [], [], 0
+        for note in notes:
+            cost = count_tokens(note) + 10  # + label
+            if len(group) >= 2 and used + cost > token_budget:
+                groups.append(group)
+                group, used = [], 0
+            group.append(note)
+            used += cost
+        groups.append(group)
+
+        prompts = [f"Task: {task}\n\n{_join_notes(group, label)}" for group in groups]
+        notes = _ask_all(COMBINE_SYSTEM_MESSAGE, prompts, max_workers)
+        label = "Group"
+        joined = _join_notes(notes, label)
+    return joined
+
+
+def build_analysis(records: list, question: str, doctype_name: str, token_budget: int = DEFAULT_CHUNK_TOKENS,
+                   max_workers: int = DEFAULT_MAX_WORKERS, on_progress=None):
+    """
+    Prepare the final analysis call for a set of records.
+    Records that fit in one chunk are sent as-is; larger sets are mapped chunk
+    by chunk first and the final call reduces the per-chunk notes (merged in
+    rounds first if together they exceed token_budget, see reduce_notes).
+    Returns (system_message, user_prompt) for the final call, so callers can
+    run it blocking (ask_gpt_custom) or streaming (ask_gpt_custom_stream).
+    """
+    task = question.strip() or default_task(doctype_name)
+    chunks = chunk_records(records, token_budget)
+
+    if len(chunks) <= 1:
+        return ADVISOR_SYSTEM_MESSAGE, f"{task}\n\nHere are the records (CSV):\n{chunks[0] if chunks else ''}"
+
+    notes = map_chunks(chunks, task, max_workers, on_progress)
+    batch_notes = reduce_notes(notes, task, token_budget, max_workers)
+    return REDUCE_SYSTEM_MESSAGE, f"Task: {task}\n\n{len(records)} {doctype_name} records were analyzed in {len(chunks)} batches.\n\n{batch_notes}"
+
+
+def analyze_records(records: list, question: str, doctype_name: str, **kwargs) -> str:
+    """
+    Blocking map-reduce analysis; see build_analysis for the options.
+    """
+    system_message, prompt = build_analysis(records, question, doctype_name, **kwargs)
+    return ask_gpt_custom(system_message, prompt)
@@ -0,0 +1,101 @@
+import csv
+import io
+import functools
+
+
+# ERPNext bookkeeping columns that carry no meaning for an analysis prompt
+SYSTEM_FIELDS = {
+    "owner", "modified_by", "docstatus", "idx", "doctype",
+    "parent", "parentfield", "parenttype",
+}
+
+DEFAULT_MAX_TEXT_LENGTH = 120
+TOKENIZER_ENCODING = "o200k_base"  # gpt-4o / gpt-4o-mini
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoding():
+    try:
+        import tiktoken  # optional; falls back to an estimate if missing or offline
+
+        return tiktoken.get_encoding(TOKENIZER_ENCODING)
+    except Exception as e:
+        print("⚠️ Tokenizer unavailable, estimating token counts:", e)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Token count of text for the GPT models used here (tiktoken), or a
+    ~4 characters/token estimate when tiktoken is not available.
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return len(text) // 4 + 1
+
+
+def _is_empty(value) -> bool:
+    return value is None or value == "" or value == []
+
+
+def _format_value(value, max_text_length: int) -> str:
+    if _is_empty(value):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = " ".join(str(value).split())  # collapse newlines/indentation
+    if len(text) > max_text_length:
+        text = text[:max_text_length - 1] + "…"
+    return text
+
+
+def select_columns(records: list) -> list:
+    """
+    Columns worth sending: in first-seen order, without system fields,
+    underscore-prefixed internals (_assign, _liked_by, ...) and columns that
+    are empty in every record.
+    """
+    columns = {}
+    for record in records:
+        for key, value in record.items():
+            if key in SYSTEM_FIELDS or key.startswith("_"):
+                continue
+            columns[key] = columns.get(key, False) or not _is_empty(value)
+    return [key for key, has_value in columns.items() if has_value]
+
+
+def serialize_rows(records: list, columns: list = None, max_text_length: int = DEFAULT_MAX_TEXT_LENGTH):
+    """
+    Encode records as CSV: returns (header_line, [row_line, ...]) so callers
+    can split rows into chunks and repeat only the header per chunk.
+    """
+    columns = columns or select_columns(records)
+
+    def to_line(values):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="").writerow(values)
+        return buffer.getvalue()
+
+    header = to_line(columns)
+    rows = [to_line([_format_value(record.get(col), max_text_length) for col in columns]) for record in records]
+    return header, rows
+
+
+def serialize_records(records: list, max_text_length: int = DEFAULT_MAX_TEXT_LENGTH) -> str:
+    """
+    Compact, header-once encoding of ERPNext records for LLM prompts.
+    """
+    if not records:
+        return ""
+    header, rows = serialize_rows(records, max_text_length=max_text_length)
+    return "\n".join([header] + rows)
+
+
+def token_report(records: list) -> dict:
+    """
+    Prompt tokens for the records as str(dict) lines vs the compact encoding.
+    """
+    naive = count_tokens("\n".join(str(record) for record in records))
+    compact = count_tokens(serialize_records(records))
+    return {"records": len(records), "naive_tokens": naive, "compact_tokens": compact}
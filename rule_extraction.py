@@ -0,0 +1,104 @@
+import re
+from dataclasses import dataclass
+from typing import Callable
+
+
+def text(value: str) -> str:
+    return value.strip()
+
+
+def title(value: str) -> str:
+    return value.strip().title()
+
+
+def number(value: str) -> float:
+    return float(value.replace(",", ""))
+
+
+def present(value: str) -> bool:
+    return True
+
+
+@dataclass(frozen=True)
+class FieldRule:
+    """
+    One field of a rule-based parser:
+    - pattern: regex searched in the (normalized) prompt
+    - convert: turns the captured group into the field's typed value
+    - group: capture group holding the value (0 = the whole match)
+    - find_all: collect every match as a list instead of the first one
+    - default: value when the pattern does not match (or convert raises ValueError)
+    """
+    name: str
+    pattern: str
+    convert: Callable = text
+    group: int = 1
+    find_all: bool = False
+    default: object = None
+
+
+def flag(name: str, pattern: str) -> FieldRule:
+    """
+    A True/False field that is set when the pattern occurs anywhere.
+    """
+    return FieldRule(name, pattern, convert=present, group=0, default=False)
+
+
+def _field_reader(regex, rule: FieldRule):
+    """
+    text -> the rule's typed value, with the scan mode chosen once.
+    A capture convert() rejects with ValueError (e.g. number(".") from the
+    "rm." in "confirm.") counts as no match.
+    """
+    convert, group, default = rule.convert, rule.group, rule.default
+    if rule.find_all:
+        if group == 1 and regex.groups == 1:
+            # findall returns group 1 directly when it is the pattern's only group
+            findall = regex.findall
+        else:
+            finditer = regex.finditer
+            findall = lambda text: [m.group(group) for m in finditer(text)]
+
+        def every(text):
+            values = []
+            for value in findall(text):
+                try:
+                    values.append(convert(value))
+                except ValueError:
+                    pass
+            return values
+        return every
+
+    search = regex.search
+
+    def first(text):
+        match = search(text)
+        if match is None:
+            return default
+        try:
+            return convert(match.group(group))
+        except ValueError:
+            return default
+    return first
+
+
+class RuleExtractor:
+    """
+    A table of FieldRules compiled once at import. extract() normalizes the
+    prompt once and returns {field name: typed value} for every rule.
+    - lowercase: match against the lowercased prompt (otherwise the prompt as given)
+    - flags: re flags applied to every pattern
+    Each rule is still its own regex search: one combined alternation pass
+    (with lookaheads, since fields overlap) measured 2-4x slower on these
+    short prompts than the precompiled per-rule searches.
+    """
+
+    def __init__(self, rules: list, lowercase: bool = True, flags: int = 0):
+        self.rules = rules
+        self.lowercase = lowercase
+        self.flags = flags
+        self._readers = [(rule.name, _field_reader(re.compile(rule.pattern, flags), rule)) for rule in rules]
+
+    def extract(self, prompt: str) -> dict:
+        normalized = prompt.lower() if self.lowercase else prompt
+        return {name: read(normalized) for name, read in self._readers}
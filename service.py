@@ -0,0 +1,225 @@
+"""
+The assistant's actions without Streamlit: each function parses a natural
+language instruction with the gpt_parser functions, runs it against ERPNext
+and returns a JSON-serializable dict. Used by cli.py; importable from scripts
+and scheduled jobs.
+
+Every result has "action" and "parsed" (what was understood from the prompt),
+plus "result" (the ERPNext response) on success or "error" on failure.
+"""
+import os
+
+from config import load_env
+from erp_api import (
+    create_boq_entry, create_claim, create_department, create_prf, create_project, create_workflow
+)
+from gpt_parser import (
+    STRUCTURED_INTENTS, extracted_or_parse, parse_boq_creation_prompt, parse_claim_prompt, parse_dashboard_prompt,
+    parse_department_prompt, parse_multi_intent_prompt, parse_prf_prompt, parse_project_prompt,
+    parse_workflow_prompt
+)
+from intent_router import route
+
+
+load_env()  # .env may set ERP_COMPANY; load_env is cached, so settings_from_env doesn't re-read it
+COMPANY_NAME = os.getenv("ERP_COMPANY", "S&I Urban Designers")
+
+
+def settings_from_env():
+    """
+    (api_url, auth) from ERP_BASE_URL / ERP_API_KEY / ERP_API_SECRET (and .env).
+    Also enables the local mirror when ERP_MIRROR_DOCTYPES is set.
+    """
+    from erp_mirror import enable_from_env
+
+    load_env()
+    api_url = os.getenv("ERP_BASE_URL")
+    auth = (os.getenv("ERP_API_KEY"), os.getenv("ERP_API_SECRET"))
+    enable_from_env(api_url, auth)
+    return api_url, auth
+
+
+def _outcome(action: str, parsed: dict, result: dict, failure: str) -> dict:
+    if result and "error" not in result and "data" in result:
+        return {"action": action, "parsed": parsed, "result": result}
+    error = (result or {}).get("error") or failure
+    return {"action": action, "parsed": parsed, "error": error}
+
+
+def create_prf_from_prompt(api_url: str, auth: tuple, prompt: str) -> dict:
+    project_name, item_name, quantity = parse_prf_prompt(prompt)
+    parsed = {"project_name": project_name, "item_name": item_name, "quantity": quantity}
+    if not (project_name and item_name and quantity):
+        return {"action": "prf", "parsed": parsed, "error": "Could not detect project, item or quantity"}
+
+    result = create_prf(api_url, auth, project_name, item_name, quantity)
+    return _outcome("prf", parsed, result, "Failed to create PRF")
+
+
+def create_claim_from_prompt(api_url: str, auth: tuple, prompt: str) -> dict:
+    project_name, claim_name, amount = parse_claim_prompt(prompt)
+    parsed = {"project_name": project_name, "claim_name": claim_name, "amount": amount}
+    if not (project_name and claim_name and amount):
+        return {"action": "claim", "parsed": parsed, "error": "Could not detect project, claim name or amount"}
+
+    result = create_claim(api_url, auth, project_name, claim_name, amount)
+    return _outcome("claim", parsed, result, "Failed to create claim")
+
+
+def create_project_from_prompt(api_url: str, auth: tuple, prompt: str, extracted: tuple = None) -> dict:
+    """
+    - extracted: the project arguments when already parsed (see run_prompt)
+    """
+    project_name, expected_end_date, estimated_costing, assignments = extracted or parse_project_prompt(prompt)
+    parsed = {"project_name": project_name, "expected_end_date": expected_end_date,
+              "estimated_costing": estimated_costing, "assignments": assignments}
+    if not project_name:
+        return {"action": "project", "parsed": parsed, "error": "Project name is missing"}
+
+    result = create_project(api_url, auth, project_name, expected_end_date, estimated_costing)
+    return _outcome("project", parsed, result, "Failed to create project")
+
+
+def create_boq_from_prompt(api_url: str, auth: tuple, prompt: str, extracted: list = None) -> dict:
+    """
+    - extracted: the BOQ entries when already parsed (see run_prompt)
+    Returns one result per BOQ entry under "entries".
+    """
+    boq_entries = extracted if extracted is not None else [parse_boq_creation_prompt(prompt)]
+    entries = []
+    for project_name, item_name, quantity, price in boq_entries:
+        parsed = {"project_name": project_name, "item_name": item_name, "quantity": quantity, "price": price}
+        if not item_name:
+            entries.append({"action": "boq", "parsed": parsed, "error": "No BOQ item found in the instruction"})
+            continue
+        result = create_boq_entry(api_url, auth, project_name, item_name, quantity, price)
+        entries.append(_outcome("boq", parsed, result, "Failed to create BOQ item"))
+
+    outcome = {"action": "boq", "entries": entries}
+    if not entries or any("error" in entry for entry in entries):
+        outcome["error"] = "Some BOQ items were not created" if entries else "No BOQ item found in the instruction"
+    return outcome
+
+
+def create_department_from_prompt(api_url: str, auth: tuple, prompt: str, extracted: tuple = None,
+                                  company_name: str = COMPANY_NAME) -> dict:
+    """
+    - extracted: the department arguments when already parsed (see run_prompt)
+    """
+    department_name, parent_department = extracted or parse_department_prompt(prompt)
+    parsed = {"department_name": department_name, "parent_department": parent_department, "company": company_name}
+    if not department_name:
+        return {"action": "department", "parsed": parsed, "error": "Department name is missing"}
+
+    api_key, api_secret = auth
+    result = create_department(api_url, api_key, api_secret, department_name, company_name, parent_department)
+    return _outcome("department", parsed, result, "Failed to create department")
+
+
+def create_workflow_from_prompt(api_url: str, auth: tuple, prompt: str) -> dict:
+    workflow_name, document_type, states, transitions = parse_workflow_prompt(prompt)
+    parsed = {"workflow_name": workflow_name, "document_type": document_type,
+              "states": states, "transitions": transitions}
+
+    result = create_workflow(api_url, auth, workflow_name, document_type, states, transitions)
+    return _outcome("workflow", parsed, result, "Failed to create workflow")
+
+
+def generate_report(api_url: str, auth: tuple, prompt: str = "", docx_path: str = None) -> dict:
+    """
+    Summary report of PRFs, Claims, Expenses and Projects.
+    - docx_path: also save it as a Word document there
+    """
+    from erp_api_async import generate_summary_report_concurrently
+
+    target_audience, report_type, frequency = parse_dashboard_prompt(prompt)
+    parsed = {"target_audience": target_audience, "report_type": report_type, "frequency": frequency}
+
+    summary = generate_summary_report_concurrently(api_url, auth)
+    outcome = {"action": "report", "parsed": parsed, "result": summary}
+    if docx_path:
+        write_report_docx(summary, docx_path, target_audience, frequency)
+        outcome["docx_path"] = docx_path
+    return outcome
+
+
+def write_report_docx(summary: dict, path: str, target_audience: str = None, frequency: str = None):
+    """
+    Save a summary report (see generate_report) as a Word document.
+    """
+    from docx import Document
+
+    doc = Document()
+    doc.add_heading('ERPNext Summary Report', 0)
+
+    if target_audience:
+        doc.add_paragraph(f"Target Audience: {target_audience}")
+    if frequency:
+        doc.add_paragraph(f"Frequency: {frequency}")
+
+    doc.add_paragraph("Summary:")
+
+    for key, value in summary.items():
+        if isinstance(value, dict):
+            doc.add_paragraph(f"{key}:")
+            for status, count in value.items():
+                doc.add_paragraph(f"{status}: {count}", style="List Bullet")
+        else:
+            doc.add_paragraph(f"{key}: {value}")
+
+    doc.save(path)
+
+
+# Action name -> function(api_url, auth, prompt)
+ACTIONS = {
+    "prf": create_prf_from_prompt,
+    "claim": create_claim_from_prompt,
+    "project": create_project_from_prompt,
+    "boq": create_boq_from_prompt,
+    "department": create_department_from_prompt,
+    "workflow": create_workflow_from_prompt,
+    "report": generate_report,
+}
+
+# Routed intent -> action; claim and project only when the prompt creates one,
+# as in the chat handlers
+_INTENT_ACTIONS = {
+    "prf_create": "prf",
+    "claim": "claim",
+    "project": "project",
+    "boq_create": "boq",
+    "department": "department",
+    "workflow": "workflow",
+    "dashboard": "report",
+}
+
+
+def run_prompt(api_url: str, auth: tuple, prompt: str) -> dict:
+    """
+    Route a free-form prompt like the chat box does and run every supported
+    action it asks for. Combined project/department/BOQ prompts are parsed
+    with one GPT call.
+    """
+    routed = route(prompt, use_gpt_fallback=True)
+    actions = [intent for intent in routed.intents if intent in _INTENT_ACTIONS]
+    if "claim" in actions and not routed.has("submit", "create"):
+        actions.remove("claim")
+    if "project" in actions and not routed.creates_project():
+        actions.remove("project")
+
+    extracted = {}
+    if sum(intent in STRUCTURED_INTENTS for intent in actions) > 1:
+        extracted = parse_multi_intent_prompt(prompt)
+
+    results = []
+    for intent in actions:
+        action = ACTIONS[_INTENT_ACTIONS[intent]]
+        if intent in extracted:
+            results.append(action(api_url, auth, prompt, extracted=extracted_or_parse(extracted, intent, prompt)))
+        else:
+            results.append(action(api_url, auth, prompt))
+
+    outcome = {"prompt": prompt, "intents": routed.intents, "results": results}
+    if not results:
+        outcome["error"] = "No supported action found in the prompt"
+    return outcome
@@ -0,0 +1,76 @@
+import dataclasses
+import typing
+
+from gpt_client import ask_gpt_structured
+
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean"}
+
+
+def _type_schema(tp) -> dict:
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+
+    if origin is typing.Union and type(None) in args:
+        # Optional[X]: strict mode wants every field required, so "missing" is null
+        inner = _type_schema(next(a for a in args if a is not type(None)))
+        return {"anyOf": [inner, {"type": "null"}]}
+    if origin is typing.Literal:
+        return {"type": _JSON_TYPES[type(args[0])], "enum": list(args)}
+    if origin is list:
+        return {"type": "array", "items": _type_schema(args[0])}
+    if dataclasses.is_dataclass(tp):
+        return schema_for(tp)
+    return {"type": _JSON_TYPES[tp]}
+
+
+def schema_for(cls) -> dict:
+    """
+    JSON schema (strict structured-output flavour) for a dataclass: every field
+    required, no extra properties; Optional fields accept null.
+    """
+    hints = typing.get_type_hints(cls)
+    fields = [f.name for f in dataclasses.fields(cls)]
+    return {
+        "type": "object",
+        "properties": {name: _type_schema(hints[name]) for name in fields},
+        "required": fields,
+        "additionalProperties": False,
+    }
+
+
+def _load_value(tp, value):
+    origin = typing.get_origin(tp)
+    args = typing.get_args(tp)
+
+    if value is None:
+        return None
+    if origin is typing.Union and type(None) in args:
+        return _load_value(next(a for a in args if a is not type(None)), value)
+    if origin is list:
+        return [_load_value(args[0], v) for v in value]
+    if dataclasses.is_dataclass(tp):
+        return from_dict(tp, value)
+    if tp is float and isinstance(value, int):
+        return float(value)
+    return value
+
+
+def from_dict(cls, data: dict):
+    """
+    Build a (possibly nested) dataclass from a parsed structured-output answer.
+    """
+    hints = typing.get_type_hints(cls)
+    return cls(**{
+        f.name: _load_value(hints[f.name], data.get(f.name))
+        for f in dataclasses.fields(cls)
+    })
+
+
+def extract(cls, system_message: str, prompt: str):
+    """
+    One structured LLM call returning an instance of the dataclass cls.
+    Raises gpt_client.GPTError if the call fails.
+    """
+    data = ask_gpt_structured(system_message, prompt, cls.__name__, schema_for(cls))
+    return from_dict(cls, data)